@@ -7,10 +7,16 @@ y compris WebSockets et HTTP, pour un traitement non bloquant.
 """
 
 import os
-from django.core.asgi import get_asgi_application
+
+import django
 
 # Définir la variable d'environnement pour indiquer le fichier de configuration Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
-# Obtenir l'application ASGI de Django
-application = get_asgi_application()
+# Équivalent de get_asgi_application(), avec une réception des corps (uploads)
+# qui ne bloque pas la boucle d'événements (files.asgi)
+django.setup(set_prefix=False)
+
+from files.asgi import StreamingASGIHandler  # noqa: E402
+
+application = StreamingASGIHandler()
@@ -7,6 +7,7 @@ Ce fichier définit les paramètres essentiels du projet, notamment :
 - Paramètres de base de données
 - Authentification et autorisations
 - Configuration des fichiers statiques et médias
+- Cache
 - Internationalisation
 - Gestion des tests
 """
@@ -74,8 +75,65 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
+# Les fichiers reçus sont écrits sur le même disque que MEDIA_ROOT (renommés, jamais copiés)
+# en calculant SHA-256 et type MIME au passage (files.handlers)
+FILE_UPLOAD_HANDLERS = ['files.handlers.SinglePassUploadHandler']
+# Répertoire des fichiers reçus ; vide : `<MEDIA_ROOT>/.incoming`, résolu à l'usage (files.handlers)
+FILES_UPLOAD_INCOMING_DIR = os.getenv('FILES_UPLOAD_INCOMING_DIR') or None
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Stockage adressé par contenu : un contenu identique n'est écrit qu'une fois (files.blobs),
+# désactivé par défaut (puis `manage.py dedupe_files` pour les fichiers existants)
+FILES_DEDUPLICATION = os.getenv('FILES_DEDUPLICATION', 'False') == 'True'
+# Compression gzip au repos des fichiers texte et CSV (files.compression)
+FILES_COMPRESSION = os.getenv('FILES_COMPRESSION', 'False') == 'True'
+FILES_COMPRESSION_LEVEL = int(os.getenv('FILES_COMPRESSION_LEVEL', '6'))
+
+# Uploads reprenables par morceaux (files.uploads)
+FILE_UPLOAD_SESSION_MAX_SIZE = int(os.getenv('FILE_UPLOAD_SESSION_MAX_SIZE', str(2 * 1024 ** 3)))  # 2GB
+FILE_UPLOAD_SESSION_BUFFER_SIZE = 1024 * 1024  # 1MB
+FILE_UPLOAD_SESSION_TTL_HOURS = int(os.getenv('FILE_UPLOAD_SESSION_TTL_HOURS', '24'))
+
+# Quotas attribués aux nouvelles écoles (ecole.quotas) ; vide : illimité
+ECOLE_DEFAULT_STORAGE_QUOTA = int(os.getenv('ECOLE_DEFAULT_STORAGE_QUOTA') or 0) or None  # octets
+ECOLE_DEFAULT_FILES_QUOTA = int(os.getenv('ECOLE_DEFAULT_FILES_QUOTA') or 0) or None
+
+# Upload multiple (files.batch) : threads d'écriture des fichiers d'un lot
+FILES_UPLOAD_BATCH_WORKERS = int(os.getenv('FILES_UPLOAD_BATCH_WORKERS', '4'))
+
+# Téléchargements (files.downloads) : 'django' (Django lit et envoie le fichier),
+# 'x-accel-redirect' (nginx) ou 'x-sendfile' (Apache mod_xsendfile, lighttpd)
+FILES_DOWNLOAD_MODE = os.getenv('FILES_DOWNLOAD_MODE', 'django')
+# Location interne nginx (`internal;`) servant MEDIA_ROOT, utilisée en mode 'x-accel-redirect'
+FILES_DOWNLOAD_INTERNAL_PREFIX = os.getenv('FILES_DOWNLOAD_INTERNAL_PREFIX', '/protected-media/')
+# Sous ASGI, téléchargements produits par un itérateur asynchrone (files.downloads)
+FILES_ASYNC_STREAMING = os.getenv('FILES_ASYNC_STREAMING', 'True') == 'True'
+
+# -------------------------------
+# Cache
+# -------------------------------
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', ''),
+    }
+}
+
+# Durée de conservation (secondes) des détails d'école en cache
+ECOLE_DETAIL_CACHE_TIMEOUT = int(os.getenv('ECOLE_DETAIL_CACHE_TIMEOUT', '300'))
+# Durée de conservation (secondes) des statistiques de fichiers (files.stats),
+# invalidées à chaque upload ou suppression
+FILES_STATS_CACHE_TIMEOUT = int(os.getenv('FILES_STATS_CACHE_TIMEOUT', '3600'))
+
+# -------------------------------
+# Suppression des écoles en arrière-plan
+# -------------------------------
+ECOLE_DELETION_ASYNC = os.getenv('ECOLE_DELETION_ASYNC', 'True') == 'True'
+ECOLE_DELETION_BATCH_SIZE = int(os.getenv('ECOLE_DELETION_BATCH_SIZE', '500'))
+ECOLE_DELETION_WORKERS = int(os.getenv('ECOLE_DELETION_WORKERS', '8'))
+# Délai (secondes) sans lot traité après lequel une suppression `running` peut être reprise
+ECOLE_DELETION_LEASE_SECONDS = int(os.getenv('ECOLE_DELETION_LEASE_SECONDS', '300'))
+
 # -------------------------------
 # Middleware
 # -------------------------------
@@ -42,4 +42,11 @@ class EcoleConfig(AppConfig):
     """
 
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'ecole'
\ No newline at end of file
+    name = 'ecole'
+
+    def ready(self):
+        """Installe l'index plein texte SQLite après chaque migration (voir `ecole.search`)."""
+        from django.db.models.signals import post_migrate
+        from .search import install_sqlite_fts
+
+        post_migrate.connect(install_sqlite_fts, sender=self)
\ No newline at end of file
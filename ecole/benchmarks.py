@@ -0,0 +1,49 @@
+"""Outils communs aux commandes de benchmark du module Ecole.
+
+Fournit la génération d'écoles synthétiques (déterministe) utilisée par
+`bench_ecole_search` et `bench_ecole_serialization`.
+"""
+
+import random
+
+from django.db import transaction
+
+from .models import Ecole
+
+#: Éléments utilisés pour générer des noms d'écoles synthétiques.
+KINDS = ['École', 'Lycée', 'Institut', 'Collège', 'Académie']
+ADJECTIVES = ['Nationale', 'Supérieure', 'Pilote', 'Privée', 'Internationale', 'Moderne']
+CITIES = ['Tunis', 'Sousse', 'Sfax', 'Monastir', 'Bizerte', 'Gabès', 'Nabeul', 'Kairouan']
+
+
+def seed_ecoles(rows, batch_size=5000, stdout=None):
+    """
+    Complète la table des écoles avec des données synthétiques.
+
+    Args:
+        rows (int): Nombre total d'écoles visé.
+        batch_size (int): Nombre d'écoles insérées par transaction.
+        stdout (OutputWrapper | None): Sortie pour afficher la progression.
+    """
+    rng = random.Random(42)
+    missing = rows - Ecole.objects.count()
+    while missing > 0:
+        size = min(batch_size, missing)
+        batch = []
+        for _ in range(size):
+            city = rng.choice(CITIES)
+            batch.append(Ecole(
+                name=f"{rng.choice(KINDS)} {rng.choice(ADJECTIVES)} de {city} {rng.randint(1, 99999)}",
+                address=f"{rng.randint(1, 300)} Rue {rng.choice(ADJECTIVES)}",
+                city=city,
+                postal_code=f"{rng.randint(1000, 9999)}",
+                phone=f"+216 7{rng.randint(0, 9)} {rng.randint(100, 999)} {rng.randint(100, 999)}",
+                students_count=rng.randint(0, 3000),
+            ))
+        with transaction.atomic():
+            Ecole.objects.bulk_create(batch)
+        missing -= size
+        if stdout:
+            stdout.write(f"{rows - missing} / {rows} écoles", ending='\r')
+    if stdout:
+        stdout.write('')
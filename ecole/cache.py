@@ -0,0 +1,112 @@
+"""Cache de lecture des détails d'école et validateurs HTTP associés.
+
+Chaque école est mise en cache sous la clé `ecole:detail:{pk}` avec sa
+représentation sérialisée et ses validateurs (`ETag`, `Last-Modified`),
+dérivés de la clé primaire et de la version de l'enregistrement
+(`Ecole.updated_at`). Une requête conditionnelle (`If-None-Match`,
+`If-Modified-Since`) sur une entrée présente en cache est donc résolue
+sans accès à la base de données.
+
+Toute écriture sur une école (PUT, DELETE, import en masse) doit appeler
+`invalidate_ecole_detail`.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import http_date, parse_http_date_safe
+
+from .serializers import EcoleSerializer
+
+
+def ecole_detail_cache_key(pk):
+    """
+    Retourne la clé de cache du détail d'une école.
+
+    Args:
+        pk (int): Identifiant de l'école.
+
+    Returns:
+        str: Clé de cache.
+    """
+    return f'ecole:detail:{pk}'
+
+
+def cache_ecole_detail(ecole):
+    """
+    Sérialise une école et enregistre l'entrée dans le cache.
+
+    Args:
+        ecole (Ecole): École à mettre en cache.
+
+    Returns:
+        dict: Entrée contenant `data`, `etag` et `last_modified`.
+    """
+    version = int(ecole.updated_at.timestamp() * 1_000_000)
+    entry = {
+        'data': EcoleSerializer(ecole).data,
+        'etag': f'"{ecole.pk}-{version}"',
+        'last_modified': int(ecole.updated_at.timestamp()),
+    }
+    cache.set(ecole_detail_cache_key(ecole.pk), entry, settings.ECOLE_DETAIL_CACHE_TIMEOUT)
+    return entry
+
+
+def get_cached_ecole_detail(pk):
+    """
+    Retourne l'entrée en cache d'une école, ou `None` si absente.
+
+    Args:
+        pk (int): Identifiant de l'école.
+
+    Returns:
+        dict | None: Entrée de cache.
+    """
+    return cache.get(ecole_detail_cache_key(pk))
+
+
+def invalidate_ecole_detail(*pks):
+    """
+    Supprime du cache les détails des écoles données.
+
+    Args:
+        *pks (int): Identifiants des écoles modifiées ou supprimées.
+    """
+    cache.delete_many([ecole_detail_cache_key(pk) for pk in pks])
+
+
+def is_not_modified(request, entry):
+    """
+    Indique si la représentation connue du client est toujours valide.
+
+    `If-None-Match` est prioritaire sur `If-Modified-Since` (RFC 9110).
+
+    Args:
+        request (Request): Requête HTTP.
+        entry (dict): Entrée de cache de l'école.
+
+    Returns:
+        bool: `True` si une réponse 304 peut être renvoyée.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in etags or entry['etag'] in etags or f"W/{entry['etag']}" in etags
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and entry['last_modified'] <= if_modified_since
+
+
+def set_validators(response, entry):
+    """
+    Ajoute les en-têtes `ETag` et `Last-Modified` à une réponse.
+
+    Args:
+        response (Response): Réponse HTTP.
+        entry (dict): Entrée de cache de l'école.
+
+    Returns:
+        Response: La réponse modifiée.
+    """
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    return response
@@ -0,0 +1,167 @@
+"""Suppression en arrière-plan des écoles et de leurs fichiers.
+
+Supprimer une école en cascade dans la requête HTTP est long pour les
+écoles volumineuses, et la cascade SQL n'appelle pas `File.delete` : les
+fichiers physiques resteraient sur le disque. La suppression se fait donc
+en deux temps :
+
+1. `request_deletion` marque l'école (`deletion_requested_at`), ce qui la
+   masque de l'API, et crée un suivi `EcoleDeletion`.
+2. Après validation de la transaction, `run_deletion` supprime les lignes
+   `File` par lots puis leurs fichiers physiques en parallèle, met à jour
+   la progression, et supprime enfin l'école.
+
+Le traitement s'exécute dans un thread (`ECOLE_DELETION_ASYNC = True`) ou
+de façon synchrone. La commande `manage.py process_ecole_deletions` reprend
+les suppressions interrompues (redémarrage du serveur, etc.).
+
+Un seul processus traite un suivi à la fois : `run_deletion` l'acquiert par
+un bail (`EcoleDeletion.heartbeat_at`), renouvelé à chaque lot. Un suivi
+`running` n'est repris que si son bail a expiré
+(`ECOLE_DELETION_LEASE_SECONDS` sans lot traité), et un processus dont le
+bail a été repris s'arrête au lot suivant.
+"""
+
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from files.blobs import release_blobs
+from files.stats import invalidate_file_stats
+
+from .models import Ecole, EcoleDeletion
+
+logger = logging.getLogger(__name__)
+
+
+def request_deletion(ecole, user):
+    """
+    Marque une école pour suppression et planifie le traitement.
+
+    Args:
+        ecole (Ecole): École à supprimer.
+        user (User): Administrateur à l'origine de la demande.
+
+    Returns:
+        EcoleDeletion: Suivi de la suppression.
+    """
+    with transaction.atomic():
+        Ecole.objects.filter(pk=ecole.pk).update(deletion_requested_at=timezone.now())
+        job = EcoleDeletion.objects.create(
+            ecole_pk=ecole.pk,
+            ecole_name=ecole.name,
+            requested_by=user,
+            total_files=ecole.files_count,
+        )
+        # L'école disparaît des statistiques de fichiers dès la demande
+        invalidate_file_stats(ecole.pk)
+        transaction.on_commit(lambda: start_deletion(job.pk))
+    return job
+
+
+def start_deletion(job_id):
+    """
+    Lance le traitement d'une suppression, dans un thread si configuré.
+
+    Args:
+        job_id (int): Identifiant du suivi `EcoleDeletion`.
+    """
+    if settings.ECOLE_DELETION_ASYNC:
+        threading.Thread(target=_run_in_thread, args=(job_id,), daemon=True).start()
+    else:
+        run_deletion(job_id)
+
+
+def _run_in_thread(job_id):
+    """Exécute `run_deletion` en libérant la connexion du thread à la fin."""
+    try:
+        run_deletion(job_id)
+    finally:
+        close_old_connections()
+
+
+def _claim(job_id):
+    """
+    Acquiert le bail d'un suivi non terminé, libre ou expiré.
+
+    Args:
+        job_id (int): Identifiant du suivi `EcoleDeletion`.
+
+    Returns:
+        datetime | None: Date du bail acquis, `None` si un autre processus le détient.
+    """
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.ECOLE_DELETION_LEASE_SECONDS)
+    claimed = EcoleDeletion.objects.filter(
+        ~Q(status='running') | Q(heartbeat_at__isnull=True) | Q(heartbeat_at__lt=expired),
+        pk=job_id,
+    ).exclude(status='done').update(status='running', error='', heartbeat_at=now)
+    return now if claimed else None
+
+
+def run_deletion(job_id):
+    """
+    Supprime les fichiers d'une école par lots, puis l'école elle-même.
+
+    Chaque lot est lu et verrouillé (`select_for_update`) dans la transaction
+    qui supprime les lignes `File` et libère leurs blobs : deux traitements
+    concurrents ne peuvent pas supprimer ni libérer deux fois les mêmes
+    fichiers. Les autres fichiers physiques du lot sont supprimés ensuite en
+    parallèle (`ECOLE_DELETION_WORKERS` threads). En cas d'interruption, il
+    ne reste au pire que des fichiers orphelins, jamais de ligne pointant
+    vers un fichier supprimé.
+
+    Args:
+        job_id (int): Identifiant du suivi `EcoleDeletion`.
+
+    Returns:
+        bool: `False` si le suivi est terminé ou traité par un autre processus.
+    """
+    lease = _claim(job_id)
+    if lease is None:
+        return False
+    job = EcoleDeletion.objects.get(pk=job_id)
+
+    try:
+        ecole = Ecole.objects.filter(pk=job.ecole_pk).first()
+        if ecole is not None:
+            files = ecole.files.order_by('pk')
+            storage = files.model._meta.get_field('file').storage
+            with ThreadPoolExecutor(max_workers=settings.ECOLE_DELETION_WORKERS) as pool:
+                while True:
+                    with transaction.atomic():
+                        batch = list(
+                            files.select_for_update()
+                            .values_list('pk', 'file', 'blob_id')[:settings.ECOLE_DELETION_BATCH_SIZE]
+                        )
+                        if batch:
+                            files.filter(pk__in=[pk for pk, _, _ in batch]).delete()
+                            # Les contenus dédupliqués ne sont supprimés qu'à leur dernière référence
+                            release_blobs(Counter(blob_id for _, _, blob_id in batch if blob_id))
+                    if not batch:
+                        break
+                    list(pool.map(storage.delete, [name for _, name, blob_id in batch if name and not blob_id]))
+                    now = timezone.now()
+                    # Bail repris par un autre processus (expiré) : il poursuit la suppression
+                    if not EcoleDeletion.objects.filter(pk=job_id, heartbeat_at=lease).update(
+                        deleted_files=F('deleted_files') + len(batch), heartbeat_at=now
+                    ):
+                        return False
+                    lease = now
+            ecole.delete()
+    except Exception as exc:
+        logger.exception("Échec de la suppression de l'école %s", job.ecole_pk)
+        EcoleDeletion.objects.filter(pk=job_id, heartbeat_at=lease).update(status='failed', error=str(exc))
+        return True
+
+    EcoleDeletion.objects.filter(pk=job_id, heartbeat_at=lease).update(
+        status='done', finished_at=timezone.now()
+    )
+    return True
@@ -0,0 +1,99 @@
+"""Export en flux de la liste des écoles (CSV et NDJSON).
+
+Les lignes sont lues par un curseur côté serveur (`QuerySet.iterator`) et
+envoyées au client au fur et à mesure par une `StreamingHttpResponse` :
+la mémoire utilisée reste constante quel que soit le nombre d'écoles, et
+l'en-tête CSV part avant la première requête SQL.
+"""
+
+import csv
+import io
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+#: Colonnes exportées, dans l'ordre.
+EXPORT_FIELDS = ('id', 'name', 'address', 'city', 'postal_code', 'phone', 'students_count', 'created_at')
+
+#: Nombre de lignes lues par aller-retour avec la base.
+EXPORT_CHUNK_SIZE = 2000
+
+#: Encodeur commun aux deux formats : dates au format ECMA-262 de DRF
+#: (millisecondes, suffixe `Z` en UTC).
+_ENCODER = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def _format_created_at(value):
+    """
+    Formate la date de création comme l'export NDJSON.
+
+    Args:
+        value (datetime): Date de création de l'école.
+
+    Returns:
+        str: Date telle qu'écrite par `DjangoJSONEncoder`.
+    """
+    return _ENCODER.default(value)
+
+
+def _batched_rows(queryset, chunk_size):
+    """
+    Parcourt les écoles par lots de tuples, sans instancier de modèles.
+
+    Args:
+        queryset (QuerySet): Écoles à exporter.
+        chunk_size (int): Taille des lots.
+
+    Yields:
+        list[tuple]: Lot de lignes.
+    """
+    batch = []
+    rows = queryset.order_by('id').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Produit l'export CSV des écoles, un bloc de texte par lot de lignes.
+
+    Args:
+        queryset (QuerySet): Écoles à exporter.
+        chunk_size (int): Nombre de lignes par bloc.
+
+    Yields:
+        str: En-tête puis blocs de lignes CSV.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+
+    for batch in _batched_rows(queryset, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            row[:-1] + (_format_created_at(row[-1]),) for row in batch
+        )
+        yield buffer.getvalue()
+
+
+def iter_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Produit l'export NDJSON des écoles (un objet JSON par ligne).
+
+    Args:
+        queryset (QuerySet): Écoles à exporter.
+        chunk_size (int): Nombre de lignes par bloc.
+
+    Yields:
+        str: Blocs de lignes NDJSON.
+    """
+    for batch in _batched_rows(queryset, chunk_size):
+        yield ''.join(
+            _ENCODER.encode(dict(zip(EXPORT_FIELDS, row))) + '\n' for row in batch
+        )
@@ -0,0 +1,82 @@
+"""
+Commande `bench_ecole_search` : mesure de la latence de la recherche d'écoles.
+
+Mesure les percentiles p50/p99 de `ecole.search.search_ecoles` pour des
+recherches par préfixe et des recherches approchées (fautes de frappe),
+sur une table d'écoles éventuellement peuplée de données synthétiques.
+L'objectif est une latence inférieure à 10 ms sur 1M d'écoles.
+
+Usage :
+    python manage.py bench_ecole_search --seed --rows 1000000
+    python manage.py bench_ecole_search --iterations 500
+
+Note:
+    La recherche approchée n'est effective que sous PostgreSQL (`pg_trgm`) ;
+    sous SQLite, seules les recherches par préfixe de mots trouvent des résultats.
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from ecole.benchmarks import seed_ecoles
+from ecole.models import Ecole
+from ecole.search import search_ecoles
+
+#: Recherches mesurées, par catégorie.
+QUERIES = {
+    'prefix': ['Lyc', 'Inst Sou', 'Acad', 'Coll Pil', 'Ecole Nat'],
+    'fuzzy': ['Instiut', 'Lycé Pilote Sfx', 'Academie Moderen', 'Colege'],
+}
+
+#: Objectif de latence (millisecondes) au p99.
+TARGET_MS = 10
+
+
+class Command(BaseCommand):
+    """Mesure la latence de la recherche d'écoles par préfixe et approchée."""
+
+    help = "Mesure la latence (p50/p99) de la recherche d'écoles."
+
+    def add_arguments(self, parser):
+        """Déclare les options de la commande."""
+        parser.add_argument('--rows', type=int, default=1_000_000,
+                            help="Nombre d'écoles visé lors du peuplement (défaut : 1 000 000).")
+        parser.add_argument('--seed', action='store_true',
+                            help="Complète la table avec des écoles synthétiques jusqu'à --rows.")
+        parser.add_argument('--iterations', type=int, default=200,
+                            help="Nombre de recherches mesurées par catégorie (défaut : 200).")
+        parser.add_argument('--limit', type=int, default=20,
+                            help="Nombre de résultats lus par recherche (défaut : 20).")
+
+    def handle(self, *args, **options):
+        """Peuple la table si demandé puis mesure chaque catégorie de recherche."""
+        if options['seed']:
+            seed_ecoles(options['rows'], stdout=self.stdout)
+
+        self.stdout.write(
+            f"Moteur : {connection.vendor} — {Ecole.objects.count()} école(s)"
+        )
+        for label, terms in QUERIES.items():
+            timings = []
+            found = 0
+            for i in range(options['iterations']):
+                term = terms[i % len(terms)]
+                start = time.perf_counter()
+                ids = list(
+                    search_ecoles(Ecole.objects.order_by(), term)
+                    .values_list('id', flat=True)[:options['limit']]
+                )
+                timings.append((time.perf_counter() - start) * 1000)
+                found += len(ids)
+
+            timings.sort()
+            p50 = statistics.median(timings)
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            verdict = self.style.SUCCESS('OK') if p99 < TARGET_MS else self.style.WARNING('> objectif')
+            self.stdout.write(
+                f"{label:>6} : p50 = {p50:.2f} ms, p99 = {p99:.2f} ms, "
+                f"{found / len(timings):.1f} résultat(s) en moyenne [{verdict}]"
+            )
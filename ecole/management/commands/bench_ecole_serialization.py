@@ -0,0 +1,83 @@
+"""
+Commande `bench_ecole_serialization` : comparaison des chemins de sérialisation.
+
+Compare, pour plusieurs tailles de liste, le temps de production du JSON de
+`GET /api/ecoles/` par :
+
+- le chemin standard : `EcoleSerializer(many=True)` + `JSONRenderer` ;
+- le chemin rapide : `ecole.serializers.render_ecoles_json` (`?fast=1`).
+
+Les deux sorties sont comparées octet pour octet à chaque mesure.
+
+Usage :
+    python manage.py bench_ecole_serialization --seed
+    python manage.py bench_ecole_serialization --sizes 1000 10000 100000 --repeat 5
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from ecole.benchmarks import seed_ecoles
+from ecole.models import Ecole
+from ecole.serializers import EcoleSerializer, render_ecoles_json
+
+
+class Command(BaseCommand):
+    """Mesure le gain du chemin de sérialisation rapide des écoles."""
+
+    help = "Compare EcoleSerializer et render_ecoles_json sur 1k/10k/100k écoles."
+
+    def add_arguments(self, parser):
+        """Déclare les options de la commande."""
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help="Tailles de liste mesurées (défaut : 1000 10000 100000).")
+        parser.add_argument('--repeat', type=int, default=3,
+                            help="Nombre de mesures par taille ; le meilleur temps est retenu.")
+        parser.add_argument('--seed', action='store_true',
+                            help="Complète la table avec des écoles synthétiques si nécessaire.")
+
+    def handle(self, *args, **options):
+        """Mesure les deux chemins pour chaque taille et affiche le gain."""
+        largest = max(options['sizes'])
+        if options['seed']:
+            seed_ecoles(largest, stdout=self.stdout)
+        if Ecole.objects.count() < largest:
+            raise CommandError(f"Moins de {largest} écoles en base (utilisez --seed).")
+
+        renderer = JSONRenderer()
+        for size in options['sizes']:
+            queryset = Ecole.objects.order_by('id')[:size]
+
+            standard, standard_output = self.best_of(
+                options['repeat'],
+                lambda: renderer.render(EcoleSerializer(queryset, many=True).data),
+            )
+            fast, fast_output = self.best_of(options['repeat'], lambda: render_ecoles_json(queryset))
+
+            if standard_output != fast_output:
+                raise CommandError(f"Sorties différentes pour {size} écoles.")
+            self.stdout.write(
+                f"{size:>7} écoles : EcoleSerializer = {standard:8.1f} ms, "
+                f"rapide = {fast:8.1f} ms, gain x{standard / fast:.1f}"
+            )
+
+    def best_of(self, repeat, func):
+        """
+        Exécute `func` plusieurs fois et retourne le meilleur temps.
+
+        Args:
+            repeat (int): Nombre d'exécutions.
+            func (callable): Fonction mesurée.
+
+        Returns:
+            tuple[float, bytes]: Meilleur temps (ms) et dernière sortie.
+        """
+        best = float('inf')
+        output = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = func()
+            best = min(best, (time.perf_counter() - start) * 1000)
+        return best, output
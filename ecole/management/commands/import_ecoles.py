@@ -0,0 +1,209 @@
+"""
+Commande `import_ecoles` : import massif d'écoles depuis un fichier CSV.
+
+Le fichier doit contenir une ligne d'en-tête avec au moins les colonnes
+`name`, `address`, `city`, `postal_code` et `phone`. Chaque lot de lignes
+est validé par `ecole.validators.clean_ecole_row` (mêmes règles que
+`EcoleSerializer`, sans instancier de sérialiseur), puis chargé :
+
+- sous PostgreSQL, par `COPY ... FROM STDIN` ;
+- sous les autres moteurs, par `bulk_create`.
+
+Chaque lot est écrit dans sa propre transaction, avec le point de reprise
+(*checkpoint*, `EcoleImportCheckpoint`) : une exécution interrompue reprend
+après le dernier lot validé, sans jamais le rejouer. Les lignes rejetées sont
+écrites dans un fichier CSV avec leurs erreurs ; après une interruption, les
+rejets du lot non validé peuvent y figurer deux fois.
+
+Usage :
+    python manage.py import_ecoles ecoles.csv
+    python manage.py import_ecoles ecoles.csv --batch-size 20000 --rejects rejets.csv
+    python manage.py import_ecoles ecoles.csv --restart
+"""
+
+import csv
+import io
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from ecole.models import Ecole, EcoleImportCheckpoint
+from ecole.validators import clean_ecole_row
+
+
+class Command(BaseCommand):
+    """Importe des écoles depuis un CSV par lots, avec reprise et rejets."""
+
+    help = "Importe des écoles depuis un fichier CSV (COPY sous PostgreSQL, bulk_create sinon)."
+
+    def add_arguments(self, parser):
+        """Déclare les arguments et options de la commande."""
+        parser.add_argument('path', help="Chemin du fichier CSV à importer.")
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help="Nombre de lignes par transaction (défaut : 10 000).")
+        parser.add_argument('--checkpoint',
+                            help="Clé du point de reprise en base (défaut : chemin absolu du fichier).")
+        parser.add_argument('--rejects',
+                            help="Fichier CSV des lignes rejetées (défaut : <fichier>.rejects.csv).")
+        parser.add_argument('--delimiter', default=',',
+                            help="Séparateur de colonnes du CSV (défaut : ',').")
+        parser.add_argument('--restart', action='store_true',
+                            help="Ignore le point de reprise existant et recommence au début.")
+
+    def handle(self, *args, **options):
+        """Lit le CSV par lots, valide, charge et enregistre la progression."""
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f"Fichier introuvable : {path}")
+
+        key = options['checkpoint'] or os.path.abspath(path)
+        rejects_path = options['rejects'] or f"{path}.rejects.csv"
+        progress = {'line': 0, 'imported': 0, 'rejected': 0}
+        if options['restart']:
+            EcoleImportCheckpoint.objects.filter(key=key).delete()
+        else:
+            progress.update(self.read_checkpoint(key, path))
+
+        columns = [f for f in Ecole._meta.concrete_fields if not f.primary_key]
+        load = self.copy_rows if connection.vendor == 'postgresql' else self.bulk_create_rows
+
+        with open(path, newline='', encoding='utf-8-sig') as source:
+            reader = csv.DictReader(source, delimiter=options['delimiter'])
+            resuming = progress['line'] > 0
+            with open(rejects_path, 'a' if resuming else 'w', newline='', encoding='utf-8') as rejects_file:
+                rejects = csv.writer(rejects_file)
+                if not resuming:
+                    rejects.writerow(['line', *(reader.fieldnames or []), 'errors'])
+
+                # Reprise : les lignes déjà traitées sont lues sans être validées
+                for _ in range(progress['line']):
+                    if next(reader, None) is None:
+                        break
+
+                while True:
+                    batch = [row for _, row in zip(range(options['batch_size']), reader)]
+                    if not batch:
+                        break
+
+                    valid = []
+                    for offset, row in enumerate(batch, start=progress['line'] + 1):
+                        data, errors = clean_ecole_row(row)
+                        if errors:
+                            rejects.writerow([offset, *row.values(), json.dumps(errors, ensure_ascii=False)])
+                        else:
+                            valid.append(data)
+
+                    rejects_file.flush()
+                    batch_progress = {
+                        'line': progress['line'] + len(batch),
+                        'imported': progress['imported'] + len(valid),
+                        'rejected': progress['rejected'] + len(batch) - len(valid),
+                    }
+                    with transaction.atomic():
+                        load(columns, valid)
+                        self.write_checkpoint(key, path, batch_progress)
+                    progress = batch_progress
+                    self.stdout.write(
+                        f"{progress['line']} ligne(s) traitée(s), "
+                        f"{progress['imported']} importée(s), {progress['rejected']} rejetée(s)"
+                    )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Import terminé : {progress['imported']} école(s) importée(s), "
+            f"{progress['rejected']} ligne(s) rejetée(s) (voir {rejects_path})."
+        ))
+
+    def row_defaults(self, columns):
+        """
+        Calcule les valeurs par défaut des colonnes absentes du CSV.
+
+        Les champs `auto_now` / `auto_now_add` reçoivent l'heure courante,
+        qui n'est pas appliquée par `COPY`.
+
+        Args:
+            columns (list[Field]): Colonnes chargées.
+
+        Returns:
+            dict: Valeur par défaut par nom d'attribut.
+        """
+        now = timezone.now()
+        defaults = {}
+        for field in columns:
+            if isinstance(field, models.DateTimeField) and (field.auto_now or field.auto_now_add):
+                defaults[field.attname] = now
+            else:
+                defaults[field.attname] = field.get_default()
+        return defaults
+
+    def copy_rows(self, columns, rows):
+        """
+        Charge un lot de lignes validées par `COPY ... FROM STDIN` (PostgreSQL).
+
+        Args:
+            columns (list[Field]): Colonnes de la table `Ecole` (hors clé primaire).
+            rows (list[dict]): Lignes validées.
+        """
+        if not rows:
+            return
+        defaults = self.row_defaults(columns)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row.get(field.attname, defaults[field.attname]) for field in columns])
+        buffer.seek(0)
+
+        quote = connection.ops.quote_name
+        sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+            quote(Ecole._meta.db_table),
+            ', '.join(quote(field.column) for field in columns),
+        )
+        with connection.cursor() as cursor:
+            cursor.copy_expert(sql, buffer)
+
+    def bulk_create_rows(self, columns, rows):
+        """
+        Charge un lot de lignes validées par `bulk_create` (repli hors PostgreSQL).
+
+        Args:
+            columns (list[Field]): Colonnes de la table `Ecole` (inutilisées ici).
+            rows (list[dict]): Lignes validées.
+        """
+        Ecole.objects.bulk_create([Ecole(**row) for row in rows], batch_size=1000)
+
+    def read_checkpoint(self, key, path):
+        """
+        Lit le point de reprise d'un import précédent du même fichier.
+
+        Args:
+            key (str): Clé du point de reprise.
+            path (str): Chemin du fichier importé.
+
+        Returns:
+            dict: Progression enregistrée (vide si aucune reprise possible).
+        """
+        checkpoint = EcoleImportCheckpoint.objects.filter(key=key).first()
+        if checkpoint is None:
+            return {}
+        if checkpoint.source != os.path.abspath(path):
+            raise CommandError(
+                f"Le point de reprise {key} concerne un autre fichier "
+                "(utilisez --restart ou --checkpoint)."
+            )
+        self.stdout.write(f"Reprise après la ligne {checkpoint.line}.")
+        return {'line': checkpoint.line, 'imported': checkpoint.imported, 'rejected': checkpoint.rejected}
+
+    def write_checkpoint(self, key, path, progress):
+        """
+        Enregistre la progression, dans la transaction du lot chargé.
+
+        Args:
+            key (str): Clé du point de reprise.
+            path (str): Chemin du fichier importé.
+            progress (dict): Progression après le lot.
+        """
+        EcoleImportCheckpoint.objects.update_or_create(
+            key=key, defaults={'source': os.path.abspath(path), **progress}
+        )
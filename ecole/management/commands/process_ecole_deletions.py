@@ -0,0 +1,57 @@
+"""
+Commande `process_ecole_deletions` : reprise des suppressions d'écoles.
+
+Les suppressions sont normalement traitées en arrière-plan dès la demande
+(`DELETE /api/ecoles/<id>/`). Si le processus a été interrompu (redémarrage
+du serveur, erreur), les suivis restent `pending`, `running` ou `failed` :
+cette commande les traite de façon synchrone. Un suivi `running` n'est repris
+que si son bail a expiré (`ECOLE_DELETION_LEASE_SECONDS`) : une suppression
+encore en cours dans un autre processus n'est pas rejouée.
+
+Usage :
+    python manage.py process_ecole_deletions
+    python manage.py process_ecole_deletions --retry-failed
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from ecole.deletion import run_deletion
+from ecole.models import EcoleDeletion
+
+
+class Command(BaseCommand):
+    """Traite les suppressions d'écoles en attente ou interrompues."""
+
+    help = "Reprend les suppressions d'écoles en attente ou interrompues."
+
+    def add_arguments(self, parser):
+        """Déclare les options de la commande."""
+        parser.add_argument('--retry-failed', action='store_true',
+                            help="Relance aussi les suppressions en échec.")
+
+    def handle(self, *args, **options):
+        """Exécute `run_deletion` pour chaque suivi non terminé."""
+        statuses = ['pending']
+        if options['retry_failed']:
+            statuses.append('failed')
+        expired = timezone.now() - timedelta(seconds=settings.ECOLE_DELETION_LEASE_SECONDS)
+        jobs = EcoleDeletion.objects.filter(
+            Q(status__in=statuses)
+            | Q(status='running', heartbeat_at__isnull=True)
+            | Q(status='running', heartbeat_at__lt=expired)
+        ).order_by('created_at')
+        for job_id in jobs.values_list('pk', flat=True):
+            if not run_deletion(job_id):
+                # Bail acquis entre-temps par un autre processus
+                continue
+            job = EcoleDeletion.objects.get(pk=job_id)
+            self.stdout.write(
+                f"École {job.ecole_pk} ({job.ecole_name}) : {job.status}, "
+                f"{job.deleted_files}/{job.total_files} fichier(s) supprimé(s)"
+            )
+        self.stdout.write(self.style.SUCCESS("Suppressions traitées."))
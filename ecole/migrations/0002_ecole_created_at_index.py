@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-16 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecole', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ecole',
+            index=models.Index(fields=['created_at', 'id'], name='ecole_ecole_created_f27b7c_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-16 20:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecole', '0002_ecole_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ecole',
+            name='files_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ecole',
+            name='storage_used',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='EcoleFileStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_type', models.CharField(max_length=20)),
+                ('files_count', models.PositiveIntegerField(default=0)),
+                ('total_size', models.PositiveBigIntegerField(default=0)),
+                ('ecole', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='file_stats', to='ecole.ecole')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('ecole', 'file_type'), name='unique_ecole_file_type_stats')],
+            },
+        ),
+    ]
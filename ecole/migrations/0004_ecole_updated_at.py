@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-16 21:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecole', '0003_ecole_file_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ecole',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-16 20:59
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Crée les index GIN trigrammes sous PostgreSQL (voir `ecole.search`)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS ecole_name_trgm_idx ON ecole_ecole USING gin (name gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS ecole_city_trgm_idx ON ecole_ecole USING gin (city gin_trgm_ops)"
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    """Supprime les index GIN trigrammes sous PostgreSQL."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS ecole_name_trgm_idx")
+    schema_editor.execute("DROP INDEX IF EXISTS ecole_city_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecole', '0004_ecole_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ecole',
+            name='postal_code',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='ecole',
+            index=models.Index(django.db.models.functions.text.Upper('city'), name='ecole_city_upper_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
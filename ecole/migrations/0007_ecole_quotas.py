@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:49
+
+import ecole.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecole', '0006_ecole_deletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ecole',
+            name='files_quota',
+            field=models.PositiveIntegerField(blank=True, default=ecole.models.default_files_quota, null=True),
+        ),
+        migrations.AddField(
+            model_name='ecole',
+            name='files_reserved',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ecole',
+            name='storage_quota',
+            field=models.PositiveBigIntegerField(blank=True, default=ecole.models.default_storage_quota, null=True),
+        ),
+        migrations.AddField(
+            model_name='ecole',
+            name='storage_reserved',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecole', '0008_ecole_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ecoledeletion',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
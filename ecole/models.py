@@ -1,4 +1,30 @@
+from django.conf import settings
 from django.db import models
+from django.db.models.functions import Upper
+
+
+def default_storage_quota():
+    """Quota de volume attribué aux nouvelles écoles (`ECOLE_DEFAULT_STORAGE_QUOTA`)."""
+    return settings.ECOLE_DEFAULT_STORAGE_QUOTA
+
+
+def default_files_quota():
+    """Quota de fichiers attribué aux nouvelles écoles (`ECOLE_DEFAULT_FILES_QUOTA`)."""
+    return settings.ECOLE_DEFAULT_FILES_QUOTA
+
+
+class EcoleQuerySet(models.QuerySet):
+    """QuerySet des écoles."""
+
+    def active(self):
+        """
+        Exclut les écoles dont la suppression est en cours.
+
+        Returns:
+            QuerySet: Écoles visibles dans l'API.
+        """
+        return self.filter(deletion_requested_at__isnull=True)
+
 
 class Ecole(models.Model):
     """Représente une école dans le système de gestion.
@@ -14,16 +40,162 @@ class Ecole(models.Model):
         phone (str): Le numéro de téléphone de contact de l'école.
         students_count (int): Le nombre d'étudiants inscrits.
         created_at (datetime): La date de création de l'enregistrement.
+        updated_at (datetime): La date de dernière modification (version de l'enregistrement).
+        files_count (int): Nombre de fichiers rattachés (compteur dénormalisé).
+        storage_used (int): Volume total des fichiers en octets (compteur dénormalisé).
+        files_quota (int | None): Nombre maximal de fichiers (`None` : illimité).
+        storage_quota (int | None): Volume maximal en octets (`None` : illimité).
+        files_reserved (int): Fichiers en cours d'upload, réservés sur le quota.
+        storage_reserved (int): Octets en cours d'upload, réservés sur le quota.
+        deletion_requested_at (datetime | None): Date de la demande de suppression ;
+            l'école est masquée de l'API jusqu'à sa suppression effective en arrière-plan.
     """
 
     name = models.CharField(max_length=100)
     address = models.CharField(max_length=255)
     city = models.CharField(max_length=100)
-    postal_code = models.CharField(max_length=100)
+    postal_code = models.CharField(max_length=100, db_index=True)
     phone = models.CharField(max_length=100)
     students_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Agrégats maintenus par `files.models.File` (voir `ecole.stats`)
+    files_count = models.PositiveIntegerField(default=0)
+    storage_used = models.PositiveBigIntegerField(default=0)
+
+    # Quotas et réservations des uploads en cours (voir `ecole.quotas`)
+    files_quota = models.PositiveIntegerField(null=True, blank=True, default=default_files_quota)
+    storage_quota = models.PositiveBigIntegerField(null=True, blank=True, default=default_storage_quota)
+    files_reserved = models.PositiveIntegerField(default=0)
+    storage_reserved = models.PositiveBigIntegerField(default=0)
+
+    deletion_requested_at = models.DateTimeField(null=True, blank=True)
+
+    objects = EcoleQuerySet.as_manager()
+
+    class Meta:
+        """Options Meta pour le modèle Ecole."""
+        indexes = [
+            # Sert la pagination par curseur triée par date de création
+            models.Index(fields=['created_at', 'id']),
+            # Sert le filtre `?city=` (comparaison insensible à la casse)
+            models.Index(Upper('city'), name='ecole_city_upper_idx'),
+        ]
 
     def __str__(self):
         """Retourne le nom de l'école sous forme de chaîne."""
         return self.name
+
+
+class EcoleFileStats(models.Model):
+    """Compteurs de fichiers d'une école pour un type de fichier donné.
+
+    Table compagnon de `Ecole`, mise à jour de façon atomique (expressions `F()`)
+    à chaque création ou suppression d'un `files.models.File`. Elle permet
+    d'afficher la répartition par type sans `GROUP BY` sur la table des fichiers.
+
+    Attributes:
+        ecole (Ecole): L'école concernée.
+        file_type (str): Type de fichier (`pdf`, `image`, ...).
+        files_count (int): Nombre de fichiers de ce type.
+        total_size (int): Volume total en octets des fichiers de ce type.
+    """
+
+    ecole = models.ForeignKey(
+        Ecole,
+        on_delete=models.CASCADE,
+        related_name='file_stats'
+    )
+    file_type = models.CharField(max_length=20)
+    files_count = models.PositiveIntegerField(default=0)
+    total_size = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        """Options Meta pour le modèle EcoleFileStats."""
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ecole', 'file_type'],
+                name='unique_ecole_file_type_stats'
+            ),
+        ]
+
+    def __str__(self):
+        """Retourne l'école et le type de fichier concernés."""
+        return f"{self.ecole_id} - {self.file_type}"
+
+
+class EcoleDeletion(models.Model):
+    """Suivi de la suppression en arrière-plan d'une école et de ses fichiers.
+
+    La ligne survit à l'école supprimée : elle référence l'école par son
+    identifiant (`ecole_pk`) et non par une clé étrangère.
+
+    Attributes:
+        ecole_pk (int): Identifiant de l'école supprimée.
+        ecole_name (str): Nom de l'école au moment de la demande.
+        requested_by (User | None): Administrateur ayant demandé la suppression.
+        status (str): État du traitement (`pending`, `running`, `done`, `failed`).
+        total_files (int): Nombre de fichiers à supprimer (estimation initiale).
+        deleted_files (int): Nombre de fichiers déjà supprimés.
+        error (str): Message d'erreur si le traitement a échoué.
+        heartbeat_at (datetime | None): Bail du processus qui traite la
+            suppression, renouvelé à chaque lot (voir `ecole.deletion`).
+        created_at (datetime): Date de la demande.
+        finished_at (datetime | None): Date de fin du traitement.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminée'),
+        ('failed', 'Échouée'),
+    ]
+
+    ecole_pk = models.BigIntegerField(db_index=True)
+    ecole_name = models.CharField(max_length=100)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='ecole_deletions'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total_files = models.PositiveIntegerField(default=0)
+    deleted_files = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        """Retourne l'école concernée et l'état du traitement."""
+        return f"{self.ecole_name} ({self.status})"
+
+
+class EcoleImportCheckpoint(models.Model):
+    """Point de reprise d'un import `import_ecoles`.
+
+    La ligne est mise à jour dans la transaction de chaque lot chargé : la
+    progression enregistrée correspond toujours exactement aux écoles
+    importées, et une reprise ne rejoue jamais un lot validé.
+
+    Attributes:
+        key (str): Clé du point de reprise (par défaut, chemin absolu du fichier).
+        source (str): Chemin absolu du fichier importé.
+        line (int): Nombre de lignes de données traitées.
+        imported (int): Nombre d'écoles importées.
+        rejected (int): Nombre de lignes rejetées.
+        updated_at (datetime): Date du dernier lot validé.
+    """
+
+    key = models.CharField(max_length=500, unique=True)
+    source = models.CharField(max_length=500)
+    line = models.PositiveBigIntegerField(default=0)
+    imported = models.PositiveBigIntegerField(default=0)
+    rejected = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """Retourne la clé et la progression de l'import."""
+        return f"{self.key} ({self.line} ligne(s))"
@@ -0,0 +1,54 @@
+"""Pagination par curseur pour l'API des écoles.
+
+Ce module fournit une pagination de type *keyset* (curseur) pour la liste
+des écoles. Contrairement à `PageNumberPagination`, elle n'exécute aucun
+`COUNT(*)` et ne repose pas sur un `OFFSET` : chaque page est obtenue par
+une condition `WHERE` sur la colonne de tri, servie par un index. Une page
+profonde coûte donc autant que la première.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class EcoleCursorPagination(CursorPagination):
+    """Pagination par curseur opaque pour `GET /api/ecoles/`.
+
+    Activée avec le paramètre `?pagination=cursor`. Les liens `next` et
+    `previous` contiennent un curseur encodé (`?cursor=...`) qui conserve
+    les autres paramètres de la requête.
+
+    Attributes:
+        ordering (str): Tri par défaut (clé primaire, indexée).
+        allowed_orderings (tuple): Tris acceptés via `?ordering=`. Chacun est
+            couvert par un index (`id` ou `(created_at, id)`).
+        page_size_query_param (str): Paramètre permettant de choisir la taille de page.
+        max_page_size (int): Taille de page maximale autorisée.
+    """
+
+    ordering = 'id'
+    allowed_orderings = ('id', '-id', 'created_at', '-created_at')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Retourne le tri à appliquer, limité aux colonnes indexées.
+
+        Le tri sur `created_at` est complété par `id` pour départager les
+        écoles créées au même instant.
+
+        Args:
+            request (Request): Requête HTTP.
+            queryset (QuerySet): Queryset à paginer.
+            view (APIView | None): Vue appelante.
+
+        Returns:
+            tuple: Champs de tri.
+        """
+        ordering = request.query_params.get('ordering', self.ordering)
+        if ordering not in self.allowed_orderings:
+            ordering = self.ordering
+        if ordering.lstrip('-') == 'id':
+            return (ordering,)
+        tie_breaker = '-id' if ordering.startswith('-') else 'id'
+        return (ordering, tie_breaker)
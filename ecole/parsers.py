@@ -0,0 +1,53 @@
+"""Parseurs spécifiques à l'API des écoles.
+
+Ce module fournit un parseur NDJSON (*newline-delimited JSON*) utilisé par
+l'endpoint d'import en masse : chaque ligne du corps de la requête est un
+objet JSON représentant une école.
+"""
+
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parseur pour les corps `application/x-ndjson`.
+
+    Le flux est lu ligne par ligne ; les lignes vides sont ignorées.
+
+    Returns:
+        list: Liste des objets décodés, dans l'ordre des lignes.
+
+    Raises:
+        ParseError: Si une ligne ne contient pas un JSON valide.
+    """
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Décode chaque ligne du flux en objet JSON.
+
+        Args:
+            stream: Flux binaire du corps de la requête.
+            media_type (str): Type de contenu de la requête.
+            parser_context (dict): Contexte fourni par DRF.
+
+        Returns:
+            list: Objets décodés.
+        """
+        if stream is None:
+            return []
+
+        items = []
+        for lineno, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as exc:
+                raise ParseError(f"Ligne {lineno} : JSON invalide ({exc})")
+        return items
@@ -0,0 +1,123 @@
+"""Quotas de stockage par école (volume et nombre de fichiers).
+
+Chaque école peut être limitée en octets (`Ecole.storage_quota`) et en
+nombre de fichiers (`Ecole.files_quota`) ; `None` signifie « illimité ». Le
+contrôle s'appuie sur les compteurs dénormalisés (`files_count`,
+`storage_used`, voir `ecole.stats`) et sur des compteurs de réservations
+(`files_reserved`, `storage_reserved`), sans jamais agréger la table des
+fichiers :
+
+- `reserve_quota` réserve la place d'un upload par un seul
+  `UPDATE ... WHERE utilisé + réservé + demande <= quota` : deux uploads
+  concurrents ne peuvent pas dépasser ensemble le quota ;
+- `release_quota` libère la réservation une fois le fichier enregistré (il
+  est alors compté dans `storage_used`) ou l'upload abandonné.
+
+Une réservation est un `UPDATE` exécuté dans la transaction en cours : les
+vues l'appellent hors transaction (autocommit), pour qu'elle soit validée
+immédiatement et visible des uploads concurrents. Sous un `atomic()`
+englobant, le verrou de la ligne `Ecole` serait conservé jusqu'à la fin de
+l'upload. Entre
+l'enregistrement du fichier et la libération, l'upload est compté deux fois :
+le contrôle est alors plus strict, jamais plus permissif.
+"""
+
+from contextlib import contextmanager
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Ecole
+
+
+class QuotaExceeded(APIException):
+    """L'upload dépasserait le quota de l'école."""
+
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Quota de stockage de l'école dépassé."
+    default_code = 'quota_exceeded'
+
+
+def reserve_quota(ecole_id, files, size):
+    """
+    Réserve la place d'un upload si les quotas de l'école le permettent.
+
+    Args:
+        ecole_id (int): Identifiant de l'école.
+        files (int): Nombre de fichiers à réserver.
+        size (int): Volume à réserver, en octets.
+
+    Raises:
+        QuotaExceeded: Si l'un des quotas serait dépassé.
+    """
+    updated = Ecole.objects.filter(
+        Q(storage_quota__isnull=True)
+        | Q(storage_quota__gte=F('storage_used') + F('storage_reserved') + size),
+        Q(files_quota__isnull=True)
+        | Q(files_quota__gte=F('files_count') + F('files_reserved') + files),
+        pk=ecole_id,
+    ).update(
+        files_reserved=F('files_reserved') + files,
+        storage_reserved=F('storage_reserved') + size,
+    )
+    if not updated:
+        raise QuotaExceeded(_exceeded_detail(ecole_id, files, size))
+
+
+def release_quota(ecole_id, files, size):
+    """
+    Libère une réservation (upload enregistré ou abandonné).
+
+    Les compteurs ne descendent jamais sous zéro, même après un recalcul
+    (`rebuild_ecole_stats`) intervenu pendant l'upload.
+
+    Args:
+        ecole_id (int): Identifiant de l'école.
+        files (int): Nombre de fichiers réservés.
+        size (int): Volume réservé, en octets.
+    """
+    Ecole.objects.filter(pk=ecole_id).update(
+        files_reserved=Greatest(F('files_reserved') - files, Value(0)),
+        storage_reserved=Greatest(F('storage_reserved') - size, Value(0)),
+    )
+
+
+@contextmanager
+def quota_reservation(ecole_id, files, size):
+    """
+    Réserve la place d'un upload pendant son traitement.
+
+    Args:
+        ecole_id (int): Identifiant de l'école.
+        files (int): Nombre de fichiers de l'upload.
+        size (int): Volume de l'upload, en octets.
+
+    Raises:
+        QuotaExceeded: Si l'un des quotas serait dépassé (avant tout traitement).
+    """
+    reserve_quota(ecole_id, files, size)
+    try:
+        yield
+    finally:
+        release_quota(ecole_id, files, size)
+
+
+def _exceeded_detail(ecole_id, files, size):
+    """Message d'erreur indiquant le quota dépassé (lecture des seuls compteurs)."""
+    ecole = Ecole.objects.filter(pk=ecole_id).only(
+        'files_count', 'files_reserved', 'files_quota',
+        'storage_used', 'storage_reserved', 'storage_quota',
+    ).first()
+    if ecole is None:
+        return QuotaExceeded.default_detail
+    if ecole.files_quota is not None and ecole.files_count + ecole.files_reserved + files > ecole.files_quota:
+        return (
+            f"Quota de fichiers de l'école dépassé : {ecole.files_count} fichier(s) "
+            f"(+ {ecole.files_reserved} en cours) sur {ecole.files_quota}."
+        )
+    return (
+        f"Quota de stockage de l'école dépassé : {ecole.storage_used} octet(s) "
+        f"(+ {ecole.storage_reserved} en cours) sur {ecole.storage_quota}, {size} demandé(s)."
+    )
@@ -0,0 +1,47 @@
+"""Renderers des formats d'export des écoles.
+
+Ces renderers déclarent les formats `csv` et `ndjson` auprès de la
+négociation de contenu de DRF (paramètre `?format=` ou en-tête `Accept`).
+L'export lui-même est produit en flux par `ecole.export` ; les renderers
+ne servent qu'à sérialiser les réponses d'erreur (401, 403, ...).
+"""
+
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class _ErrorRenderer(BaseRenderer):
+    """Sérialise les réponses non streamées (erreurs) en JSON compact."""
+
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Sérialise `data` en JSON.
+
+        Args:
+            data: Données de la réponse.
+            accepted_media_type (str): Type négocié.
+            renderer_context (dict): Contexte fourni par DRF.
+
+        Returns:
+            bytes: Corps de la réponse.
+        """
+        if data is None:
+            return b''
+        return json.dumps(data, ensure_ascii=False).encode(self.charset)
+
+
+class CSVRenderer(_ErrorRenderer):
+    """Format `csv` (`text/csv`)."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(_ErrorRenderer):
+    """Format `ndjson` (`application/x-ndjson`)."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
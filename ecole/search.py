@@ -0,0 +1,167 @@
+"""Recherche et filtrage indexés des écoles.
+
+La recherche plein texte (`?q=`) dépend du moteur de base de données :
+
+- **PostgreSQL** : index GIN trigrammes (`pg_trgm`) sur `name` et `city`,
+  créés par la migration `0005_ecole_search_indexes`. Ils servent les
+  recherches par sous-chaîne (`ILIKE`) et la recherche approchée
+  (opérateur de similarité `%`).
+- **SQLite** : table virtuelle FTS5 `ecole_ecole_fts` synchronisée par
+  triggers, utilisée pour la recherche par préfixe de mots. Elle est
+  (re)créée après chaque `migrate` par `install_sqlite_fts`, car SQLite
+  supprime les triggers lorsqu'une migration reconstruit la table.
+- **Autres moteurs** : repli sur `icontains`.
+
+Les filtres `?city=` (égalité insensible à la casse) et `?postal_code=`
+(préfixe) s'appuient sur des index B-tree classiques.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+#: Nom de la table virtuelle FTS5 utilisée sous SQLite.
+FTS_TABLE = 'ecole_ecole_fts'
+
+_SQLITE_FTS_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON ecole_ecole BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, city) VALUES (new.id, new.name, new.city);
+        END
+    """,
+    f'{FTS_TABLE}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON ecole_ecole BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, city)
+            VALUES ('delete', old.id, old.name, old.city);
+        END
+    """,
+    f'{FTS_TABLE}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, city ON ecole_ecole BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, city)
+            VALUES ('delete', old.id, old.name, old.city);
+            INSERT INTO {FTS_TABLE}(rowid, name, city) VALUES (new.id, new.name, new.city);
+        END
+    """,
+}
+
+
+def install_sqlite_fts(using='default', **kwargs):
+    """
+    Crée la table FTS5 et ses triggers sous SQLite s'ils sont absents.
+
+    Branchée sur le signal `post_migrate` : si un trigger manque (table
+    reconstruite par une migration), l'index plein texte est recalculé.
+
+    Args:
+        using (str): Alias de la base de données migrée.
+        **kwargs: Arguments du signal `post_migrate`.
+    """
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return
+
+    with conn.cursor() as cursor:
+        tables = conn.introspection.table_names(cursor)
+        if 'ecole_ecole' not in tables:
+            return
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "name, city, content='ecole_ecole', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in _SQLITE_FTS_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(_SQLITE_FTS_TRIGGERS[name])
+        if missing:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def _fts5_prefix_query(text):
+    """
+    Construit une expression MATCH FTS5 : chaque mot devient un préfixe.
+
+    Args:
+        text (str): Texte saisi par l'utilisateur.
+
+    Returns:
+        str: Expression MATCH (vide si aucun mot).
+    """
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _like_pattern(text):
+    """Échappe les jokers LIKE et encadre le texte par `%`."""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def search_ecoles(queryset, text):
+    """
+    Filtre les écoles dont le nom ou la ville correspond au texte recherché.
+
+    Args:
+        queryset (QuerySet): Écoles à filtrer.
+        text (str): Texte recherché.
+
+    Returns:
+        QuerySet: Écoles correspondantes.
+    """
+    text = text.strip()
+    if not text:
+        return queryset
+
+    if connection.vendor == 'postgresql':
+        return queryset.filter(pk__in=RawSQL(
+            "SELECT id FROM ecole_ecole "
+            "WHERE name ILIKE %s OR city ILIKE %s OR name %% %s",
+            (_like_pattern(text), _like_pattern(text), text),
+        ))
+
+    if connection.vendor == 'sqlite':
+        match = _fts5_prefix_query(text)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            (match,),
+        ))
+
+    return queryset.filter(Q(name__icontains=text) | Q(city__icontains=text))
+
+
+def filter_ecoles(queryset, params):
+    """
+    Applique les filtres de recherche de l'API à un queryset d'écoles.
+
+    Paramètres supportés :
+    - `q` : recherche dans le nom et la ville (voir `search_ecoles`)
+    - `city` : ville exacte, insensible à la casse
+    - `postal_code` : préfixe du code postal
+
+    Args:
+        queryset (QuerySet): Écoles à filtrer.
+        params (QueryDict): Paramètres de la requête.
+
+    Returns:
+        QuerySet: Écoles filtrées.
+    """
+    text = params.get('q')
+    if text:
+        queryset = search_ecoles(queryset, text)
+
+    city = params.get('city')
+    if city:
+        queryset = queryset.filter(city__iexact=city)
+
+    postal_code = params.get('postal_code')
+    if postal_code:
+        queryset = queryset.filter(postal_code__startswith=postal_code)
+
+    return queryset
@@ -1,7 +1,8 @@
 from django.db.models import fields
 from rest_framework import serializers
-from .models import Ecole
-import re
+from json.encoder import encode_basestring
+from .models import Ecole, EcoleDeletion, EcoleFileStats
+from . import validators
 
 
 class EcoleSerializer(serializers.ModelSerializer):
@@ -48,11 +49,7 @@ class EcoleSerializer(serializers.ModelSerializer):
         Raises:
             ValidationError: Si le code postal n'est pas composé de 4 chiffres.
         """
-        if not re.match(r'^\d{4}$', value):
-            raise serializers.ValidationError(
-                "Le code postal doit contenir exactement 4 chiffres."
-            )
-        return value
+        return validators.validate_postal_code(value)
 
     def validate_phone(self, value):
         """
@@ -68,12 +65,7 @@ class EcoleSerializer(serializers.ModelSerializer):
             ValidationError: Si le format du téléphone est invalide.
         """
         # Format attendu: +216 XX XXX XXX
-        phone_pattern = r'^\+216\s?\d{2}\s?\d{3}\s?\d{3,4}$'
-        if not re.match(phone_pattern, value):
-            raise serializers.ValidationError(
-                "Le numéro de téléphone doit être au format international (+216 XX XXX XXX)."
-            )
-        return value
+        return validators.validate_phone(value)
 
     def validate_name(self, value):
         """
@@ -88,11 +80,7 @@ class EcoleSerializer(serializers.ModelSerializer):
         Raises:
             ValidationError: Si le nom est trop court.
         """
-        if len(value.strip()) < 3:
-            raise serializers.ValidationError(
-                "Le nom de l'école doit contenir au moins 3 caractères."
-            )
-        return value.strip()
+        return validators.validate_name(value)
 
     def validate(self, data):
         """
@@ -126,6 +114,11 @@ class EcoleSerializer(serializers.ModelSerializer):
         """
         Met à jour et retourne une instance d'Ecole existante.
 
+        Seules les colonnes dont la valeur change sont écrites
+        (`save(update_fields=...)`, plus `updated_at`) ; si rien ne change,
+        aucune requête `UPDATE` n'est émise. Convient aux mises à jour
+        complètes (PUT) comme partielles (PATCH).
+
         Args:
             instance (Ecole): L'instance existante à mettre à jour.
             validated_data (dict): Nouvelles données validées.
@@ -133,10 +126,172 @@ class EcoleSerializer(serializers.ModelSerializer):
         Returns:
             Ecole: L'instance mise à jour.
         """
-        instance.name = validated_data.get('name', instance.name)
-        instance.address = validated_data.get('address', instance.address)
-        instance.city = validated_data.get('city', instance.city)
-        instance.postal_code = validated_data.get('postal_code', instance.postal_code)
-        instance.phone = validated_data.get('phone', instance.phone)
-        instance.save()
-        return instance
\ No newline at end of file
+        changed = []
+        for field, value in validated_data.items():
+            if getattr(instance, field) != value:
+                setattr(instance, field, value)
+                changed.append(field)
+        if changed:
+            instance.save(update_fields=[*changed, 'updated_at'])
+        return instance
+
+
+class EcoleFileStatsSerializer(serializers.ModelSerializer):
+    """
+    Sérialiseur des compteurs de fichiers d'une école pour un type donné.
+
+    Attributes:
+        file_type (str): Type de fichier.
+        files_count (int): Nombre de fichiers de ce type.
+        total_size (int): Volume total en octets.
+    """
+
+    class Meta:
+        model = EcoleFileStats
+        fields = ('file_type', 'files_count', 'total_size')
+        read_only_fields = fields
+
+
+class EcoleStatsSerializer(serializers.ModelSerializer):
+    """
+    Sérialiseur en lecture seule de l'occupation de stockage d'une école.
+
+    S'appuie uniquement sur les compteurs dénormalisés (`files_count`,
+    `storage_used`, `file_stats`) : aucun agrégat n'est calculé sur la table
+    des fichiers.
+
+    Attributes:
+        files_count (int): Nombre total de fichiers.
+        storage_used (int): Volume total en octets.
+        file_stats (list): Répartition par type de fichier.
+    """
+
+    file_stats = EcoleFileStatsSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Ecole
+        fields = ('id', 'name', 'files_count', 'storage_used', 'file_stats')
+        read_only_fields = fields
+
+
+class EcoleUsageSerializer(serializers.ModelSerializer):
+    """
+    Sérialiseur de l'occupation d'une école au regard de ses quotas.
+
+    Seuls les quotas sont modifiables (administrateurs) ; les compteurs sont
+    lus sur la ligne `Ecole` (voir `ecole.stats` et `ecole.quotas`).
+
+    Attributes:
+        files_count (int): Nombre de fichiers enregistrés.
+        files_reserved (int): Fichiers en cours d'upload.
+        files_quota (int | None): Nombre maximal de fichiers (`None` : illimité).
+        files_available (int | None): Fichiers encore acceptés (`None` : illimité).
+        storage_used (int): Volume enregistré, en octets.
+        storage_reserved (int): Volume en cours d'upload, en octets.
+        storage_quota (int | None): Volume maximal en octets (`None` : illimité).
+        storage_available (int | None): Volume encore accepté (`None` : illimité).
+    """
+
+    files_available = serializers.SerializerMethodField()
+    storage_available = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Ecole
+        fields = (
+            'id', 'name',
+            'files_count', 'files_reserved', 'files_quota', 'files_available',
+            'storage_used', 'storage_reserved', 'storage_quota', 'storage_available',
+        )
+        read_only_fields = (
+            'id', 'name', 'files_count', 'files_reserved', 'storage_used', 'storage_reserved',
+        )
+
+    def get_files_available(self, obj):
+        """Nombre de fichiers encore acceptés, `None` sans quota."""
+        if obj.files_quota is None:
+            return None
+        return max(obj.files_quota - obj.files_count - obj.files_reserved, 0)
+
+    def get_storage_available(self, obj):
+        """Volume encore accepté en octets, `None` sans quota."""
+        if obj.storage_quota is None:
+            return None
+        return max(obj.storage_quota - obj.storage_used - obj.storage_reserved, 0)
+
+    def update(self, instance, validated_data):
+        """
+        Met à jour les quotas sans réécrire les compteurs.
+
+        Seules les colonnes de quota modifiées sont écrites : les compteurs,
+        mis à jour en parallèle par les uploads, ne sont jamais écrasés.
+
+        Args:
+            instance (Ecole): L'école à mettre à jour.
+            validated_data (dict): Quotas validés.
+
+        Returns:
+            Ecole: L'école mise à jour.
+        """
+        changed = []
+        for field, value in validated_data.items():
+            if getattr(instance, field) != value:
+                setattr(instance, field, value)
+                changed.append(field)
+        if changed:
+            instance.save(update_fields=changed)
+        return instance
+
+
+class EcoleDeletionSerializer(serializers.ModelSerializer):
+    """
+    Sérialiseur en lecture seule du suivi de suppression d'une école.
+
+    Attributes:
+        status (str): État du traitement (`pending`, `running`, `done`, `failed`).
+        total_files (int): Nombre de fichiers à supprimer.
+        deleted_files (int): Nombre de fichiers déjà supprimés.
+    """
+
+    class Meta:
+        model = EcoleDeletion
+        fields = (
+            'id', 'ecole_pk', 'ecole_name', 'status', 'total_files',
+            'deleted_files', 'error', 'created_at', 'finished_at'
+        )
+        read_only_fields = fields
+
+
+#: Gabarit JSON d'une école, dans l'ordre de `EcoleSerializer.Meta.fields`.
+ECOLE_JSON_ROW = (
+    '{"id":%d,"name":%s,"address":%s,"city":%s,'
+    '"postal_code":%s,"phone":%s,"students_count":%d}'
+)
+
+
+def render_ecoles_json(queryset):
+    """
+    Chemin rapide : produit le JSON de `EcoleSerializer(many=True)` sans DRF.
+
+    Lit directement des tuples (`values_list`) et les formate avec un gabarit
+    précompilé, sans instancier de modèles ni appeler `to_representation`
+    par champ ; seules les chaînes passent par l'encodeur C de `json`.
+    La sortie est identique octet pour octet à celle du `JSONRenderer` de DRF
+    (JSON compact, `ensure_ascii=False`, échappement de U+2028/U+2029) ;
+    un test de parité le vérifie.
+
+    Args:
+        queryset (QuerySet): Écoles à sérialiser.
+
+    Returns:
+        bytes: Tableau JSON encodé en UTF-8.
+    """
+    encode = encode_basestring
+    rows = queryset.values_list(*EcoleSerializer.Meta.fields)
+    content = '[' + ','.join([
+        ECOLE_JSON_ROW % (
+            pk, encode(name), encode(address), encode(city),
+            encode(postal_code), encode(phone), students_count,
+        )
+        for pk, name, address, city, postal_code, phone, students_count in rows
+    ]) + ']'
+    return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode('utf-8')
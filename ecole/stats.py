@@ -0,0 +1,59 @@
+"""Maintenance incrémentale des agrégats de fichiers par école.
+
+Les compteurs `Ecole.files_count`, `Ecole.storage_used` et la table
+`EcoleFileStats` sont mis à jour par des `UPDATE ... SET col = col + delta`
+(expressions `F()`), sans lecture préalable ni verrou applicatif. Ces
+fonctions doivent être appelées dans la même transaction que l'écriture
+du fichier pour que compteurs et lignes restent cohérents.
+
+La commande `manage.py rebuild_ecole_stats` recalcule ces compteurs à partir
+de la table des fichiers en cas de dérive (suppressions en masse, etc.).
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Ecole, EcoleFileStats
+
+
+def record_file_change(ecole_id, file_type, count_delta, size_delta):
+    """
+    Applique une variation aux compteurs de fichiers d'une école.
+
+    Args:
+        ecole_id (int): Identifiant de l'école.
+        file_type (str): Type de fichier concerné.
+        count_delta (int): Variation du nombre de fichiers (+1, -1, ...).
+        size_delta (int): Variation du volume en octets.
+    """
+    if not count_delta and not size_delta:
+        return
+
+    Ecole.objects.filter(pk=ecole_id).update(
+        files_count=F('files_count') + count_delta,
+        storage_used=F('storage_used') + size_delta,
+    )
+
+    stats = EcoleFileStats.objects.filter(ecole_id=ecole_id, file_type=file_type)
+    updated = stats.update(
+        files_count=F('files_count') + count_delta,
+        total_size=F('total_size') + size_delta,
+    )
+    if updated:
+        return
+
+    # Première occurrence de ce type pour l'école : création de la ligne.
+    # Une création concurrente est rattrapée par la contrainte d'unicité.
+    try:
+        with transaction.atomic():
+            EcoleFileStats.objects.create(
+                ecole_id=ecole_id,
+                file_type=file_type,
+                files_count=max(count_delta, 0),
+                total_size=max(size_delta, 0),
+            )
+    except IntegrityError:
+        stats.update(
+            files_count=F('files_count') + count_delta,
+            total_size=F('total_size') + size_delta,
+        )
@@ -12,9 +12,13 @@ Examples:
     ```
 """
 
+from django.test import TestCase, override_settings
+from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from ecole.serializers import EcoleSerializer
 from ecole.models import Ecole
 
 User = get_user_model()
@@ -42,6 +46,9 @@ class EcoleAPITestCase(APITestCase):
         Crée deux utilisateurs (admin et user standard) et une école
         de test. Initialise les URLs des endpoints API.
         """
+        # Le cache des détails survit d'un test à l'autre
+        cache.clear()
+
         # Création des utilisateurs
         self.admin_user = User.objects.create_user(
             username='admin',
@@ -227,17 +234,51 @@ class EcoleAPITestCase(APITestCase):
     def test_delete_ecole_admin(self):
         """Test: Suppression d'une école par un administrateur.
 
-        Vérifie qu'un administrateur peut supprimer une école.
+        Vérifie qu'un administrateur peut supprimer une école : la demande
+        est acceptée, l'école est masquée puis supprimée en arrière-plan
+        (exécuté ici de façon synchrone après la transaction).
 
         Asserts:
-            - Status code: 204 No Content
+            - Status code: 202 Accepted
+            - L'école n'est plus accessible via l'API
             - L'école n'existe plus en base de données
+            - Le suivi de suppression indique `done`
         """
         self.authenticate('admin', 'adminpass')
-        response = self.client.delete(self.detail_url)
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        with override_settings(ECOLE_DELETION_ASYNC=False):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.delete(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
         self.assertFalse(Ecole.objects.filter(id=self.ecole.id).exists())
 
+        job_url = reverse('ecole-deletion-detail', args=[response.data['deletion']['id']])
+        progress = self.client.get(job_url)
+        self.assertEqual(progress.status_code, status.HTTP_200_OK)
+        self.assertEqual(progress.data['status'], 'done')
+
+    def test_delete_ecole_hides_it_until_processed(self):
+        """Test: École masquée dès la demande de suppression.
+
+        Vérifie qu'une école en attente de suppression disparaît de la liste
+        et du détail, et qu'une seconde demande renvoie le même suivi.
+
+        Asserts:
+            - Liste vide et détail en 404 avant le traitement
+            - Seconde demande : 202 avec le même identifiant de suivi
+        """
+        self.authenticate('admin', 'adminpass')
+        with self.captureOnCommitCallbacks(execute=False):
+            first = self.client.delete(self.detail_url)
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(len(self.client.get(self.list_create_url).data), 0)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+        with self.captureOnCommitCallbacks(execute=False):
+            second = self.client.delete(self.detail_url)
+        self.assertEqual(second.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(second.data['deletion']['id'], first.data['deletion']['id'])
+
     def test_delete_ecole_non_admin(self):
         """Test: Tentative de suppression par un utilisateur standard.
 
@@ -251,4 +292,413 @@ class EcoleAPITestCase(APITestCase):
         self.authenticate('user', 'userpass')
         response = self.client.delete(self.detail_url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-        self.assertTrue(Ecole.objects.filter(id=self.ecole.id).exists())
\ No newline at end of file
+        self.assertTrue(Ecole.objects.filter(id=self.ecole.id).exists())
+
+    def test_get_ecole_list_cursor_pagination(self):
+        """Test: Parcours de la liste des écoles en mode curseur.
+
+        Vérifie que le mode `pagination=cursor` découpe la liste en pages,
+        que le lien `next` permet de parcourir toutes les écoles et
+        qu'aucune requête `COUNT(*)` n'est exécutée.
+
+        Asserts:
+            - Status code: 200 OK
+            - Pages de taille `page_size`
+            - Toutes les écoles sont parcourues une seule fois
+            - Aucun `COUNT` dans les requêtes SQL
+        """
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for i in range(6):
+            Ecole.objects.create(
+                name=f"École {i}",
+                address="Rue Test",
+                city="Tunis",
+                postal_code="1000",
+                phone="+216 71 000 000"
+            )
+        self.authenticate('user', 'userpass')
+
+        seen = []
+        url = f"{self.list_create_url}?pagination=cursor&page_size=3"
+        with CaptureQueriesContext(connection) as ctx:
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertLessEqual(len(response.data['results']), 3)
+                seen.extend(item['id'] for item in response.data['results'])
+                url = response.data['next']
+
+        self.assertEqual(seen, sorted(Ecole.objects.values_list('id', flat=True)))
+        self.assertFalse(any('COUNT(' in q['sql'].upper() for q in ctx.captured_queries))
+
+    def test_get_ecole_stats(self):
+        """Test: Lecture de l'occupation de stockage des écoles.
+
+        Vérifie que l'endpoint `/api/ecoles/stats/` expose les compteurs
+        dénormalisés de chaque école.
+
+        Asserts:
+            - Status code: 200 OK
+            - Compteurs et répartition par type retournés
+        """
+        Ecole.objects.filter(pk=self.ecole.pk).update(files_count=2, storage_used=300)
+        self.ecole.file_stats.create(file_type='pdf', files_count=2, total_size=300)
+        self.authenticate('user', 'userpass')
+        response = self.client.get('/api/ecoles/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['files_count'], 2)
+        self.assertEqual(response.data[0]['storage_used'], 300)
+        self.assertEqual(response.data[0]['file_stats'][0]['file_type'], 'pdf')
+
+    def test_ecole_usage_and_quotas(self):
+        """Test: Occupation et quotas d'une école.
+
+        Vérifie que `/api/ecoles/<id>/usage/` expose les compteurs, les
+        réservations et la place restante, et que seuls les administrateurs
+        modifient les quotas.
+
+        Asserts:
+            - Status code 200 et place restante `None` sans quota
+            - Modification des quotas par un utilisateur standard : 403
+            - Modification par un admin : quotas enregistrés, compteurs intacts
+        """
+        Ecole.objects.filter(pk=self.ecole.pk).update(
+            files_count=2, storage_used=300, files_reserved=1, storage_reserved=50
+        )
+        url = f'/api/ecoles/{self.ecole.pk}/usage/'
+        self.authenticate('user', 'userpass')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['storage_used'], 300)
+        self.assertIsNone(response.data['storage_available'])
+        response = self.client.patch(url, {'storage_quota': 1000}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.authenticate('admin', 'adminpass')
+        response = self.client.patch(url, {'storage_quota': 1000, 'files_quota': 10}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['storage_available'], 650)
+        self.assertEqual(response.data['files_available'], 7)
+        self.ecole.refresh_from_db()
+        self.assertEqual((self.ecole.storage_quota, self.ecole.storage_used), (1000, 300))
+
+    def test_bulk_create_and_update_admin(self):
+        """Test: Import en masse d'écoles au format JSON.
+
+        Vérifie que l'endpoint `/api/ecoles/bulk/` crée les nouvelles écoles,
+        met à jour celles qui ont un `id` et signale les éléments invalides
+        sans bloquer les autres.
+
+        Asserts:
+            - Status code: 201 Created
+            - 2 créations, 1 mise à jour, 1 erreur à l'index 3
+        """
+        self.authenticate('admin', 'adminpass')
+        data = [
+            {"name": "École Un", "address": "Rue 1", "city": "Tunis",
+             "postal_code": "1000", "phone": "+216 71 111 111"},
+            {"name": "École Deux", "address": "Rue 2", "city": "Sfax",
+             "postal_code": "3000", "phone": "+216 74 222 222"},
+            {"id": self.ecole.id, "city": "Monastir"},
+            {"name": "École Trois", "address": "Rue 3", "city": "Gabès",
+             "postal_code": "60", "phone": "+216 75 333 333"},
+        ]
+        response = self.client.post('/api/ecoles/bulk/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['errors'][0]['index'], 3)
+        self.assertIn('postal_code', response.data['errors'][0]['errors'])
+        self.assertEqual(Ecole.objects.count(), 3)
+        self.ecole.refresh_from_db()
+        self.assertEqual(self.ecole.city, "Monastir")
+
+    def test_bulk_create_ndjson(self):
+        """Test: Import en masse d'écoles au format NDJSON.
+
+        Asserts:
+            - Status code: 201 Created
+            - Une école créée par ligne non vide
+        """
+        self.authenticate('admin', 'adminpass')
+        body = (
+            '{"name": "École NDJSON 1", "address": "Rue A", "city": "Tunis", '
+            '"postal_code": "1001", "phone": "+216 71 000 001"}\n'
+            '\n'
+            '{"name": "École NDJSON 2", "address": "Rue B", "city": "Tunis", '
+            '"postal_code": "1002", "phone": "+216 71 000 002"}\n'
+        )
+        response = self.client.post(
+            '/api/ecoles/bulk/', body, content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertTrue(Ecole.objects.filter(name="École NDJSON 2").exists())
+
+    def test_bulk_non_admin(self):
+        """Test: Tentative d'import en masse par un utilisateur standard.
+
+        Asserts:
+            - Status code: 403 Forbidden
+        """
+        self.authenticate('user', 'userpass')
+        response = self.client.post('/api/ecoles/bulk/', [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_get_ecole_detail_conditional(self):
+        """Test: GET conditionnel sur le détail d'une école.
+
+        Vérifie que la réponse porte `ETag` et `Last-Modified`, qu'un
+        `If-None-Match` correspondant renvoie 304 sans requête SQL lorsque
+        l'entrée est en cache, et qu'une modification invalide l'ETag.
+
+        Asserts:
+            - En-têtes `ETag` et `Last-Modified` présents
+            - Status code: 304 Not Modified, aucune requête SQL
+            - Status code: 200 OK avec un nouvel ETag après PUT
+        """
+        self.client.force_authenticate(user=self.normal_user)
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.put(self.detail_url, {
+            "name": "École Alpha V2",
+            "address": "Rue de la République",
+            "city": "Sousse",
+            "postal_code": "4000",
+            "phone": "+216 73 123 456",
+        }, format='json')
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['name'], "École Alpha V2")
+
+    def test_get_ecole_list_search_filters(self):
+        """Test: Recherche et filtres sur la liste des écoles.
+
+        Vérifie les paramètres `q` (préfixe de mots, via l'index plein texte
+        SQLite en test), `city` et `postal_code`, y compris après une
+        modification du nom.
+
+        Asserts:
+            - `q` retrouve les écoles par préfixe du nom ou de la ville
+            - `city` est insensible à la casse
+            - `postal_code` filtre par préfixe
+        """
+        Ecole.objects.create(
+            name="Lycée Pilote",
+            address="Avenue Bourguiba",
+            city="Sfax",
+            postal_code="3027",
+            phone="+216 74 000 000"
+        )
+        self.authenticate('user', 'userpass')
+
+        def names(query):
+            response = self.client.get(f"{self.list_create_url}?{query}")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return sorted(item['name'] for item in response.data)
+
+        self.assertEqual(names("q=lyc"), ["Lycée Pilote"])
+        self.assertEqual(names("q=sous"), ["École Alpha"])
+        self.assertEqual(names("city=SFAX"), ["Lycée Pilote"])
+        self.assertEqual(names("postal_code=30"), ["Lycée Pilote"])
+        self.assertEqual(names("q=ecole&postal_code=30"), [])
+
+        self.ecole.name = "Collège Omega"
+        self.ecole.save()
+        self.assertEqual(names("q=omeg"), ["Collège Omega"])
+        self.assertEqual(names("q=alpha"), [])
+
+    def test_export_ecoles_streaming(self):
+        """Test: Export en flux des écoles (CSV et NDJSON).
+
+        Asserts:
+            - Status code: 200 OK
+            - Réponse streamée (`streaming=True`)
+            - En-tête CSV puis une ligne par école
+            - Une ligne JSON par école en NDJSON
+        """
+        import json
+
+        self.authenticate('user', 'userpass')
+        response = self.client.get('/api/ecoles/export/?format=csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:2], ['id', 'name'])
+        self.assertEqual(len(lines), 2)
+        self.assertIn("École Alpha", lines[1])
+
+        response = self.client.get('/api/ecoles/export/?format=ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(rows[0]['id'], self.ecole.id)
+        self.assertEqual(rows[0]['phone'], "+216 73 123 456")
+
+    def test_export_formats_match(self):
+        """Test: Une même école est exportée à l'identique en CSV et en NDJSON.
+
+        Asserts:
+            - Mêmes valeurs, colonne par colonne, dans les deux formats
+            - `created_at` au même format (millisecondes, suffixe `Z`)
+        """
+        import csv
+        import io
+        import json
+
+        self.authenticate('user', 'userpass')
+        response = self.client.get('/api/ecoles/export/?format=csv')
+        csv_rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        response = self.client.get('/api/ecoles/export/?format=ndjson')
+        ndjson_row = json.loads(b''.join(response.streaming_content).splitlines()[0])
+
+        self.assertEqual(csv_rows[0], {key: str(value) for key, value in ndjson_row.items()})
+        self.assertTrue(csv_rows[0]['created_at'].endswith('Z'))
+
+    def test_fast_list_matches_serializer(self):
+        """Test: Parité du chemin de sérialisation rapide (`?fast=1`).
+
+        Vérifie que `render_ecoles_json` produit exactement les mêmes octets
+        que `EcoleSerializer` + `JSONRenderer`, y compris pour des caractères
+        à échapper (guillemets, antislash, U+2028, accents).
+
+        Asserts:
+            - Sorties identiques octet pour octet
+            - L'endpoint `?fast=1` renvoie le même corps que la liste standard
+        """
+        from rest_framework.renderers import JSONRenderer
+        from ecole.serializers import render_ecoles_json
+
+        Ecole.objects.create(
+            name='Lycée "Ibn Khaldoun" \\ Sud\u2028', address="Rue\tÉtoile",
+            city="Gabès", postal_code="6000", phone="+216 75 000 000",
+            students_count=42
+        )
+        queryset = Ecole.objects.order_by('id')
+        expected = JSONRenderer().render(EcoleSerializer(queryset, many=True).data)
+        self.assertEqual(render_ecoles_json(queryset), expected)
+
+        self.authenticate('user', 'userpass')
+        standard = self.client.get(self.list_create_url)
+        fast = self.client.get(f"{self.list_create_url}?fast=1")
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast['Content-Type'], 'application/json')
+        self.assertEqual(fast.content, standard.content)
+
+    def test_patch_ecole_admin_updates_changed_columns_only(self):
+        """Test: Mise à jour partielle (PATCH) d'une école par un administrateur.
+
+        Vérifie que seule la colonne modifiée (et `updated_at`) figure dans
+        la requête `UPDATE`, et qu'un PATCH sans changement n'écrit rien.
+
+        Asserts:
+            - Status code: 200 OK
+            - `UPDATE` limité à `city` et `updated_at`
+            - Aucun `UPDATE` si la valeur est identique
+        """
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_authenticate(user=self.admin_user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(self.detail_url, {"city": "Monastir"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['city'], "Monastir")
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "ecole_ecole"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"city"', updates[0])
+        self.assertNotIn('"name"', updates[0])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.patch(self.detail_url, {"city": "Monastir"}, format='json')
+        self.assertFalse(any(q['sql'].startswith('UPDATE') for q in ctx.captured_queries))
+
+    def test_patch_ecole_non_admin(self):
+        """Test: Tentative de mise à jour partielle par un utilisateur standard.
+
+        Asserts:
+            - Status code: 403 Forbidden
+        """
+        self.authenticate('user', 'userpass')
+        response = self.client.patch(self.detail_url, {"city": "Tunis"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ImportEcolesCommandTest(TestCase):
+    """Tests de la commande `import_ecoles` (import CSV par lots)."""
+
+    def setUp(self):
+        """Crée un fichier CSV temporaire avec 3 lignes valides et 1 invalide."""
+        import tempfile
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.csv_path = f"{self.tmpdir.name}/ecoles.csv"
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write(
+                "name,address,city,postal_code,phone\n"
+                "École Un,Rue 1,Tunis,1000,+216 71 111 111\n"
+                "École Deux,Rue 2,Sfax,3000,+216 74 222 222\n"
+                "X,Rue 3,Sousse,40,+216 73 333 333\n"
+                "  École Quatre  ,Rue 4,Nabeul,8000,+216 72 444 444\n"
+            )
+
+    def test_import_with_rejects_and_checkpoint(self):
+        """Test: Import par lots avec rejets et point de reprise.
+
+        Asserts:
+            - Les 3 lignes valides sont importées (nom nettoyé)
+            - La ligne invalide est écrite dans le fichier des rejets
+            - Une seconde exécution reprend après la dernière ligne (aucun doublon)
+            - Un lot dont le point de reprise n'est pas enregistré est annulé, puis repris une seule fois
+        """
+        import csv
+        import json
+        from io import StringIO
+        from unittest import mock
+        from django.core.management import call_command
+        from django.db import DatabaseError
+        from ecole.management.commands.import_ecoles import Command
+        from ecole.models import EcoleImportCheckpoint
+
+        call_command('import_ecoles', self.csv_path, batch_size=2, stdout=StringIO())
+        self.assertEqual(Ecole.objects.count(), 3)
+        self.assertTrue(Ecole.objects.filter(name="École Quatre").exists())
+
+        with open(f"{self.csv_path}.rejects.csv", encoding='utf-8') as f:
+            rejects = list(csv.DictReader(f))
+        self.assertEqual(len(rejects), 1)
+        self.assertEqual(rejects[0]['line'], '3')
+        self.assertEqual(set(json.loads(rejects[0]['errors'])), {'name', 'postal_code'})
+
+        self.assertEqual(EcoleImportCheckpoint.objects.get().line, 4)
+
+        call_command('import_ecoles', self.csv_path, stdout=StringIO())
+        self.assertEqual(Ecole.objects.count(), 3)
+
+        # Échec à l'écriture du second point de reprise : le second lot est annulé avec lui
+        write_checkpoint = Command.write_checkpoint
+
+        def fail_second_checkpoint(command, key, path, progress):
+            if progress['line'] > 2:
+                raise DatabaseError
+            write_checkpoint(command, key, path, progress)
+
+        Ecole.objects.all().delete()
+        with mock.patch.object(Command, 'write_checkpoint', fail_second_checkpoint):
+            with self.assertRaises(DatabaseError):
+                call_command('import_ecoles', self.csv_path, batch_size=2, restart=True, stdout=StringIO())
+        self.assertEqual(Ecole.objects.count(), 2)
+        self.assertEqual(EcoleImportCheckpoint.objects.get().line, 2)
+        call_command('import_ecoles', self.csv_path, batch_size=2, stdout=StringIO())
+        self.assertEqual(Ecole.objects.count(), 3)
@@ -6,6 +6,9 @@ Définition des routes de l'application **users** liées à la gestion des écol
 #### 🔹 `GET /ecoles/`
 - **Description** : Récupère la liste de toutes les écoles.
 - **Accès** : Utilisateurs authentifiés.
+- **Filtres** : `?q=` (nom ou ville), `?city=` (ville exacte), `?postal_code=` (préfixe).
+- **Pagination** : `?pagination=cursor` retourne `{"next", "previous", "results"}`
+  avec des curseurs opaques (`?cursor=...`), sans `COUNT(*)`.
 - **Réponse (200)** :
 ```json
   [
@@ -37,6 +40,29 @@ Définition des routes de l'application **users** liées à la gestion des écol
 ```
 - **Réponse (201)** : Détails de l'école créée.
 
+#### 🔹 `GET /ecoles/export/?format=csv|ndjson`
+- **Description** : Exporte toutes les écoles en flux (CSV ou NDJSON), avec une
+  mémoire constante côté serveur. Accepte les mêmes filtres que la liste.
+- **Accès** : Utilisateurs authentifiés.
+
+#### 🔹 `POST /ecoles/bulk/`
+- **Description** : Crée ou met à jour des écoles en masse. Accepte un tableau JSON
+  ou un flux NDJSON (`Content-Type: application/x-ndjson`). Les éléments avec un
+  `id` mettent à jour l'école existante.
+- **Accès** : Réservé aux administrateurs.
+- **Réponse (201)** : `{"created", "updated", "failed", "errors": [{"index", "errors"}]}`.
+
+#### 🔹 `GET /ecoles/stats/`
+- **Description** : Occupation de stockage de chaque école (nombre de fichiers,
+  volume total et répartition par type), lue depuis les compteurs dénormalisés.
+- **Accès** : Utilisateurs authentifiés.
+
+#### 🔹 `GET /ecoles/<int:pk>/usage/`
+- **Description** : Occupation de l'école (fichiers, volume, uploads en cours)
+  et quotas, lus sur la seule ligne de l'école.
+- **Accès** : Utilisateurs authentifiés ; `PATCH` (modification des quotas
+  `files_quota` / `storage_quota`) réservé aux administrateurs.
+
 #### 🔹 `GET /ecoles/<int:pk>/`
 - **Description** : Récupère les informations d'une école spécifique.
 - **Accès** : Utilisateurs authentifiés.
@@ -45,8 +71,19 @@ Définition des routes de l'application **users** liées à la gestion des écol
 - **Description** : Met à jour les informations d'une école existante.
 - **Accès** : Réservé aux administrateurs.
 
+#### 🔹 `PATCH /ecoles/<int:pk>/`
+- **Description** : Met à jour une partie des informations d'une école ; seules
+  les colonnes modifiées sont écrites.
+- **Accès** : Réservé aux administrateurs.
+
 #### 🔹 `DELETE /ecoles/<int:pk>/`
-- **Description** : Supprime une école.
+- **Description** : Planifie la suppression d'une école (masquée immédiatement,
+  fichiers et école supprimés en arrière-plan).
+- **Accès** : Réservé aux administrateurs.
+- **Réponse (202)** : Suivi de la suppression.
+
+#### 🔹 `GET /ecoles/deletions/<int:pk>/`
+- **Description** : Progression d'une suppression d'école.
 - **Accès** : Réservé aux administrateurs.
 """
 
@@ -60,9 +97,34 @@ urlpatterns = [
         views.ecole_list_create,
         name='ecole-list-create'
     ),
+    path(
+        'ecoles/export/',
+        views.ecole_export,
+        name='ecole-export'
+    ),
+    path(
+        'ecoles/bulk/',
+        views.ecole_bulk,
+        name='ecole-bulk'
+    ),
+    path(
+        'ecoles/stats/',
+        views.ecole_stats,
+        name='ecole-stats'
+    ),
     path(
         'ecoles/<int:pk>/',
         views.ecole_detail,
         name='ecole-detail'
     ),
+    path(
+        'ecoles/<int:pk>/usage/',
+        views.ecole_usage,
+        name='ecole-usage'
+    ),
+    path(
+        'ecoles/deletions/<int:pk>/',
+        views.ecole_deletion_detail,
+        name='ecole-deletion-detail'
+    ),
 ]
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""Règles de validation des écoles.
+
+Ces fonctions portent les règles métier utilisées par `EcoleSerializer`
+(`validate_postal_code`, `validate_phone`, `validate_name`). Les expressions
+régulières sont compilées une seule fois au chargement du module, ce qui
+permet aussi de valider de grands volumes de lignes sans instancier de
+sérialiseur (voir `clean_ecole_row` et la commande `import_ecoles`).
+"""
+
+import re
+
+from rest_framework.exceptions import ValidationError
+
+from .models import Ecole
+
+#: Code postal tunisien : exactement 4 chiffres.
+POSTAL_CODE_RE = re.compile(r'^\d{4}$')
+
+#: Téléphone au format international : +216 XX XXX XXX.
+PHONE_RE = re.compile(r'^\+216\s?\d{2}\s?\d{3}\s?\d{3,4}$')
+
+#: Longueur minimale du nom d'une école.
+NAME_MIN_LENGTH = 3
+
+#: Champs saisissables d'une école et leur longueur maximale.
+ECOLE_INPUT_FIELDS = {
+    name: Ecole._meta.get_field(name).max_length
+    for name in ('name', 'address', 'city', 'postal_code', 'phone')
+}
+
+
+def validate_postal_code(value):
+    """
+    Valide le format du code postal tunisien.
+
+    Args:
+        value (str): Le code postal à valider.
+
+    Returns:
+        str: Le code postal validé.
+
+    Raises:
+        ValidationError: Si le code postal n'est pas composé de 4 chiffres.
+    """
+    if not POSTAL_CODE_RE.match(value):
+        raise ValidationError("Le code postal doit contenir exactement 4 chiffres.")
+    return value
+
+
+def validate_phone(value):
+    """
+    Valide le format du numéro de téléphone.
+
+    Args:
+        value (str): Le numéro de téléphone à valider.
+
+    Returns:
+        str: Le numéro de téléphone validé.
+
+    Raises:
+        ValidationError: Si le format du téléphone est invalide.
+    """
+    if not PHONE_RE.match(value):
+        raise ValidationError(
+            "Le numéro de téléphone doit être au format international (+216 XX XXX XXX)."
+        )
+    return value
+
+
+def validate_name(value):
+    """
+    Valide le nom de l'école.
+
+    Args:
+        value (str): Le nom de l'école à valider.
+
+    Returns:
+        str: Le nom sans espaces superflus.
+
+    Raises:
+        ValidationError: Si le nom est trop court.
+    """
+    value = value.strip()
+    if len(value) < NAME_MIN_LENGTH:
+        raise ValidationError(
+            f"Le nom de l'école doit contenir au moins {NAME_MIN_LENGTH} caractères."
+        )
+    return value
+
+
+#: Validateurs métier appliqués après les contrôles de présence et de longueur.
+FIELD_VALIDATORS = {
+    'name': validate_name,
+    'postal_code': validate_postal_code,
+    'phone': validate_phone,
+}
+
+
+def clean_ecole_row(row):
+    """
+    Valide une ligne brute (ex. ligne CSV) avec les règles de `EcoleSerializer`.
+
+    Applique, sans instancier de sérialiseur, les mêmes contrôles : champ
+    obligatoire et non vide (espaces retirés), longueur maximale du modèle,
+    puis validateurs métier.
+
+    Args:
+        row (dict): Valeurs brutes indexées par nom de champ.
+
+    Returns:
+        tuple[dict, dict]: Données nettoyées et erreurs par champ
+        (dictionnaire vide si la ligne est valide).
+    """
+    data = {}
+    errors = {}
+    for field, max_length in ECOLE_INPUT_FIELDS.items():
+        value = (row.get(field) or '').strip()
+        if not value:
+            errors[field] = ["Ce champ est obligatoire."]
+            continue
+        if len(value) > max_length:
+            errors[field] = [f"Ce champ ne doit pas dépasser {max_length} caractères."]
+            continue
+        validator = FIELD_VALIDATORS.get(field)
+        if validator:
+            try:
+                value = validator(value)
+            except ValidationError as exc:
+                errors[field] = [str(message) for message in exc.detail]
+                continue
+        data[field] = value
+    return data, errors
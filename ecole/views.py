@@ -1,8 +1,32 @@
-from rest_framework.decorators import api_view, permission_classes
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.decorators import api_view, parser_classes, permission_classes, renderer_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from .models import Ecole
-from .serializers import EcoleSerializer
+from .models import Ecole, EcoleDeletion
+from .serializers import (
+    EcoleDeletionSerializer, EcoleSerializer, EcoleStatsSerializer, EcoleUsageSerializer,
+    render_ecoles_json,
+)
+from .pagination import EcoleCursorPagination
+from .parsers import NDJSONParser
+from .search import filter_ecoles
+from .renderers import CSVRenderer, NDJSONRenderer
+from .export import iter_csv, iter_ndjson
+from .deletion import request_deletion
+from .cache import (
+    cache_ecole_detail, get_cached_ecole_detail, invalidate_ecole_detail,
+    is_not_modified, set_validators,
+)
+
+#: Nombre de lignes écrites par transaction lors des imports en masse.
+BULK_CHUNK_SIZE = 500
+
+#: Champs modifiables lors d'une mise à jour en masse.
+BULK_UPDATE_FIELDS = ('name', 'address', 'city', 'postal_code', 'phone', 'updated_at')
 
 
 @api_view(['GET', 'POST'])
@@ -15,6 +39,17 @@ def ecole_list_create(request):
     - **GET** : Récupère la liste de toutes les écoles.
     - **POST** : Crée une nouvelle école (réservé aux administrateurs).
 
+    ### Paramètres de requête (GET) :
+    - `q` : Recherche dans le nom et la ville (préfixe de mots, approchée sous PostgreSQL).
+    - `city` : Ville exacte (insensible à la casse).
+    - `postal_code` : Préfixe du code postal.
+    - `pagination=cursor` : Active la pagination par curseur (sans `COUNT(*)`).
+    - `cursor` : Curseur opaque retourné dans les liens `next`/`previous`.
+    - `ordering` : `id`, `-id`, `created_at` ou `-created_at` (mode curseur).
+    - `page_size` : Taille de page (mode curseur, max 100).
+    - `fast=1` : Sérialisation rapide sans DRF (`render_ecoles_json`), sortie identique
+      à `EcoleSerializer` (hors mode curseur).
+
     ### Conditions d'accès :
     - L'utilisateur doit être authentifié.
     - La création (`POST`) nécessite que l'utilisateur soit administrateur (`is_staff=True` ou `role='admin'`).
@@ -53,7 +88,14 @@ def ecole_list_create(request):
     ```
     """
     if request.method == 'GET':
-        ecoles = Ecole.objects.all()
+        ecoles = filter_ecoles(Ecole.objects.active(), request.query_params)
+        if request.query_params.get('pagination') == 'cursor':
+            paginator = EcoleCursorPagination()
+            page = paginator.paginate_queryset(ecoles, request)
+            serializer = EcoleSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+        if request.query_params.get('fast') in ('1', 'true'):
+            return HttpResponse(render_ecoles_json(ecoles), content_type='application/json')
         serializer = EcoleSerializer(ecoles, many=True)
         return Response(serializer.data)
 
@@ -70,7 +112,186 @@ def ecole_list_create(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-@api_view(['GET', 'PUT', 'DELETE'])
+@api_view(['GET'])
+@renderer_classes([CSVRenderer, NDJSONRenderer])
+@permission_classes([permissions.IsAuthenticated])
+def ecole_export(request):
+    """
+    Export en flux de toutes les écoles.
+
+    Les lignes sont lues par un curseur côté serveur et envoyées au fur et
+    à mesure (`StreamingHttpResponse`) : la mémoire reste constante quel que
+    soit le nombre d'écoles. Les filtres de `ecole_list_create` (`q`, `city`,
+    `postal_code`) s'appliquent.
+
+    ### Paramètres de requête :
+    - `format` : `csv` (par défaut) ou `ndjson`.
+
+    ### Réponses :
+    - **200 OK** : Fichier `ecoles.csv` ou `ecoles.ndjson` en pièce jointe.
+    - **404 NOT FOUND** : Format inconnu.
+    """
+    ecoles = filter_ecoles(Ecole.objects.active(), request.query_params)
+    if request.accepted_renderer.format == 'ndjson':
+        content, content_type, extension = iter_ndjson(ecoles), 'application/x-ndjson', 'ndjson'
+    else:
+        content, content_type, extension = iter_csv(ecoles), 'text/csv; charset=utf-8', 'csv'
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="ecoles.{extension}"'
+    return response
+
+
+@api_view(['POST'])
+@parser_classes([JSONParser, NDJSONParser])
+@permission_classes([permissions.IsAuthenticated])
+def ecole_bulk(request):
+    """
+    Création et mise à jour en masse d'écoles.
+
+    Le corps est un tableau JSON (`application/json`) ou un flux NDJSON
+    (`application/x-ndjson`, une école par ligne). Chaque élément est validé
+    avec les règles de `EcoleSerializer` ; les éléments contenant un `id`
+    mettent à jour l'école correspondante (mise à jour partielle), les autres
+    créent une nouvelle école. Les écritures sont faites par `bulk_create` /
+    `bulk_update`, par lots de `BULK_CHUNK_SIZE` lignes dans des transactions
+    distinctes.
+
+    ### Conditions d'accès :
+    - Réservé aux administrateurs.
+
+    ### Réponses :
+    - **201 CREATED** : Au moins une école a été créée ou mise à jour.
+    - **400 BAD REQUEST** : Corps invalide ou aucun élément valide.
+    - **403 FORBIDDEN** : Si l'utilisateur n'est pas administrateur.
+
+    ### Exemple de réponse :
+    ```json
+    {
+        "created": 2,
+        "updated": 1,
+        "failed": 1,
+        "errors": [
+            {"index": 3, "errors": {"postal_code": ["Le code postal doit contenir exactement 4 chiffres."]}}
+        ]
+    }
+    ```
+    """
+    if not request.user.is_staff and getattr(request.user, "role", "") != 'admin':
+        return Response(
+            {"error": "Seul un administrateur peut importer des écoles."},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    items = request.data
+    if not isinstance(items, list):
+        return Response(
+            {'error': 'Un tableau JSON ou un flux NDJSON est attendu.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Un seul sérialiseur par mode : seules les méthodes de validation sont utilisées
+    create_validator = EcoleSerializer()
+    update_validator = EcoleSerializer(partial=True)
+
+    update_ids = [
+        item['id'] for item in items
+        if isinstance(item, dict) and isinstance(item.get('id'), int)
+    ]
+    existing = Ecole.objects.active().in_bulk(update_ids)
+
+    to_create = []
+    to_update = []
+    errors = []
+
+    for index, item in enumerate(items):
+        pk = item.get('id') if isinstance(item, dict) else None
+        instance = None
+        if pk is not None:
+            instance = existing.get(pk) if isinstance(pk, int) else None
+            if instance is None:
+                errors.append({'index': index, 'errors': {'id': ['École non trouvée']}})
+                continue
+
+        validator = update_validator if instance else create_validator
+        try:
+            data = validator.run_validation(item)
+        except ValidationError as exc:
+            errors.append({'index': index, 'errors': exc.detail})
+            continue
+
+        if instance:
+            for field, value in data.items():
+                setattr(instance, field, value)
+            # `bulk_update` ne déclenche pas `auto_now`
+            instance.updated_at = timezone.now()
+            to_update.append(instance)
+        else:
+            to_create.append(Ecole(**data))
+
+    for start in range(0, len(to_create), BULK_CHUNK_SIZE):
+        with transaction.atomic():
+            Ecole.objects.bulk_create(to_create[start:start + BULK_CHUNK_SIZE])
+
+    for start in range(0, len(to_update), BULK_CHUNK_SIZE):
+        with transaction.atomic():
+            Ecole.objects.bulk_update(to_update[start:start + BULK_CHUNK_SIZE], BULK_UPDATE_FIELDS)
+    invalidate_ecole_detail(*(ecole.pk for ecole in to_update))
+
+    return Response(
+        {
+            'created': len(to_create),
+            'updated': len(to_update),
+            'failed': len(errors),
+            'errors': errors
+        },
+        status=status.HTTP_201_CREATED if to_create or to_update else status.HTTP_400_BAD_REQUEST
+    )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def ecole_stats(request):
+    """
+    Occupation de stockage de toutes les écoles.
+
+    Lit les compteurs dénormalisés maintenus à chaque upload/suppression de
+    fichier : une requête sur `Ecole` et une sur `EcoleFileStats`, quel que
+    soit le nombre de fichiers.
+
+    ### Paramètres de requête :
+    - `pagination=cursor` : Active la pagination par curseur (voir `ecole_list_create`).
+
+    ### Réponses :
+    - **200 OK** : Liste des écoles avec leurs compteurs.
+
+    ### Exemple de réponse :
+    ```json
+    [
+        {
+            "id": 1,
+            "name": "École Nationale d'Informatique",
+            "files_count": 3,
+            "storage_used": 52480,
+            "file_stats": [
+                {"file_type": "pdf", "files_count": 2, "total_size": 50000},
+                {"file_type": "text", "files_count": 1, "total_size": 2480}
+            ]
+        }
+    ]
+    ```
+    """
+    ecoles = Ecole.objects.active().prefetch_related('file_stats')
+    if request.query_params.get('pagination') == 'cursor':
+        paginator = EcoleCursorPagination()
+        page = paginator.paginate_queryset(ecoles, request)
+        serializer = EcoleStatsSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    serializer = EcoleStatsSerializer(ecoles.order_by('id'), many=True)
+    return Response(serializer.data)
+
+
+@api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([permissions.IsAuthenticated])
 def ecole_detail(request, pk):
     """
@@ -79,18 +300,31 @@ def ecole_detail(request, pk):
     ### Méthodes disponibles :
     - **GET** : Récupère les détails d’une école spécifique.
     - **PUT** : Met à jour les informations d’une école (réservé aux administrateurs).
-    - **DELETE** : Supprime une école (réservé aux administrateurs).
+    - **PATCH** : Met à jour une partie des informations d’une école (réservé aux administrateurs).
+    - **DELETE** : Demande la suppression d'une école (réservé aux administrateurs).
+      L'école est masquée immédiatement ; ses fichiers (lignes et fichiers physiques)
+      puis l'école elle-même sont supprimés en arrière-plan (`ecole.deletion`).
+      La progression est consultable sur `/api/ecoles/deletions/<id>/`.
+
+    PUT et PATCH n'écrivent que les colonnes modifiées (`UPDATE ... SET` ciblé).
 
     ### Paramètres :
     - `pk` *(int)* : Identifiant unique de l’école.
 
     ### Conditions d'accès :
     - L'utilisateur doit être authentifié.
-    - Les opérations PUT et DELETE sont réservées aux administrateurs.
+    - Les opérations PUT, PATCH et DELETE sont réservées aux administrateurs.
+
+    ### Cache et requêtes conditionnelles (GET) :
+    - Le détail est servi depuis le cache (`ecole.cache`), invalidé par PUT, PATCH et DELETE.
+    - La réponse porte les en-têtes `ETag` et `Last-Modified`.
+    - `If-None-Match` / `If-Modified-Since` : réponse **304** sans accès à la base
+      lorsque l'entrée est en cache.
 
     ### Réponses :
-    - **200 OK** : Retourne les détails de l’école (GET ou PUT réussi).
-    - **204 NO CONTENT** : Confirme la suppression réussie.
+    - **200 OK** : Retourne les détails de l’école (GET, PUT ou PATCH réussi).
+    - **304 NOT MODIFIED** : La version connue du client est à jour (GET conditionnel).
+    - **202 ACCEPTED** : Suppression planifiée ; retourne le suivi de la suppression.
     - **403 FORBIDDEN** : Si un utilisateur non-admin tente de modifier/supprimer.
     - **404 NOT FOUND** : Si l’école demandée n’existe pas.
     - **400 BAD REQUEST** : Si les données envoyées lors de la mise à jour sont invalides.
@@ -109,24 +343,34 @@ def ecole_detail(request, pk):
     }
     ```
     """
+    if request.method == 'GET':
+        entry = get_cached_ecole_detail(pk)
+        if entry is None:
+            try:
+                entry = cache_ecole_detail(Ecole.objects.active().get(pk=pk))
+            except Ecole.DoesNotExist:
+                return Response({'error': 'École non trouvée'}, status=status.HTTP_404_NOT_FOUND)
+        if is_not_modified(request, entry):
+            return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), entry)
+        return set_validators(Response(entry['data']), entry)
+
     try:
         ecole = Ecole.objects.get(pk=pk)
     except Ecole.DoesNotExist:
         return Response({'error': 'École non trouvée'}, status=status.HTTP_404_NOT_FOUND)
+    if ecole.deletion_requested_at and request.method != 'DELETE':
+        return Response({'error': 'École non trouvée'}, status=status.HTTP_404_NOT_FOUND)
 
-    if request.method == 'GET':
-        serializer = EcoleSerializer(ecole)
-        return Response(serializer.data)
-
-    elif request.method == 'PUT':
+    if request.method in ('PUT', 'PATCH'):
         if not request.user.is_staff and getattr(request.user, "role", "") != 'admin':
             return Response(
                 {"error": "Seul un administrateur peut modifier une école."},
                 status=status.HTTP_403_FORBIDDEN
             )
-        serializer = EcoleSerializer(ecole, data=request.data)
+        serializer = EcoleSerializer(ecole, data=request.data, partial=request.method == 'PATCH')
         if serializer.is_valid():
             serializer.save()
+            invalidate_ecole_detail(ecole.pk)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -136,5 +380,113 @@ def ecole_detail(request, pk):
                 {"error": "Seul un administrateur peut supprimer une école."},
                 status=status.HTTP_403_FORBIDDEN
             )
-        ecole.delete()
-        return Response({'message': 'École supprimée avec succès'}, status=status.HTTP_204_NO_CONTENT)
+        if ecole.deletion_requested_at:
+            job = EcoleDeletion.objects.filter(ecole_pk=ecole.pk).latest('created_at')
+        else:
+            job = request_deletion(ecole, request.user)
+        invalidate_ecole_detail(pk)
+        return Response(
+            {'message': 'Suppression de l’école planifiée', 'deletion': EcoleDeletionSerializer(job).data},
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+@api_view(['GET', 'PATCH'])
+@permission_classes([permissions.IsAuthenticated])
+def ecole_usage(request, pk):
+    """
+    Occupation d'une école et quotas de stockage.
+
+    Lit une seule ligne `Ecole` : compteurs maintenus à chaque upload et
+    suppression (`ecole.stats`), réservations des uploads en cours et quotas
+    (`ecole.quotas`). Aucun agrégat n'est calculé sur la table des fichiers.
+
+    ### Méthodes disponibles :
+    - **GET** : Occupation et quotas de l'école.
+    - **PATCH** : Modifie `files_quota` et/ou `storage_quota` (réservé aux
+      administrateurs) ; `null` supprime la limite.
+
+    ### Réponses :
+    - **200 OK** : Occupation de l'école.
+    - **400 BAD REQUEST** : Quota invalide.
+    - **403 FORBIDDEN** : Modification par un non-administrateur.
+    - **404 NOT FOUND** : École inexistante ou en cours de suppression.
+
+    ### Exemple de réponse :
+    ```json
+    {
+        "id": 1,
+        "name": "École Nationale d'Informatique",
+        "files_count": 3,
+        "files_reserved": 1,
+        "files_quota": 1000,
+        "files_available": 996,
+        "storage_used": 52480,
+        "storage_reserved": 1048576,
+        "storage_quota": 1073741824,
+        "storage_available": 1072640768
+    }
+    ```
+    """
+    try:
+        ecole = Ecole.objects.active().get(pk=pk)
+    except Ecole.DoesNotExist:
+        return Response({'error': 'École non trouvée'}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'PATCH':
+        if not request.user.is_staff and getattr(request.user, "role", "") != 'admin':
+            return Response(
+                {"error": "Seul un administrateur peut modifier les quotas d'une école."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = EcoleUsageSerializer(ecole, data=request.data, partial=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer.save()
+        return Response(serializer.data)
+
+    return Response(EcoleUsageSerializer(ecole).data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def ecole_deletion_detail(request, pk):
+    """
+    Progression de la suppression en arrière-plan d'une école.
+
+    ### Paramètres :
+    - `pk` *(int)* : Identifiant du suivi de suppression (retourné par `DELETE /ecoles/<id>/`).
+
+    ### Conditions d'accès :
+    - Réservé aux administrateurs.
+
+    ### Réponses :
+    - **200 OK** : État du traitement et nombre de fichiers supprimés.
+    - **403 FORBIDDEN** : Si l'utilisateur n'est pas administrateur.
+    - **404 NOT FOUND** : Si le suivi n'existe pas.
+
+    ### Exemple de réponse :
+    ```json
+    {
+        "id": 7,
+        "ecole_pk": 2,
+        "ecole_name": "Institut Supérieur de Technologie",
+        "status": "running",
+        "total_files": 12000,
+        "deleted_files": 4500,
+        "error": "",
+        "created_at": "2025-11-07T09:12:34Z",
+        "finished_at": null
+    }
+    ```
+    """
+    if not request.user.is_staff and getattr(request.user, "role", "") != 'admin':
+        return Response(
+            {"error": "Seul un administrateur peut consulter une suppression."},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    try:
+        job = EcoleDeletion.objects.get(pk=pk)
+    except EcoleDeletion.DoesNotExist:
+        return Response({'error': 'Suppression non trouvée'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(EcoleDeletionSerializer(job).data)
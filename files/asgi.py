@@ -0,0 +1,70 @@
+"""Réception asynchrone des corps de requête (uploads) sous ASGI.
+
+Sous ASGI, Django reçoit le corps d'une requête dans la boucle d'événements
+avant d'appeler la vue : un upload lent n'occupe donc aucun thread. Mais
+`ASGIHandler.read_body` écrit chaque message reçu dans un
+`SpooledTemporaryFile` directement depuis la boucle ; au-delà de
+`FILE_UPLOAD_MAX_MEMORY_SIZE`, ces écritures deviennent des écritures disque
+qui bloquent tous les autres clients du worker (téléchargements en cours
+compris).
+
+`StreamingASGIHandler` garde en mémoire les corps sous ce seuil et écrit les
+suivants par blocs d'au moins `ASGI_BODY_BLOCK_SIZE` octets hors de la boucle
+(`asyncio.to_thread`). Le fichier obtenu est ensuite analysé par les
+gestionnaires d'upload habituels (`files.handlers`, `files.uploads`).
+"""
+
+import asyncio
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import RequestAborted
+from django.core.handlers.asgi import ASGIHandler
+
+#: Taille minimale des écritures disque effectuées hors de la boucle.
+ASGI_BODY_BLOCK_SIZE = 256 * 1024
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """Gestionnaire ASGI de Django dont la réception du corps ne bloque pas la boucle."""
+
+    async def read_body(self, receive):
+        """
+        Reçoit le corps de la requête et l'écrit sans bloquer la boucle d'événements.
+
+        Args:
+            receive (callable): Canal de réception ASGI.
+
+        Returns:
+            SpooledTemporaryFile: Corps de la requête, positionné au début.
+
+        Raises:
+            RequestAborted: Si le client se déconnecte avant la fin du corps.
+        """
+        max_size = settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        body_file = tempfile.SpooledTemporaryFile(max_size=max_size, mode='w+b')
+        pending = bytearray()
+        received = 0
+        try:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    raise RequestAborted()
+                body = message.get('body', b'')
+                received += len(body)
+                more_body = message.get('more_body', False)
+                if received <= max_size:
+                    # Le corps tient en mémoire : écriture sans accès disque
+                    body_file.write(body)
+                else:
+                    pending += body
+                    if len(pending) >= ASGI_BODY_BLOCK_SIZE or not more_body:
+                        await asyncio.to_thread(body_file.write, bytes(pending))
+                        pending.clear()
+                if not more_body:
+                    break
+        except BaseException:
+            await asyncio.to_thread(body_file.close)
+            raise
+        await asyncio.to_thread(body_file.seek, 0)
+        return body_file
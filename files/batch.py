@@ -0,0 +1,229 @@
+"""Upload multiple en lot (`FileViewSet.upload_multiple`).
+
+Le lot est enregistré en un nombre constant de requêtes, quel que soit le
+nombre de fichiers :
+
+1. validation de tous les fichiers (`FileBatchItemSerializer`, sans requête) ;
+2. empreintes SHA-256 (si `FILES_DEDUPLICATION` ; déjà calculées par
+   `files.handlers` à la réception) et enregistrement des contenus dans le
+   stockage en parallèle (`FILES_UPLOAD_BATCH_WORKERS` threads ; un contenu
+   présent plusieurs fois dans le lot n'est écrit qu'une fois ; un fichier
+   reçu est renommé, pas copié, sauf s'il est compressé par
+   `files.compression`), sans accès à la base ;
+3. une seule transaction : blobs (lecture verrouillée, réécriture des
+   contenus disparus entre-temps, `bulk_create`, mise à jour des
+   références), fichiers (`bulk_create`) et compteurs de l'école
+   (`ecole.stats.record_file_change`, une fois par type de fichier) ; le
+   cache des statistiques (`files.stats`) est invalidé à la validation.
+
+Si la transaction échoue, les contenus écrits à l'étape 2 sont supprimés.
+"""
+
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from ecole.stats import record_file_change
+
+from .blobs import blob_name, content_sha256
+from .compression import compress_content, compression_for
+from .models import Blob, File
+from .stats import invalidate_file_stats
+from .utils import determine_file_type, get_mime_type
+
+
+def _store(storage, field, name, upload, encoding, reuse=False):
+    """
+    Écrit un contenu dans le stockage (exécuté dans un thread).
+
+    Args:
+        storage (Storage): Stockage des fichiers.
+        field (FileField): Champ `File.file`.
+        name (str): Nom de stockage demandé.
+        upload (UploadedFile): Contenu uploadé (non compressé).
+        encoding (str): Encodage du contenu stocké (`files.compression`).
+        reuse (bool): Ne rien écrire si `name` existe déjà (blob).
+
+    Returns:
+        str | None: Nom écrit dans le stockage (`None` si le contenu existait déjà).
+    """
+    if reuse and storage.exists(name):
+        return None
+    content = compress_content(upload) if encoding else upload
+    return storage.save(name, content, max_length=field.max_length)
+
+
+def _attach_blobs(storage, field, files, contents, written, written_names):
+    """
+    Rattache les fichiers du lot à leurs blobs (créés ou référencés).
+
+    Un blob existant garde son encodage, repris par les fichiers qui le
+    référencent. L'existence des contenus, vérifiée sans verrou à l'écriture,
+    est vérifiée à nouveau une fois les blobs verrouillés : un contenu
+    supprimé entre-temps (dernière référence libérée, échec d'un lot
+    concurrent) est réécrit.
+
+    Args:
+        storage (Storage): Stockage des fichiers.
+        field (FileField): Champ `File.file`.
+        files (list[File]): Fichiers du lot, `content_hash` renseigné.
+        contents (dict[str, tuple[UploadedFile, str]]): Contenu et encodage,
+            par empreinte (premier fichier du lot portant cette empreinte).
+        written (dict[str, tuple[str, str]]): Nom écrit dans le stockage et
+            encodage, par empreinte.
+        written_names (list[str]): Noms écrits par le lot, complétés des
+            contenus réécrits (supprimés si la transaction échoue).
+    """
+    def rewrite(sha256, name, encoding):
+        upload, _ = contents[sha256]
+        name = _store(storage, field, name, upload, encoding)
+        written_names.append(name)
+        return name
+
+    counts = Counter(file_obj.content_hash for file_obj in files)
+    blobs = {
+        blob.sha256: blob
+        for blob in Blob.objects.select_for_update().filter(sha256__in=counts)
+    }
+    existing = list(blobs.values())
+
+    for blob in existing:
+        if storage.exists(blob.name):
+            continue
+        if blob.sha256 in written:
+            # Contenu écrit par ce lot (blob créé en parallèle) : repris tel quel
+            blob.name, blob.content_encoding = written[blob.sha256]
+        else:
+            blob.name = rewrite(blob.sha256, blob.name, blob.content_encoding)
+        blob.save(update_fields=['name', 'content_encoding'])
+
+    new_blobs = []
+    for sha256, count in counts.items():
+        if sha256 in blobs:
+            continue
+        upload, encoding = contents[sha256]
+        name, encoding = written.get(sha256) or (blob_name(sha256, encoding), encoding)
+        if sha256 not in written and not storage.exists(name):
+            name = rewrite(sha256, name, encoding)
+        new_blobs.append(Blob(
+            sha256=sha256,
+            name=name,
+            size=upload.size,
+            content_encoding=encoding,
+            ref_count=count,
+        ))
+    new_blobs = Blob.objects.bulk_create(new_blobs)
+    blobs.update((blob.sha256, blob) for blob in new_blobs)
+
+    if existing:
+        Blob.objects.filter(pk__in=[blob.pk for blob in existing]).update(
+            ref_count=F('ref_count') + Case(
+                *[When(pk=blob.pk, then=Value(counts[blob.sha256])) for blob in existing],
+                default=Value(0),
+            )
+        )
+
+    for file_obj in files:
+        file_obj.blob = blobs[file_obj.content_hash]
+        file_obj.file = file_obj.blob.name
+        file_obj.content_encoding = file_obj.blob.content_encoding
+
+
+def upload_batch(ecole, user, uploads, description=''):
+    """
+    Enregistre un lot de fichiers validés pour une école.
+
+    Args:
+        ecole (Ecole): École de destination (déjà vérifiée).
+        user (User): Utilisateur à l'origine de l'upload.
+        uploads (list[UploadedFile]): Fichiers validés.
+        description (str): Description commune aux fichiers.
+
+    Returns:
+        list[File]: Fichiers créés, avec `ecole` et `uploaded_by` renseignés.
+    """
+    field = File._meta.get_field('file')
+    storage = field.storage
+    files = []
+    for upload in uploads:
+        filename = os.path.basename(upload.name)
+        file_type = determine_file_type(filename)
+        mime_type = getattr(upload, 'mime_type', None) or get_mime_type(filename)
+        files.append(File(
+            ecole=ecole,
+            uploaded_by=user,
+            description=description,
+            filename=filename,
+            file_size=upload.size,
+            file_type=file_type,
+            mime_type=mime_type,
+            content_encoding=compression_for(file_type, mime_type, upload.size),
+        ))
+
+    with ThreadPoolExecutor(max_workers=settings.FILES_UPLOAD_BATCH_WORKERS) as pool:
+        contents, written = {}, {}
+        if settings.FILES_DEDUPLICATION:
+            for file_obj, sha256 in zip(files, pool.map(content_sha256, uploads)):
+                file_obj.content_hash = sha256
+            # Un contenu présent plusieurs fois dans le lot n'est écrit qu'une fois
+            for file_obj, upload in zip(files, uploads):
+                contents.setdefault(file_obj.content_hash, (upload, file_obj.content_encoding))
+            pending = [
+                (blob_name(sha256, encoding), upload, encoding, True)
+                for sha256, (upload, encoding) in contents.items()
+            ]
+        else:
+            pending = [
+                (field.generate_filename(file_obj, file_obj.filename), upload, file_obj.content_encoding)
+                for file_obj, upload in zip(files, uploads)
+            ]
+        names = list(pool.map(lambda item: _store(storage, field, *item), pending))
+
+    if settings.FILES_DEDUPLICATION:
+        for (sha256, (_, encoding)), name in zip(contents.items(), names):
+            if name:
+                written[sha256] = (name, encoding)
+    else:
+        for file_obj, name in zip(files, names):
+            file_obj.file = name
+    written_names = [name for name in names if name]
+
+    try:
+        with transaction.atomic():
+            if settings.FILES_DEDUPLICATION:
+                _attach_blobs(storage, field, files, contents, written, written_names)
+            File.objects.bulk_create(files)
+
+            totals = defaultdict(lambda: [0, 0])
+            for file_obj in files:
+                totals[file_obj.file_type][0] += 1
+                totals[file_obj.file_type][1] += file_obj.file_size
+            for file_type, (count, size) in totals.items():
+                record_file_change(ecole.pk, file_type, count, size)
+            invalidate_file_stats(ecole.pk)
+    except Exception:
+        # Un contenu écrit entre-temps pour un blob concurrent est conservé
+        referenced = set(Blob.objects.filter(name__in=written_names).values_list('name', flat=True))
+        for name in written_names:
+            if name not in referenced:
+                storage.delete(name)
+        raise
+
+    # Contenus écrits en double (même contenu dans le lot, ou blob créé en parallèle)
+    referenced = {file_obj.file.name for file_obj in files}
+    for name in written_names:
+        if name not in referenced:
+            storage.delete(name)
+
+    for file_obj in files:
+        file_obj._loaded_values = {
+            'ecole_id': file_obj.ecole_id,
+            'file_type': file_obj.file_type,
+            'file_size': file_obj.file_size,
+            'blob_id': file_obj.blob_id,
+        }
+    return files
@@ -0,0 +1,77 @@
+"""Outils de benchmark de la liste des fichiers.
+
+Fournit la génération de lignes `File` synthétiques (déterministe) utilisée
+par `bench_file_list`. Seules les lignes sont créées : aucun fichier n'est
+écrit sur le disque et les compteurs des écoles ne sont pas mis à jour
+(`manage.py rebuild_ecole_stats` les recalcule si besoin).
+"""
+
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from ecole.benchmarks import seed_ecoles
+from ecole.models import Ecole
+
+from .models import File
+from .utils import determine_file_type, get_mime_type
+
+#: Extensions utilisées, dans la proportion des types réels (PDF majoritaires).
+EXTENSIONS = ['pdf'] * 4 + ['jpg', 'png', 'docx', 'xlsx', 'csv', 'txt']
+
+
+def seed_files(rows, schools=1000, users=200, batch_size=10000, stdout=None):
+    """
+    Complète la table des fichiers avec des données synthétiques.
+
+    Les fichiers sont répartis entre `schools` écoles et `users` utilisateurs
+    (créés si nécessaire), avec des dates d'upload étalées sur deux ans.
+
+    Args:
+        rows (int): Nombre total de fichiers visé.
+        schools (int): Nombre d'écoles visé.
+        users (int): Nombre d'utilisateurs de benchmark visé.
+        batch_size (int): Nombre de fichiers insérés par transaction.
+        stdout (OutputWrapper | None): Sortie pour afficher la progression.
+    """
+    seed_ecoles(schools)
+    User = get_user_model()
+    User.objects.bulk_create(
+        [User(username=f'bench{index}') for index in range(users)],
+        ignore_conflicts=True,
+    )
+    ecole_ids = list(Ecole.objects.values_list('id', flat=True)[:schools])
+    user_ids = list(User.objects.filter(username__startswith='bench').values_list('id', flat=True))
+
+    rng = random.Random(42)
+    now = timezone.now()
+    span = int(timedelta(days=730).total_seconds())
+    missing = rows - File.objects.count()
+    while missing > 0:
+        size = min(batch_size, missing)
+        batch = []
+        for _ in range(size):
+            filename = f"bench{rng.randint(1, 10 ** 9)}.{rng.choice(EXTENSIONS)}"
+            batch.append(File(
+                ecole_id=rng.choice(ecole_ids),
+                uploaded_by_id=rng.choice(user_ids),
+                file=f"bench/{filename}",
+                filename=filename,
+                file_type=determine_file_type(filename),
+                file_size=rng.randint(1000, 5_000_000),
+                mime_type=get_mime_type(filename),
+            ))
+        with transaction.atomic():
+            created = File.objects.bulk_create(batch)
+            # `uploaded_at` est renseigné automatiquement : il est ensuite étalé dans le temps
+            for file_obj in created:
+                file_obj.uploaded_at = now - timedelta(seconds=rng.randint(0, span))
+            File.objects.bulk_update(created, ['uploaded_at'], batch_size=1000)
+        missing -= size
+        if stdout:
+            stdout.write(f"{rows - missing} / {rows} fichiers", ending='\r')
+    if stdout:
+        stdout.write('')
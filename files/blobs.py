@@ -0,0 +1,132 @@
+"""Stockage adressé par contenu (déduplication SHA-256).
+
+Chaque contenu est stocké une seule fois sous `blobs/ab/cd/<sha256>`, où
+`ab` et `cd` sont les quatre premiers caractères de l'empreinte (répartition
+sur 65 536 répertoires). Les objets `File` pointent vers ce chemin
+(`File.file`) et vers la ligne `Blob` correspondante, qui compte les
+références :
+
+- `store_blob` calcule l'empreinte en lisant le contenu par morceaux, puis
+  n'écrit le fichier que s'il n'existe pas encore ;
+- `release_blobs` décrémente les références et, lorsque la dernière
+  disparaît, supprime la ligne puis le fichier physique après validation de
+  la transaction (un retour arrière retrouve le blob et son contenu).
+
+Avec `FILES_COMPRESSION`, un contenu texte ou CSV est stocké compressé sous
+`blobs/ab/cd/<sha256>.gz` (`Blob.content_encoding`, voir
+`files.compression`) ; l'empreinte reste celle du contenu d'origine.
+
+Ces fonctions verrouillent les lignes `Blob` concernées (`select_for_update`)
+et doivent être appelées dans la transaction qui écrit ou supprime le `File`.
+"""
+
+import hashlib
+from functools import partial
+
+from django.db import transaction
+
+from .compression import ENCODING_SUFFIXES, compress_content
+from .models import Blob, File
+
+#: Répertoire racine des blobs dans le stockage.
+BLOB_ROOT = 'blobs'
+
+
+def blob_name(sha256, encoding=''):
+    """
+    Retourne le chemin de stockage d'un contenu d'après son empreinte.
+
+    Args:
+        sha256 (str): Empreinte SHA-256 hexadécimale (du contenu d'origine).
+        encoding (str): Encodage du contenu stocké (`files.compression`).
+
+    Returns:
+        str: Chemin relatif `blobs/ab/cd/<sha256>` (suivi de `.gz` si compressé).
+    """
+    suffix = ENCODING_SUFFIXES.get(encoding, '')
+    return f'{BLOB_ROOT}/{sha256[:2]}/{sha256[2:4]}/{sha256}{suffix}'
+
+
+def content_sha256(content):
+    """
+    Calcule l'empreinte SHA-256 d'un fichier en le lisant par morceaux.
+
+    Un fichier reçu par `files.handlers.SinglePassUploadHandler` porte déjà
+    son empreinte (`sha256`) : il n'est alors pas relu.
+
+    Args:
+        content (django.core.files.File): Fichier à hacher (ou `FieldFile`).
+
+    Returns:
+        str: Empreinte hexadécimale.
+    """
+    for candidate in (content, getattr(content, 'file', None)):
+        if getattr(candidate, 'sha256', None):
+            return candidate.sha256
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_blob(content, encoding=''):
+    """
+    Stocke un contenu s'il est nouveau et ajoute une référence à son blob.
+
+    Si le fichier physique d'un blob existant a disparu, il est réécrit. Un
+    blob existant garde son encodage : le contenu n'est compressé que s'il
+    est écrit.
+
+    Args:
+        content (django.core.files.File): Contenu uploadé (non compressé).
+        encoding (str): Encodage d'un nouveau blob (`files.compression`).
+
+    Returns:
+        Blob: Le blob (nouveau ou existant) référençant ce contenu.
+    """
+    storage = File._meta.get_field('file').storage
+    sha256 = content_sha256(content)
+    with transaction.atomic():
+        blob, _ = Blob.objects.select_for_update().get_or_create(
+            sha256=sha256,
+            defaults={
+                'name': blob_name(sha256, encoding),
+                'size': content.size,
+                'content_encoding': encoding,
+            },
+        )
+        if not storage.exists(blob.name):
+            stored = compress_content(content) if blob.content_encoding else content
+            blob.name = storage.save(blob.name, stored)
+        blob.ref_count += 1
+        blob.save(update_fields=['name', 'ref_count'])
+    return blob
+
+
+def _delete_unreferenced(storage, name):
+    """Supprime le contenu d'un blob supprimé, sauf s'il a été recréé depuis."""
+    if not Blob.objects.filter(name=name).exists():
+        storage.delete(name)
+
+
+def release_blobs(counts):
+    """
+    Retire des références à des blobs et supprime ceux qui n'en ont plus.
+
+    Les lignes sont supprimées dans la transaction de l'appelant ; les
+    fichiers physiques ne le sont qu'après sa validation.
+
+    Args:
+        counts (dict[int, int]): Nombre de références retirées par identifiant de blob.
+    """
+    if not counts:
+        return
+    storage = File._meta.get_field('file').storage
+    with transaction.atomic():
+        for blob in Blob.objects.select_for_update().filter(pk__in=counts).order_by('pk'):
+            blob.ref_count = max(blob.ref_count - counts[blob.pk], 0)
+            if blob.ref_count:
+                blob.save(update_fields=['ref_count'])
+            else:
+                blob.delete()
+                transaction.on_commit(partial(_delete_unreferenced, storage, blob.name))
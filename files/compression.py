@@ -0,0 +1,152 @@
+"""Compression au repos des fichiers texte et CSV (`FILES_COMPRESSION`).
+
+Les fichiers texte (`.txt`) et CSV se compressent de 5 à 10 fois. Avec
+`FILES_COMPRESSION`, leur contenu est écrit compressé en gzip dans le
+stockage (suffixe `.gz` ajouté au chemin) et l'encodage est enregistré dans
+`File.content_encoding` (et `Blob.content_encoding` en déduplication) :
+
+- `File.file_size`, l'empreinte `content_hash` et les quotas restent ceux du
+  contenu d'origine ;
+- au téléchargement (`files.downloads`), un client qui accepte gzip reçoit
+  les octets stockés tels quels avec `Content-Encoding: gzip` ; les autres
+  reçoivent le contenu décompressé à la volée.
+
+Les contenus de moins de `MIN_COMPRESSED_SIZE` octets sont stockés tels
+quels. La compression est déterministe (pas de date ni de nom dans l'en-tête gzip) :
+un même contenu donne toujours les mêmes octets stockés.
+"""
+
+import gzip
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import File as DjangoFile
+
+#: Encodage des contenus compressés (valeur de `Content-Encoding`).
+GZIP = 'gzip'
+
+#: Suffixe ajouté au chemin de stockage d'un contenu compressé.
+ENCODING_SUFFIXES = {GZIP: '.gz'}
+
+#: Types de fichiers (`determine_file_type`) compressés, s'ils sont textuels.
+COMPRESSIBLE_TYPES = ('text', 'spreadsheet')
+
+#: En dessous de cette taille (octets), l'en-tête gzip l'emporte sur le gain : contenu stocké tel quel.
+MIN_COMPRESSED_SIZE = 1024
+
+#: Alias acceptés dans `Accept-Encoding`.
+ENCODING_ALIASES = {GZIP: ('gzip', 'x-gzip')}
+
+
+def compression_for(file_type, mime_type, size):
+    """
+    Indique l'encodage à appliquer au stockage d'un nouveau contenu.
+
+    Seuls les types textuels sont compressés : un classeur `.xlsx` (type
+    `spreadsheet`) est déjà une archive ZIP.
+
+    Args:
+        file_type (str): Type du fichier (`determine_file_type`).
+        mime_type (str): Type MIME du fichier.
+        size (int): Taille du contenu en octets.
+
+    Returns:
+        str: `gzip`, ou chaîne vide si le contenu est stocké tel quel.
+    """
+    if (
+        settings.FILES_COMPRESSION
+        and file_type in COMPRESSIBLE_TYPES
+        and (mime_type or '').startswith('text/')
+        and size >= MIN_COMPRESSED_SIZE
+    ):
+        return GZIP
+    return ''
+
+
+def compress_content(content):
+    """
+    Compresse un contenu par morceaux dans un fichier temporaire.
+
+    Args:
+        content (django.core.files.File): Contenu d'origine.
+
+    Returns:
+        django.core.files.File: Contenu compressé, positionné au début et
+        portant le nom du contenu d'origine.
+    """
+    buffer = tempfile.SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE, dir=settings.FILE_UPLOAD_TEMP_DIR
+    )
+    with gzip.GzipFile(filename='', mode='wb', fileobj=buffer,
+                       compresslevel=settings.FILES_COMPRESSION_LEVEL, mtime=0) as compressed:
+        for chunk in content.chunks():
+            compressed.write(chunk)
+    buffer.seek(0)
+    return DjangoFile(buffer, name=content.name)
+
+
+class DecompressedFile(gzip.GzipFile):
+    """Lecture décompressée d'un contenu stocké ; la fermeture ferme aussi le fichier stocké."""
+
+    def __init__(self, fileobj):
+        """
+        Args:
+            fileobj (file): Fichier stocké, ouvert en lecture binaire.
+        """
+        super().__init__(fileobj=fileobj, mode='rb')
+        self._stored = fileobj
+
+    def close(self):
+        """Ferme le lecteur et le fichier stocké."""
+        try:
+            super().close()
+        finally:
+            self._stored.close()
+
+
+def open_content(file_obj, decompress=True):
+    """
+    Ouvre le contenu d'un fichier en lecture binaire.
+
+    Args:
+        file_obj (File): Fichier à lire.
+        decompress (bool): Décompresser un contenu compressé (sinon, octets stockés).
+
+    Returns:
+        file: Fichier ouvert, positionné au début.
+    """
+    stored = file_obj.file.storage.open(file_obj.file.name, 'rb')
+    if decompress and file_obj.content_encoding:
+        return DecompressedFile(stored)
+    return stored
+
+
+def accepts_encoding(request, encoding):
+    """
+    Indique si le client accepte un encodage de contenu (`Accept-Encoding`).
+
+    Args:
+        request (HttpRequest): Requête HTTP.
+        encoding (str): Encodage recherché (`gzip`).
+
+    Returns:
+        bool: `True` si l'encodage (ou `*`) est accepté avec une qualité non nulle.
+    """
+    qualities = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            qualities[coding.strip().lower()] = quality
+
+    for alias in ENCODING_ALIASES.get(encoding, (encoding,)):
+        if alias in qualities:
+            return qualities[alias] > 0
+    return qualities.get('*', 0) > 0
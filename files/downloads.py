@@ -0,0 +1,380 @@
+"""Téléchargement des fichiers : requêtes partielles et conditionnelles.
+
+`download_response` construit la réponse de `FileViewSet.download` :
+
+- validateurs forts `ETag` (empreinte SHA-256 du contenu, ou identifiant du
+  fichier hors déduplication, suivi de la version `File.updated_at`) et
+  `Last-Modified` ;
+- `If-None-Match` / `If-Modified-Since` : réponse **304** sans lire le fichier,
+  `If-Match` / `If-Unmodified-Since` : **412** (`django.utils.cache.get_conditional_response`) ;
+- `Range: bytes=...` : réponse **206** avec une plage (`Content-Range`) ou
+  plusieurs (`multipart/byteranges`), **416** si aucune plage n'est
+  satisfaisable ;
+- `If-Range` : la plage n'est servie que si le validateur envoyé correspond
+  toujours au contenu, sinon le fichier complet est renvoyé (200).
+
+Les plages sont lues par blocs de `DOWNLOAD_BLOCK_SIZE` octets : seul le
+contenu demandé est lu sur le disque.
+
+Avec `FILES_DOWNLOAD_MODE` à `x-accel-redirect` ou `x-sendfile`, la vue ne
+lit pas le fichier : elle vérifie les droits et les conditions (304), puis
+renvoie un en-tête `X-Accel-Redirect` (chemin sous
+`FILES_DOWNLOAD_INTERNAL_PREFIX`) ou `X-Sendfile` (chemin absolu). Le serveur
+web envoie alors le fichier (sendfile) et gère lui-même les plages.
+`files.middleware.SendfileEmulationMiddleware` reproduit ce comportement
+sans serveur web, pour les tests et le développement.
+
+Un fichier stocké compressé (`files.compression`) a deux représentations,
+distinguées par leur `ETag` et annoncées par `Vary: Accept-Encoding` :
+
+- si le client accepte l'encodage (`Accept-Encoding: gzip`), les octets
+  stockés sont envoyés tels quels avec `Content-Encoding: gzip` (les plages
+  portent alors sur ces octets) ;
+- sinon, le contenu est décompressé à la volée (`Content-Length` : taille
+  d'origine, plages sur le contenu décompressé).
+
+Ces fichiers sont toujours envoyés par Django, même avec une redirection
+interne : nginx ne transmet pas l'en-tête `Content-Encoding` de la réponse
+d'origine.
+
+Sous ASGI (`FILES_ASYNC_STREAMING`), le contenu est produit par un itérateur
+asynchrone : chaque bloc est lu hors de la boucle d'événements
+(`asyncio.to_thread`) puis envoyé au client sans occuper de thread pendant
+l'envoi. Un itérateur synchrone serait au contraire lu en entier, en mémoire
+et dans un thread, par `StreamingHttpResponse` avant d'être envoyé.
+"""
+
+import asyncio
+import re
+import uuid
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+from .compression import accepts_encoding, open_content
+
+#: Taille des blocs lus sur le disque pour les réponses partielles.
+DOWNLOAD_BLOCK_SIZE = 64 * 1024
+
+#: Au-delà de ce nombre de plages (après fusion), l'en-tête `Range` est ignoré.
+MAX_RANGES = 32
+
+_RANGE_SPEC = re.compile(r'^(\d*)-(\d*)$')
+
+
+def file_validators(file_obj, encoding=''):
+    """
+    Calcule les validateurs HTTP d'un fichier.
+
+    Args:
+        file_obj (File): Fichier téléchargé.
+        encoding (str): Encodage de la représentation envoyée (vide : contenu d'origine).
+
+    Returns:
+        dict: `etag` (validateur fort), `last_modified` (timestamp en secondes)
+        et `vary` (la représentation dépend de `Accept-Encoding`).
+    """
+    version = int(file_obj.updated_at.timestamp() * 1_000_000)
+    suffix = f'-{encoding}' if encoding else ''
+    return {
+        'etag': f'"{file_obj.content_hash or file_obj.pk}-{version}{suffix}"',
+        'last_modified': int(file_obj.updated_at.timestamp()),
+        'vary': bool(file_obj.content_encoding),
+    }
+
+
+def parse_range_header(header, size):
+    """
+    Analyse un en-tête `Range` en octets.
+
+    Les plages qui se chevauchent ou se touchent sont fusionnées.
+
+    Args:
+        header (str): Valeur de l'en-tête (`bytes=0-99,200-,-50`).
+        size (int): Taille du fichier en octets.
+
+    Returns:
+        list[tuple[int, int]] | None: Plages `(début, fin)` inclusives et
+        triées, liste vide si aucune n'est satisfaisable, `None` si l'en-tête
+        est invalide ou doit être ignoré.
+    """
+    unit, _, specs = header.partition('=')
+    if unit.strip().lower() != 'bytes' or not specs:
+        return None
+
+    ranges = []
+    for spec in specs.split(','):
+        match = _RANGE_SPEC.match(spec.strip())
+        if not match or match.groups() == ('', ''):
+            return None
+        first, last = match.groups()
+        if not first:
+            # Suffixe : les N derniers octets
+            length = int(last)
+            if length and size:
+                ranges.append((max(size - length, 0), size - 1))
+            continue
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, end))
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    if len(merged) > MAX_RANGES:
+        return None
+    return merged
+
+
+def if_range_matches(request, validators):
+    """
+    Indique si la condition `If-Range` permet de servir une réponse partielle.
+
+    Un ETag est comparé de façon forte ; une date doit être exactement celle
+    de `Last-Modified`.
+
+    Args:
+        request (Request): Requête HTTP.
+        validators (dict): Validateurs du fichier.
+
+    Returns:
+        bool: `True` en l'absence d'`If-Range` ou si le validateur correspond.
+    """
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == validators['etag']
+    return parse_http_date_safe(if_range) == validators['last_modified']
+
+
+def read_range(fileobj, start, end):
+    """
+    Lit une plage d'octets par blocs.
+
+    Args:
+        fileobj (file): Fichier ouvert en lecture binaire.
+        start (int): Premier octet.
+        end (int): Dernier octet (inclus).
+
+    Yields:
+        bytes: Blocs de la plage.
+    """
+    fileobj.seek(start)
+    remaining = end - start + 1
+    while remaining > 0:
+        chunk = fileobj.read(min(DOWNLOAD_BLOCK_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _stream_ranges(fileobj, parts):
+    """Produit les parties (en-têtes puis contenu) et ferme le fichier."""
+    try:
+        for header, start, end in parts:
+            yield header
+            if start is not None:
+                yield from read_range(fileobj, start, end)
+    finally:
+        fileobj.close()
+
+
+async def _astream_ranges(open_file, parts):
+    """
+    Version asynchrone de `_stream_ranges` : ouvre, lit et ferme le fichier hors de la boucle.
+
+    Args:
+        open_file (callable): Ouvre le fichier en lecture binaire (sans argument).
+        parts (list[tuple[bytes, int | None, int | None]]): En-tête et plage de chaque partie.
+
+    Yields:
+        bytes: En-têtes de parties et blocs de contenu.
+    """
+    fileobj = await asyncio.to_thread(open_file)
+    try:
+        for header, start, end in parts:
+            if header:
+                yield header
+            if start is None:
+                continue
+            await asyncio.to_thread(fileobj.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(fileobj.read, min(DOWNLOAD_BLOCK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    finally:
+        await asyncio.to_thread(fileobj.close)
+
+
+def streams_async(request):
+    """
+    Indique si le contenu doit être produit par un itérateur asynchrone.
+
+    Args:
+        request (Request): Requête HTTP (DRF ou Django).
+
+    Returns:
+        bool: `True` sous ASGI lorsque `FILES_ASYNC_STREAMING` est activé.
+    """
+    request = getattr(request, '_request', request)
+    return settings.FILES_ASYNC_STREAMING and isinstance(request, ASGIRequest)
+
+
+def _set_validators(response, validators):
+    """Ajoute `ETag`, `Last-Modified` et `Accept-Ranges` (et `Vary` si compressé) à une réponse."""
+    response['ETag'] = validators['etag']
+    response['Last-Modified'] = http_date(validators['last_modified'])
+    response['Accept-Ranges'] = 'bytes'
+    if validators.get('vary'):
+        patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def offload_response(file_obj, mode):
+    """
+    Délègue l'envoi du fichier au serveur web.
+
+    Args:
+        file_obj (File): Fichier demandé.
+        mode (str): `x-accel-redirect` ou `x-sendfile`.
+
+    Returns:
+        HttpResponse: Réponse vide portant l'en-tête de redirection interne.
+
+    Raises:
+        FileNotFoundError: Si le fichier est absent du stockage.
+    """
+    if not file_obj.file.storage.exists(file_obj.file.name):
+        raise FileNotFoundError(file_obj.file.name)
+
+    response = HttpResponse(content_type=file_obj.mime_type or 'application/octet-stream')
+    if mode == 'x-accel-redirect':
+        prefix = settings.FILES_DOWNLOAD_INTERNAL_PREFIX.rstrip('/')
+        response['X-Accel-Redirect'] = f'{prefix}/{quote(file_obj.file.name)}'
+    else:
+        response['X-Sendfile'] = file_obj.file.path
+    response['Content-Disposition'] = f'attachment; filename="{file_obj.filename}"'
+    return response
+
+
+def download_response(request, file_obj):
+    """
+    Construit la réponse de téléchargement d'un fichier.
+
+    Args:
+        request (Request): Requête HTTP.
+        file_obj (File): Fichier demandé.
+
+    Returns:
+        HttpResponse: 200 (fichier complet ou redirection interne), 206
+        (plages), 304 (non modifié), 412 (précondition `If-Match` ou
+        `If-Unmodified-Since` non remplie) ou 416 (plages non satisfaisables).
+
+    Raises:
+        FileNotFoundError: Si le fichier est absent du stockage.
+    """
+    encoding = file_obj.content_encoding
+    # Octets stockés envoyés tels quels si le client accepte leur encodage
+    passthrough = bool(encoding) and accepts_encoding(request, encoding)
+    decompress = bool(encoding) and not passthrough
+    validators = file_validators(file_obj, encoding if passthrough else '')
+    conditional = get_conditional_response(
+        request, etag=validators['etag'], last_modified=validators['last_modified']
+    )
+    if conditional is not None:
+        return _set_validators(conditional, validators)
+
+    mode = settings.FILES_DOWNLOAD_MODE
+    if mode in ('x-accel-redirect', 'x-sendfile') and not encoding:
+        return _set_validators(offload_response(file_obj, mode), validators)
+
+    # Lève FileNotFoundError si le fichier est absent, avant tout envoi
+    stored_size = file_obj.file.size
+    # Taille de la représentation envoyée : contenu d'origine si décompressé à la volée
+    size = file_obj.file_size if decompress else stored_size
+    range_header = request.META.get('HTTP_RANGE')
+    ranges = None
+    if range_header and if_range_matches(request, validators):
+        ranges = parse_range_header(range_header, size)
+
+    if ranges == []:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return _set_validators(response, validators)
+
+    asynchronous = streams_async(request)
+    disposition = f'attachment; filename="{file_obj.filename}"'
+
+    def open_file():
+        return open_content(file_obj, decompress=decompress)
+
+    def stream(parts):
+        if asynchronous:
+            return _astream_ranges(open_file, parts)
+        return _stream_ranges(open_file(), parts)
+
+    if ranges is None:
+        if asynchronous or decompress:
+            response = StreamingHttpResponse(
+                stream([(b'', 0, size - 1)] if size else []),
+                content_type=file_obj.mime_type or 'application/octet-stream',
+            )
+            response['Content-Length'] = str(size)
+        else:
+            response = FileResponse(
+                file_obj.file.open('rb'), content_type=file_obj.mime_type or 'application/octet-stream'
+            )
+        if passthrough:
+            response['Content-Encoding'] = encoding
+        response['Content-Disposition'] = disposition
+        return _set_validators(response, validators)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        response = StreamingHttpResponse(
+            stream([(b'', start, end)]),
+            status=206,
+            content_type=file_obj.mime_type or 'application/octet-stream',
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        boundary = uuid.uuid4().hex
+        content_type = file_obj.mime_type or 'application/octet-stream'
+        parts = []
+        for start, end in ranges:
+            header = (
+                f'\r\n--{boundary}\r\n'
+                f'Content-Type: {content_type}\r\n'
+                f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n'
+            )
+            parts.append((header.encode(), start, end))
+        parts.append((f'\r\n--{boundary}--\r\n'.encode(), None, None))
+        length = sum(len(header) for header, _, _ in parts)
+        length += sum(end - start + 1 for start, end in ranges)
+        response = StreamingHttpResponse(
+            stream(parts),
+            status=206,
+            content_type=f'multipart/byteranges; boundary={boundary}',
+        )
+        response['Content-Length'] = str(length)
+
+    if passthrough:
+        response['Content-Encoding'] = encoding
+    response['Content-Disposition'] = disposition
+    return _set_validators(response, validators)
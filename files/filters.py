@@ -0,0 +1,42 @@
+"""Filtres de la liste des fichiers (`GET /api/files/`).
+
+Chaque combinaison de filtres (`ecole`, `type`, `my_files`) est servie par un
+index composite de `File` terminé par `-uploaded_at`, la colonne de tri de la
+liste (voir `File.Meta.indexes`). La commande `bench_file_list` mesure la
+latence et le plan d'exécution de chaque combinaison.
+"""
+
+#: Paramètres de filtrage de la liste.
+FILTER_PARAMS = ('ecole', 'type', 'my_files')
+
+
+def filter_files(queryset, params, user):
+    """
+    Applique les filtres de l'API à un queryset de fichiers.
+
+    Paramètres supportés :
+    - `ecole`: Filtrer par ID d'école
+    - `type`: Filtrer par type de fichier
+    - `my_files`: Si vrai, uniquement les fichiers uploadés par `user`
+
+    Args:
+        queryset (QuerySet): Fichiers à filtrer.
+        params (QueryDict): Paramètres de la requête.
+        user (User): Utilisateur connecté.
+
+    Returns:
+        QuerySet: Fichiers filtrés.
+    """
+    ecole_id = params.get('ecole')
+    if ecole_id:
+        queryset = queryset.filter(ecole_id=ecole_id)
+
+    file_type = params.get('type')
+    if file_type:
+        queryset = queryset.filter(file_type=file_type)
+
+    my_files = params.get('my_files')
+    if my_files:
+        queryset = queryset.filter(uploaded_by=user)
+
+    return queryset
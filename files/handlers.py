@@ -0,0 +1,164 @@
+"""Gestionnaires d'upload : écriture en un seul passage et validation en flux.
+
+`SinglePassUploadHandler` (gestionnaire par défaut, `FILE_UPLOAD_HANDLERS`)
+écrit chaque fichier reçu dans `incoming_dir()` (`FILES_UPLOAD_INCOMING_DIR`,
+par défaut `.incoming` sous le `MEDIA_ROOT` courant) : le stockage l'enregistre
+ensuite par un simple renommage, sans copie. Pendant la réception, il calcule aussi la taille, l'empreinte SHA-256
+et le type MIME d'après les premiers octets (`files.utils.sniff_mime_type`),
+exposés sur le fichier reçu (`size`, `sha256`, `mime_type`) : `File.save` et
+`files.blobs` n'ont pas à relire le contenu.
+
+`ValidatingUploadHandler` y ajoute la validation en flux des uploads
+multiples. Avec les gestionnaires par défaut de Django, chaque fichier d'un
+lot serait conservé en mémoire jusqu'à `FILE_UPLOAD_MAX_MEMORY_SIZE`, et tous
+les fichiers seraient lus avant que la vue ne s'exécute. Ici, chaque partie
+est écrite au fil de la réception (un seul bloc en mémoire) et validée au
+passage :
+
+- extension vérifiée dès les en-têtes de la partie, avant d'en écrire le
+  contenu ;
+- taille vérifiée à chaque bloc : l'écriture d'une partie trop grande cesse
+  dès que la limite est dépassée.
+
+Une partie refusée est ignorée (`SkipFile`) et l'erreur est conservée dans
+`errors`. Le rejet « au plus tôt » porte sur l'écriture, pas sur la lecture :
+le reste de la partie est tout de même lu sur la connexion (puis jeté, sans
+toucher au disque), afin d'atteindre les parties suivantes du lot et de
+répondre avec les erreurs de chaque fichier. Interrompre la requête
+(`StopUpload(connection_reset=True)`) perdrait les fichiers valides qui
+suivent et, le plus souvent, la réponse elle-même ; la taille totale du corps
+reste bornée par la configuration du serveur frontal.
+"""
+
+import hashlib
+import os
+import tempfile
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, TemporaryFileUploadHandler
+
+from .utils import SNIFF_SIZE, sniff_mime_type
+from .validators import validate_file_extension, validate_file_size
+
+
+def incoming_dir():
+    """
+    Retourne le répertoire des fichiers reçus, résolu à chaque appel.
+
+    Returns:
+        str: `FILES_UPLOAD_INCOMING_DIR`, ou `.incoming` sous `MEDIA_ROOT`
+        s'il n'est pas défini (même système de fichiers que le stockage).
+    """
+    return settings.FILES_UPLOAD_INCOMING_DIR or os.path.join(settings.MEDIA_ROOT, '.incoming')
+
+
+class IncomingUploadedFile(TemporaryUploadedFile):
+    """Fichier temporaire d'upload créé sous `incoming_dir()`."""
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        directory = incoming_dir()
+        os.makedirs(directory, exist_ok=True)
+        file = tempfile.NamedTemporaryFile(suffix='.upload' + ext, dir=directory)
+        UploadedFile.__init__(self, file, name, content_type, size, charset, content_type_extra)
+
+
+class SinglePassUploadHandler(TemporaryFileUploadHandler):
+    """
+    Écrit le fichier sous `incoming_dir()` en calculant empreinte et type MIME.
+
+    Le fichier renvoyé (`TemporaryUploadedFile`) porte en plus :
+    - `sha256` : empreinte SHA-256 hexadécimale du contenu ;
+    - `mime_type` : type MIME détecté d'après les premiers octets.
+    """
+
+    def new_file(self, *args, **kwargs):
+        """Crée le fichier temporaire et réinitialise empreinte et en-tête."""
+        FileUploadHandler.new_file(self, *args, **kwargs)
+        self.file = IncomingUploadedFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+        )
+        self.digest = hashlib.sha256()
+        self.head = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        """
+        Écrit un bloc en mettant à jour l'empreinte et l'en-tête à analyser.
+
+        Returns:
+            None: Le bloc est consommé par ce gestionnaire.
+        """
+        self.digest.update(raw_data)
+        if len(self.head) < SNIFF_SIZE:
+            self.head += raw_data[:SNIFF_SIZE - len(self.head)]
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        """
+        Finalise le fichier reçu et y attache empreinte et type MIME.
+
+        Args:
+            file_size (int): Taille totale reçue.
+
+        Returns:
+            TemporaryUploadedFile: Fichier reçu.
+        """
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.digest.hexdigest()
+        uploaded.mime_type = sniff_mime_type(self.head, self.file_name)
+        return uploaded
+
+
+class ValidatingUploadHandler(SinglePassUploadHandler):
+    """
+    Écrit chaque partie sur le disque en validant extension et taille.
+
+    Attributes:
+        errors (list[dict]): Parties refusées (`filename`, `errors`), dans
+            le même format que les erreurs de `upload_multiple`.
+    """
+
+    def __init__(self, request=None):
+        """
+        Args:
+            request (HttpRequest): Requête en cours.
+        """
+        super().__init__(request)
+        self.errors = []
+
+    def new_file(self, *args, **kwargs):
+        """
+        Crée le fichier temporaire de la partie et vérifie son extension.
+
+        Le fichier est créé avant la vérification : `SkipFile` ferme (et
+        supprime) le fichier courant du gestionnaire, qui doit donc être
+        celui de la partie refusée.
+
+        Raises:
+            SkipFile: Si l'extension est interdite ou la taille annoncée trop grande.
+        """
+        super().new_file(*args, **kwargs)
+        self._check(validate_file_extension, SimpleNamespace(name=self.file_name))
+        if self.content_length is not None:
+            self._check(validate_file_size, SimpleNamespace(size=self.content_length))
+
+    def receive_data_chunk(self, raw_data, start):
+        """
+        Écrit un bloc de la partie après avoir vérifié la taille cumulée.
+
+        Raises:
+            SkipFile: Si la partie dépasse la taille maximale.
+        """
+        self._check(validate_file_size, SimpleNamespace(size=start + len(raw_data)))
+        return super().receive_data_chunk(raw_data, start)
+
+    def _check(self, validator, value):
+        """Applique un validateur ; en cas d'échec, note l'erreur et ignore la partie."""
+        try:
+            validator(value)
+        except ValidationError as exc:
+            self.errors.append({'filename': self.file_name, 'errors': {'file': exc.messages}})
+            raise SkipFile()
@@ -0,0 +1,245 @@
+"""
+Commande `bench_asgi_downloads` : téléchargements lents simultanés sous ASGI.
+
+Envoie des requêtes `GET /api/files/{id}/download/` directement à
+l'application ASGI du projet (`app.asgi`), dans un seul processus (un
+worker), en simulant des clients lents : chaque bloc reçu n'est acquitté
+qu'après le temps nécessaire pour le transmettre au débit `--bandwidth-kb`.
+Deux modes sont comparés pour chaque niveau de concurrence :
+
+- `sync` : comportement précédent (`FILES_ASYNC_STREAMING=False`), le contenu
+  est un itérateur synchrone que Django lit en entier, dans un thread, avant
+  l'envoi ;
+- `async` : itérateur asynchrone de `files.downloads`, lu bloc par bloc au
+  rythme du client.
+
+Pour chaque mesure sont affichés le temps jusqu'au premier octet et la durée
+des téléchargements (p50/p99), la hausse maximale de la mémoire résidente et
+le nombre maximal de threads (échantillonnés pendant la mesure). Un niveau de
+concurrence est tenu si le p99 de la durée reste sous `--tolerance` fois la
+durée idéale (taille / débit) et si la mémoire reste sous `--memory-mb`.
+
+Note:
+    Sous ASGI, Django associe déjà un thread à chaque requête en cours
+    (`ThreadSensitiveContext`) : le nombre de threads est le même dans les
+    deux modes. En mode `sync`, ce thread lit tout le fichier en mémoire
+    avant le premier octet ; en mode `async`, il reste inactif pendant
+    l'envoi et la mémoire ne dépend plus de la taille des fichiers.
+
+Usage :
+    python manage.py bench_asgi_downloads
+    python manage.py bench_asgi_downloads --clients 100,200,500 --size-kb 16384 --memory-mb 1024
+"""
+
+import asyncio
+import os
+import statistics
+import threading
+import time
+import warnings
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ecole.models import Ecole
+from files.asgi import StreamingASGIHandler
+from files.models import File
+
+#: Intervalle d'échantillonnage de la mémoire et du nombre de threads (secondes).
+SAMPLE_INTERVAL = 0.01
+
+
+def _rss():
+    """Mémoire résidente du processus en octets (Linux), `0` si indisponible."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def _percentile(values, fraction):
+    """Retourne le percentile `fraction` (0-1) d'une liste de valeurs."""
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    """Compare les téléchargements synchrones et asynchrones sous ASGI."""
+
+    help = "Mesure combien de téléchargements lents simultanés un worker ASGI soutient."
+
+    def add_arguments(self, parser):
+        """Déclare les options de la commande."""
+        parser.add_argument('--clients', default='20,50,100,200',
+                            help="Niveaux de concurrence, séparés par des virgules (défaut : 20,50,100,200).")
+        parser.add_argument('--size-kb', type=int, default=8192,
+                            help="Taille du fichier téléchargé, en Ko (défaut : 8192).")
+        parser.add_argument('--bandwidth-kb', type=int, default=1024,
+                            help="Débit simulé de chaque client, en Ko/s (défaut : 1024).")
+        parser.add_argument('--tolerance', type=float, default=1.5,
+                            help="Facteur de la durée idéale au-delà duquel le niveau n'est pas tenu (défaut : 1.5).")
+        parser.add_argument('--memory-mb', type=int, default=512,
+                            help="Mémoire supplémentaire maximale du worker, en Mo (défaut : 512).")
+
+    def handle(self, *args, **options):
+        """Prépare le fichier et l'utilisateur puis mesure chaque mode."""
+        file_obj, token = self._prepare(options['size_kb'] * 1024)
+        path = f'/api/files/{file_obj.pk}/download/'
+        bandwidth = options['bandwidth_kb'] * 1024
+        ideal = file_obj.file_size / bandwidth
+        levels = [int(value) for value in options['clients'].split(',')]
+        application = StreamingASGIHandler()
+
+        self.stdout.write(
+            f"Fichier : {file_obj.file_size // 1024} Ko — débit client : {options['bandwidth_kb']} Ko/s "
+            f"— durée idéale : {ideal:.2f} s"
+        )
+        sustained = {}
+        for mode in ('sync', 'async'):
+            sustained[mode] = 0
+            with override_settings(FILES_ASYNC_STREAMING=(mode == 'async')), warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                for clients in levels:
+                    result = asyncio.run(self._run(application, path, token, clients, bandwidth))
+                    ok = (
+                        result['errors'] == 0
+                        and result['p99'] <= ideal * options['tolerance']
+                        and result['peak_memory'] <= options['memory_mb'] * 1024 ** 2
+                    )
+                    if ok:
+                        sustained[mode] = max(sustained[mode], clients)
+                    self.stdout.write(
+                        f"{mode:<5} {clients:>5} clients  "
+                        f"TTFB p50={result['ttfb_p50'] * 1000:8.1f} ms p99={result['ttfb_p99'] * 1000:8.1f} ms  "
+                        f"durée p50={result['p50']:6.2f} s p99={result['p99']:6.2f} s  "
+                        f"mémoire={result['peak_memory'] / 1024 ** 2:7.1f} Mo  threads={result['threads']:>3}  "
+                        f"erreurs={result['errors']}  {'OK' if ok else 'DÉPASSÉ'}"
+                    )
+
+        self.stdout.write(self.style.SUCCESS(
+            "Téléchargements lents simultanés tenus : "
+            + ", ".join(f"{mode} = {count}" for mode, count in sustained.items())
+        ))
+
+    def _prepare(self, size):
+        """
+        Crée (ou réutilise) l'utilisateur, l'école et le fichier du benchmark.
+
+        Args:
+            size (int): Taille du fichier, en octets.
+
+        Returns:
+            tuple[File, str]: Fichier à télécharger et jeton d'accès JWT.
+        """
+        user, created = get_user_model().objects.get_or_create(username='bench_asgi')
+        if created:
+            user.set_unusable_password()
+            user.save()
+        ecole, _ = Ecole.objects.get_or_create(
+            name="École benchmark ASGI",
+            defaults={'address': "-", 'city': "-", 'postal_code': "0000", 'phone': "00000000"},
+        )
+        file_obj = File.objects.filter(ecole=ecole, file_size=size).first()
+        if file_obj is None:
+            file_obj = File.objects.create(
+                ecole=ecole, uploaded_by=user,
+                file=ContentFile(bytes(range(256)) * (size // 256), name='bench.bin'),
+            )
+        return file_obj, str(AccessToken.for_user(user))
+
+    async def _run(self, application, path, token, clients, bandwidth):
+        """
+        Lance `clients` téléchargements lents simultanés.
+
+        Returns:
+            dict: Percentiles (secondes), hausse maximale de la mémoire
+            résidente, threads et erreurs.
+        """
+        stop = asyncio.Event()
+        baseline = _rss()
+        max_threads, peak_memory = threading.active_count(), 0
+
+        async def sample():
+            nonlocal max_threads, peak_memory
+            while not stop.is_set():
+                max_threads = max(max_threads, threading.active_count())
+                peak_memory = max(peak_memory, _rss() - baseline)
+                await asyncio.sleep(SAMPLE_INTERVAL)
+
+        sampler = asyncio.create_task(sample())
+        results = await asyncio.gather(*[
+            self._download(application, path, token, bandwidth) for _ in range(clients)
+        ])
+        stop.set()
+        await sampler
+
+        completed = [result for result in results if result['status'] == 200]
+        durations = [result['duration'] for result in completed] or [float('inf')]
+        ttfbs = [result['ttfb'] for result in completed] or [float('inf')]
+        return {
+            'ttfb_p50': statistics.median(ttfbs),
+            'ttfb_p99': _percentile(ttfbs, 0.99),
+            'p50': statistics.median(durations),
+            'p99': _percentile(durations, 0.99),
+            'peak_memory': peak_memory,
+            'threads': max_threads,
+            'errors': clients - len(completed),
+        }
+
+    @staticmethod
+    async def _download(application, path, token, bandwidth):
+        """
+        Télécharge un fichier comme un client lent, via l'interface ASGI.
+
+        Returns:
+            dict: Statut HTTP, temps jusqu'au premier octet et durée totale (secondes).
+        """
+        host = next((host for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [(b'host', host.encode()), (b'authorization', f'Bearer {token}'.encode())],
+            'client': ('127.0.0.1', 0),
+            'server': (host, 80),
+        }
+        result = {'status': None, 'ttfb': None, 'duration': None}
+        finished = asyncio.Event()
+        request_sent = False
+        start = time.perf_counter()
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await finished.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                result['status'] = message['status']
+                return
+            body = message.get('body', b'')
+            if body and result['ttfb'] is None:
+                result['ttfb'] = time.perf_counter() - start
+            # Client lent : le bloc suivant n'est accepté qu'une fois celui-ci transmis
+            await asyncio.sleep(len(body) / bandwidth)
+            if not message.get('more_body', False):
+                result['duration'] = time.perf_counter() - start
+                finished.set()
+
+        await application(scope, receive, send)
+        finished.set()
+        return result
@@ -0,0 +1,136 @@
+"""
+Commande `bench_file_list` : latence et plans d'exécution de la liste des fichiers.
+
+Pour chaque combinaison des filtres de `GET /api/files/` (`ecole`, `type`,
+`my_files`, voir `files.filters`), mesure les percentiles p50/p99 de la
+première page et d'une page profonde de la pagination par curseur
+(`files.pagination`), et affiche le plan d'exécution (`EXPLAIN`) de la
+requête. Les mesures portent sur une table éventuellement peuplée de
+fichiers synthétiques (`files.benchmarks.seed_files`, ~10M lignes).
+
+Usage :
+    python manage.py bench_file_list --seed --rows 10000000
+    python manage.py bench_file_list --iterations 500 --analyze
+    python manage.py bench_file_list --max-p99 20   # échoue au-delà de 20 ms
+
+Note:
+    Le plan affiché dépend du moteur ; sous PostgreSQL, lancer `ANALYZE`
+    après le peuplement pour que le planificateur dispose de statistiques.
+"""
+
+import itertools
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from ecole.models import Ecole
+from files.benchmarks import seed_files
+from files.filters import FILTER_PARAMS, filter_files
+from files.models import File
+from files.pagination import FileCursorPagination
+
+#: Objectif de latence (millisecondes) au p99.
+TARGET_MS = 10
+
+
+class Command(BaseCommand):
+    """Mesure la liste des fichiers pour chaque combinaison de filtres."""
+
+    help = "Mesure la latence (p50/p99) et le plan de la liste des fichiers par combinaison de filtres."
+
+    def add_arguments(self, parser):
+        """Déclare les options de la commande."""
+        parser.add_argument('--rows', type=int, default=10_000_000,
+                            help="Nombre de fichiers visé lors du peuplement (défaut : 10 000 000).")
+        parser.add_argument('--seed', action='store_true',
+                            help="Complète la table avec des fichiers synthétiques jusqu'à --rows.")
+        parser.add_argument('--iterations', type=int, default=200,
+                            help="Nombre de requêtes mesurées par combinaison et par page (défaut : 200).")
+        parser.add_argument('--page-size', type=int, default=10,
+                            help="Taille de page (défaut : 10).")
+        parser.add_argument('--analyze', action='store_true',
+                            help="Affiche EXPLAIN ANALYZE (PostgreSQL) au lieu de EXPLAIN.")
+        parser.add_argument('--max-p99', type=float,
+                            help="Échoue si le p99 d'une combinaison dépasse cette valeur (ms).")
+
+    def handle(self, *args, **options):
+        """Peuple la table si demandé puis mesure chaque combinaison de filtres."""
+        if options['seed']:
+            seed_files(options['rows'], stdout=self.stdout)
+
+        ecole_ids = list(Ecole.objects.values_list('id', flat=True)[:1000])
+        users = list(get_user_model().objects.filter(files__isnull=False).distinct()[:200])
+        if not ecole_ids or not users:
+            raise CommandError("Aucun fichier en base (utilisez --seed).")
+        types = [value for value, _ in File.FILE_TYPES]
+
+        self.stdout.write(f"Moteur : {connection.vendor} — {File.objects.count()} fichier(s)")
+        rng = random.Random(42)
+        deep_cursor = timezone.now() - timedelta(days=365)
+        ordering = FileCursorPagination.ordering
+        limit = options['page_size'] + 1
+        failures = []
+
+        for size in range(len(FILTER_PARAMS) + 1):
+            for combination in itertools.combinations(FILTER_PARAMS, size):
+                label = '+'.join(combination) or 'aucun'
+
+                def page(deep):
+                    user = rng.choice(users)
+                    params = {
+                        'ecole': str(rng.choice(ecole_ids)),
+                        'type': rng.choice(types),
+                        'my_files': '1',
+                    }
+                    queryset = filter_files(
+                        File.objects.select_related('ecole', 'uploaded_by'),
+                        {name: params[name] for name in combination},
+                        user,
+                    ).order_by(*ordering)
+                    if deep:
+                        queryset = queryset.filter(uploaded_at__lt=deep_cursor)
+                    return queryset[:limit]
+
+                self.stdout.write(self.style.MIGRATE_HEADING(f"Filtres : {label}"))
+                for deep in (False, True):
+                    p50, p99 = self.measure(lambda: list(page(deep)), options['iterations'])
+                    verdict = self.style.SUCCESS('OK') if p99 < TARGET_MS else self.style.WARNING('> objectif')
+                    self.stdout.write(
+                        f"  {'profonde' if deep else 'première':>9} : p50 = {p50:.2f} ms, "
+                        f"p99 = {p99:.2f} ms [{verdict}]"
+                    )
+                    if options['max_p99'] is not None and p99 > options['max_p99']:
+                        failures.append(f"{label} ({'profonde' if deep else 'première'}) : {p99:.2f} ms")
+                explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+                explain = page(True).explain(**explain_options)
+                for line in explain.splitlines():
+                    self.stdout.write(f"    {line}")
+
+        if failures:
+            raise CommandError("p99 au-delà de --max-p99 : " + ', '.join(failures))
+
+    @staticmethod
+    def measure(run, iterations):
+        """
+        Exécute `run` plusieurs fois et retourne les percentiles de latence.
+
+        Args:
+            run (callable): Requête à mesurer.
+            iterations (int): Nombre d'exécutions.
+
+        Returns:
+            tuple[float, float]: p50 et p99 en millisecondes.
+        """
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.99))]
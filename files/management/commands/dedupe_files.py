@@ -0,0 +1,93 @@
+"""
+Commande `dedupe_files` : migration des fichiers existants vers les blobs.
+
+Les fichiers uploadés avant l'activation de `FILES_DEDUPLICATION` sont
+stockés individuellement (`files.utils.get_file_path`). Cette commande
+les rattache, par lots, au blob correspondant à leur contenu
+(`files.blobs.store_blob`), puis supprime la copie individuelle : l'espace
+disque occupé par les doublons est libéré. Un fichier compressé
+(`files.compression`) est rattaché d'après son contenu d'origine.
+
+Usage :
+    python manage.py dedupe_files
+    python manage.py dedupe_files --batch-size 200
+"""
+
+import os
+
+from django.core.files.base import File as DjangoFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from files.blobs import release_blobs, store_blob
+from files.compression import open_content
+from files.models import File
+
+
+class Command(BaseCommand):
+    """Rattache les fichiers non dédupliqués à des blobs, par lots."""
+
+    help = "Déduplique les fichiers existants en les rattachant à des blobs SHA-256."
+
+    def add_arguments(self, parser):
+        """Déclare les options de la commande."""
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Nombre de fichiers traités par transaction (défaut : 500)."
+        )
+
+    def handle(self, *args, **options):
+        """Parcourt les fichiers sans blob par clé primaire croissante."""
+        last_id = 0
+        migrated = missing = skipped = 0
+
+        while True:
+            batch = list(
+                File.objects.filter(pk__gt=last_id, blob__isnull=True)
+                .order_by('pk')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+
+            obsolete = []
+            with transaction.atomic():
+                for file_obj in batch:
+                    if not file_obj.file or not file_obj.file.storage.exists(file_obj.file.name):
+                        missing += 1
+                        continue
+                    if file_obj.content_encoding:
+                        # Contenu compressé : empreinte et taille du contenu d'origine
+                        with open_content(file_obj) as stored:
+                            content = DjangoFile(stored, name=file_obj.filename)
+                            content.size = file_obj.file_size
+                            blob = store_blob(content, file_obj.content_encoding)
+                    else:
+                        with file_obj.file.open('rb'):
+                            blob = store_blob(file_obj.file)
+                    updated = File.objects.filter(
+                        pk=file_obj.pk, blob__isnull=True, file=file_obj.file.name
+                    ).update(
+                        blob=blob, content_hash=blob.sha256, file=blob.name,
+                        content_encoding=blob.content_encoding,
+                    )
+                    if not updated:
+                        # Fichier supprimé ou modifié entre-temps : la référence ajoutée est retirée
+                        release_blobs({blob.pk: 1})
+                        skipped += 1
+                        continue
+                    obsolete.append(file_obj.file.path)
+                    migrated += 1
+
+            # Les copies individuelles ne sont supprimées qu'après validation du lot
+            for path in obsolete:
+                if os.path.isfile(path):
+                    os.remove(path)
+            self.stdout.write(f"{migrated} fichier(s) dédupliqué(s)...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Terminé : {migrated} fichier(s) dédupliqué(s), {missing} fichier(s) introuvable(s), "
+            f"{skipped} fichier(s) modifié(s) pendant le traitement."
+        ))
@@ -0,0 +1,40 @@
+"""
+Commande `purge_upload_sessions` : nettoyage des uploads abandonnés.
+
+Supprime les sessions d'upload non finalisées dont le dernier morceau date
+de plus de `FILE_UPLOAD_SESSION_TTL_HOURS` heures (ou `--hours`), ainsi que
+leurs fichiers partiels. Les sessions finalisées plus anciennes que ce délai
+sont également supprimées (le fichier créé est conservé).
+
+Usage :
+    python manage.py purge_upload_sessions
+    python manage.py purge_upload_sessions --hours 6
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from files.models import UploadSession
+
+
+class Command(BaseCommand):
+    """Supprime les sessions d'upload expirées et leurs fichiers partiels."""
+
+    help = "Supprime les sessions d'upload expirées et leurs fichiers partiels."
+
+    def add_arguments(self, parser):
+        """Déclare les options de la commande."""
+        parser.add_argument('--hours', type=int, default=settings.FILE_UPLOAD_SESSION_TTL_HOURS,
+                            help="Âge minimal (en heures) d'une session à supprimer.")
+
+    def handle(self, *args, **options):
+        """Supprime les sessions inactives depuis plus de `--hours` heures."""
+        limit = timezone.now() - timedelta(hours=options['hours'])
+        purged = 0
+        for session in UploadSession.objects.filter(updated_at__lt=limit).select_related('ecole').iterator():
+            session.delete()
+            purged += 1
+        self.stdout.write(self.style.SUCCESS(f"{purged} session(s) d'upload supprimée(s)."))
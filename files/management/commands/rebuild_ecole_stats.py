@@ -0,0 +1,110 @@
+"""
+Commande `rebuild_ecole_stats` : recalcul des compteurs de fichiers par école.
+
+Les compteurs `Ecole.files_count`, `Ecole.storage_used` et `EcoleFileStats`
+sont maintenus incrémentalement par `File.save`/`File.delete`. Les opérations
+qui contournent ces méthodes (suppressions en masse via `QuerySet.delete`,
+modifications manuelles en base) peuvent les faire dériver ; cette commande
+les recalcule à partir de la table des fichiers, par lots d'écoles.
+
+Les réservations de quota (`files_reserved`, `storage_reserved`, voir
+`ecole.quotas`) sont recalculées à partir des sessions d'upload non
+finalisées ; les réservations des uploads simples en cours, libérées à leur
+fin, sont alors ignorées (les compteurs ne descendent pas sous zéro).
+
+Usage :
+    python manage.py rebuild_ecole_stats
+    python manage.py rebuild_ecole_stats --batch-size 200
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from ecole.models import Ecole, EcoleFileStats
+from files.models import File, UploadSession
+
+
+class Command(BaseCommand):
+    """Recalcule les agrégats de fichiers de chaque école par lots."""
+
+    help = "Recalcule les compteurs de fichiers (nombre, volume, par type) de chaque école."
+
+    def add_arguments(self, parser):
+        """Déclare les options de la commande."""
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Nombre d'écoles recalculées par transaction (défaut : 500)."
+        )
+
+    def handle(self, *args, **options):
+        """Parcourt les écoles par lots de clés primaires et recalcule leurs compteurs."""
+        batch_size = options['batch_size']
+        last_id = 0
+        total = 0
+
+        while True:
+            ids = list(
+                Ecole.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            self.rebuild_batch(ids)
+            total += len(ids)
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"{total} école(s) recalculée(s)."))
+
+    @transaction.atomic
+    def rebuild_batch(self, ids):
+        """
+        Recalcule les compteurs d'un lot d'écoles dans une seule transaction.
+
+        Les lignes `Ecole` du lot sont verrouillées pendant le calcul pour que
+        les uploads concurrents appliquent leur incrément après la réécriture.
+
+        Args:
+            ids (list[int]): Identifiants des écoles du lot.
+        """
+        ecoles = list(Ecole.objects.select_for_update().filter(pk__in=ids))
+
+        rows = (
+            File.objects.filter(ecole_id__in=ids)
+            .order_by()
+            .values('ecole_id', 'file_type')
+            .annotate(files_count=Count('id'), total_size=Sum('file_size'))
+        )
+
+        totals = {}
+        per_type = []
+        for row in rows:
+            count, size = totals.get(row['ecole_id'], (0, 0))
+            totals[row['ecole_id']] = (count + row['files_count'], size + (row['total_size'] or 0))
+            per_type.append(EcoleFileStats(
+                ecole_id=row['ecole_id'],
+                file_type=row['file_type'],
+                files_count=row['files_count'],
+                total_size=row['total_size'] or 0,
+            ))
+
+        reserved = {
+            row['ecole_id']: (row['files'], row['size'] or 0)
+            for row in UploadSession.objects.filter(ecole_id__in=ids, finalized_at__isnull=True)
+            .order_by()
+            .values('ecole_id')
+            .annotate(files=Count('id'), size=Sum('length'))
+        }
+
+        for ecole in ecoles:
+            ecole.files_count, ecole.storage_used = totals.get(ecole.pk, (0, 0))
+            ecole.files_reserved, ecole.storage_reserved = reserved.get(ecole.pk, (0, 0))
+        Ecole.objects.bulk_update(
+            ecoles, ['files_count', 'storage_used', 'files_reserved', 'storage_reserved']
+        )
+
+        EcoleFileStats.objects.filter(ecole_id__in=ids).delete()
+        EcoleFileStats.objects.bulk_create(per_type)
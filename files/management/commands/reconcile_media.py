@@ -0,0 +1,88 @@
+"""
+Commande `reconcile_media` : rapprochement du stockage et de la base.
+
+Compare les fichiers présents sous `MEDIA_ROOT` aux contenus référencés en
+base (`File.file`, `Blob.name`, fichiers partiels des sessions d'upload) par
+une jointure par fusion de deux flux triés (voir `files.reconcile`) : le
+parcours du disque est réparti sur un pool de processus et les clés de la
+base sont lues par lots, sans charger l'un ou l'autre côté en mémoire.
+
+- fichiers orphelins (sur le disque, sans ligne) : signalés, supprimés avec
+  `--delete-orphans`, s'ils n'ont pas été modifiés depuis `--min-age-hours` ;
+- contenus absents (ligne sans fichier) : signalés, les lignes `File`
+  concernées sont marquées (`missing_at`) avec `--mark-missing` ; une ligne
+  marquée dont le fichier réapparaît est démarquée.
+
+Sans option, la commande ne modifie rien. Avec `-v 2`, chaque fichier
+orphelin ou contenu absent est listé.
+
+Usage :
+    python manage.py reconcile_media
+    python manage.py reconcile_media --delete-orphans --mark-missing --workers 8
+"""
+
+from django.core.management.base import BaseCommand
+
+from files.models import File
+from files.reconcile import Reconciler
+
+
+class Command(BaseCommand):
+    """Signale ou corrige les écarts entre le stockage et la base."""
+
+    help = "Rapproche les fichiers de MEDIA_ROOT et les lignes File (orphelins, contenus absents)."
+
+    def add_arguments(self, parser):
+        """Déclare les options de la commande."""
+        parser.add_argument(
+            '--delete-orphans',
+            action='store_true',
+            help="Supprime les fichiers sans ligne en base."
+        )
+        parser.add_argument(
+            '--mark-missing',
+            action='store_true',
+            help="Marque (missing_at) les lignes dont le fichier est absent."
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help="Nombre de processus de parcours du disque (défaut : nombre de CPU)."
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help="Nombre de lignes lues et mises à jour par lot (défaut : 2000)."
+        )
+        parser.add_argument(
+            '--min-age-hours',
+            type=float,
+            default=1.0,
+            help="Âge minimal, en heures, d'un fichier orphelin (défaut : 1)."
+        )
+
+    def handle(self, *args, **options):
+        """Effectue le rapprochement et affiche le bilan."""
+        log = self.stdout.write if options['verbosity'] >= 2 else None
+        report = Reconciler(
+            File._meta.get_field('file').storage,
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            min_age=options['min_age_hours'] * 3600,
+            delete_orphans=options['delete_orphans'],
+            mark_missing=options['mark_missing'],
+            log=log,
+        ).run()
+
+        self.stdout.write(
+            f"{report.scanned} fichier(s) parcouru(s), {report.referenced} référencé(s), "
+            f"{report.recent} récent(s) ignoré(s)."
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Terminé : {report.orphans} fichier(s) orphelin(s) ({report.orphan_bytes} octets), "
+            f"{report.deleted} supprimé(s) ; {report.missing_files} fichier(s) et "
+            f"{report.missing_blobs} contenu(s) dédupliqué(s) absent(s), "
+            f"{report.marked} ligne(s) marquée(s), {report.restored} ligne(s) rétablie(s)."
+        ))
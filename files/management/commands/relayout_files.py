@@ -0,0 +1,118 @@
+"""
+Commande `relayout_files` : migration des fichiers vers l'arborescence répartie.
+
+Les fichiers non dédupliqués uploadés avant l'arborescence
+`files/{ab}/{cd}/{uuid}` (`files.utils.get_file_path`) sont stockés sous
+`schools/{id_ecole}/files/{nom_fichier}`. Cette commande les déplace, par
+lots, sans interrompre le service :
+
+1. chaque fichier du lot reçoit un second nom dans la nouvelle arborescence
+   (lien physique, copie si le système de fichiers ne le permet pas) ;
+2. les lignes `File` sont mises à jour dans une transaction, seulement si
+   elles pointent toujours vers l'ancien chemin (fichier supprimé ou
+   remplacé entre-temps : la ligne est laissée telle quelle) ;
+3. les anciens chemins ne sont supprimés qu'après validation du lot.
+
+Un téléchargement en cours ou une requête ayant lu l'ancien chemin avant la
+mise à jour trouve donc toujours le fichier. La commande peut être
+interrompue et relancée : les fichiers déjà déplacés sont ignorés.
+
+Usage :
+    python manage.py relayout_files
+    python manage.py relayout_files --batch-size 200 --pause 0.5
+"""
+
+import os
+import shutil
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from files.models import File
+from files.utils import FILE_ROOT, get_file_path
+
+
+class Command(BaseCommand):
+    """Déplace les fichiers de l'ancienne arborescence, par lots."""
+
+    help = "Déplace les fichiers existants vers l'arborescence files/{ab}/{cd}/{uuid}."
+
+    def add_arguments(self, parser):
+        """Déclare les options de la commande."""
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Nombre de fichiers traités par transaction (défaut : 500)."
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help="Pause entre deux lots, en secondes, pour limiter la charge (défaut : 0)."
+        )
+
+    def handle(self, *args, **options):
+        """Parcourt les fichiers à déplacer par clé primaire croissante."""
+        storage = File._meta.get_field('file').storage
+        last_id = 0
+        moved = missing = skipped = 0
+
+        while True:
+            batch = list(
+                File.objects.filter(pk__gt=last_id, blob__isnull=True)
+                .exclude(file__startswith=f'{FILE_ROOT}/')
+                .only('pk', 'file', 'filename', 'content_encoding')
+                .order_by('pk')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+
+            linked = []
+            for file_obj in batch:
+                old_name = file_obj.file.name
+                if not old_name or not storage.exists(old_name):
+                    missing += 1
+                    continue
+                new_name = get_file_path(file_obj, file_obj.filename or os.path.basename(old_name))
+                self._link(storage.path(old_name), storage.path(new_name))
+                linked.append((file_obj.pk, old_name, new_name))
+
+            obsolete = []
+            with transaction.atomic():
+                for pk, old_name, new_name in linked:
+                    if File.objects.filter(pk=pk, file=old_name).update(file=new_name):
+                        obsolete.append(old_name)
+                        moved += 1
+                    else:
+                        obsolete.append(new_name)
+                        skipped += 1
+
+            # Les anciens chemins ne sont supprimés qu'après validation du lot
+            for name in obsolete:
+                storage.delete(name)
+            self.stdout.write(f"{moved} fichier(s) déplacé(s)...")
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Terminé : {moved} fichier(s) déplacé(s), {missing} fichier(s) introuvable(s), "
+            f"{skipped} fichier(s) modifié(s) pendant la migration."
+        ))
+
+    @staticmethod
+    def _link(source, target):
+        """
+        Donne au fichier `source` le nom supplémentaire `target`.
+
+        Args:
+            source (str): Chemin absolu existant.
+            target (str): Chemin absolu dans la nouvelle arborescence.
+        """
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
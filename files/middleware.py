@@ -0,0 +1,73 @@
+"""Émulation de `X-Accel-Redirect` / `X-Sendfile` sans serveur web.
+
+En production, nginx (ou Apache) intercepte les réponses de téléchargement
+portant ces en-têtes et envoie lui-même le fichier. Ce middleware joue ce
+rôle pour les tests et `runserver` : il vérifie que l'en-tête désigne bien
+un fichier sous `MEDIA_ROOT`, puis remplace la réponse par le contenu.
+
+Il ne doit pas être activé derrière un vrai serveur web.
+"""
+
+import os
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotFound, HttpResponseServerError
+
+#: En-têtes de la réponse d'origine conservés, comme le fait nginx.
+PASSTHROUGH_HEADERS = ('Content-Type', 'Content-Disposition', 'ETag', 'Last-Modified', 'Accept-Ranges')
+
+
+class SendfileEmulationMiddleware:
+    """
+    Sert les fichiers désignés par `X-Accel-Redirect` ou `X-Sendfile`.
+
+    - `X-Accel-Redirect` doit commencer par `FILES_DOWNLOAD_INTERNAL_PREFIX` ;
+    - `X-Sendfile` doit être un chemin absolu ;
+    - dans les deux cas, le fichier doit se trouver sous `MEDIA_ROOT`
+      (sinon 500), et exister (sinon 404).
+    """
+
+    def __init__(self, get_response):
+        """
+        Args:
+            get_response (callable): Middleware ou vue suivante.
+        """
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """
+        Remplace les réponses de redirection interne par le fichier désigné.
+
+        Args:
+            request (HttpRequest): Requête HTTP.
+
+        Returns:
+            HttpResponse: Réponse d'origine, ou fichier servi.
+        """
+        response = self.get_response(request)
+        if response.has_header('X-Accel-Redirect'):
+            prefix = settings.FILES_DOWNLOAD_INTERNAL_PREFIX.rstrip('/') + '/'
+            location = response['X-Accel-Redirect']
+            if not location.startswith(prefix):
+                return HttpResponseServerError('X-Accel-Redirect hors de la location interne')
+            path = os.path.join(settings.MEDIA_ROOT, unquote(location[len(prefix):]))
+        elif response.has_header('X-Sendfile'):
+            path = response['X-Sendfile']
+            if not os.path.isabs(path):
+                return HttpResponseServerError('X-Sendfile doit être un chemin absolu')
+        else:
+            return response
+
+        root = os.path.realpath(settings.MEDIA_ROOT)
+        path = os.path.realpath(path)
+        if os.path.commonpath([root, path]) != root:
+            return HttpResponseServerError('Fichier hors de MEDIA_ROOT')
+        if not os.path.isfile(path):
+            return HttpResponseNotFound()
+
+        served = FileResponse(open(path, 'rb'))
+        for header in PASSTHROUGH_HEADERS:
+            if response.has_header(header):
+                served[header] = response[header]
+        return served
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-16 21:11
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecole', '0006_ecole_deletion'),
+        ('files', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Nom du fichier')),
+                ('description', models.TextField(blank=True, verbose_name='Description')),
+                ('length', models.PositiveBigIntegerField(verbose_name='Taille totale (octets)')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Octets reçus')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ecole', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='ecole.ecole', verbose_name='École')),
+                ('file', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='files.file')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "Session d'upload",
+                'verbose_name_plural': "Sessions d'upload",
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-16 21:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0002_upload_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='Empreinte SHA-256')),
+                ('name', models.CharField(max_length=255, verbose_name='Chemin de stockage')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Taille (octets)')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Références')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Contenu',
+                'verbose_name_plural': 'Contenus',
+            },
+        ),
+        migrations.AddField(
+            model_name='file',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='file',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='files', to='files.blob'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecole', '0006_ecole_deletion'),
+        ('files', '0003_blob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='file',
+            name='files_file_file_ty_2d7e73_idx',
+        ),
+        migrations.AddIndex(
+            model_name='file',
+            index=models.Index(fields=['file_type', '-uploaded_at'], name='file_type_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='file',
+            index=models.Index(fields=['uploaded_by', '-uploaded_at'], name='file_uploader_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='file',
+            index=models.Index(fields=['-uploaded_at'], name='file_uploaded_idx'),
+        ),
+    ]
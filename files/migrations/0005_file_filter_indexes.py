@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecole', '0006_ecole_deletion'),
+        ('files', '0004_file_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Les index composites sont créés avant la suppression des index simples des clés étrangères
+        migrations.AddIndex(
+            model_name='file',
+            index=models.Index(fields=['ecole', 'file_type', '-uploaded_at'], name='file_ecole_type_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='file',
+            index=models.Index(fields=['ecole', 'uploaded_by', '-uploaded_at'], name='file_ecole_user_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='file',
+            index=models.Index(fields=['uploaded_by', 'file_type', '-uploaded_at'], name='file_user_type_uploaded_idx'),
+        ),
+        migrations.AlterField(
+            model_name='file',
+            name='ecole',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='files', to='ecole.ecole', verbose_name='École'),
+        ),
+        migrations.AlterField(
+            model_name='file',
+            name='uploaded_by',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='files', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0005_file_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file',
+            name='missing_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Contenu absent depuis'),
+        ),
+    ]
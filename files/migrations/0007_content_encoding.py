@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0006_file_missing_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blob',
+            name='content_encoding',
+            field=models.CharField(blank=True, max_length=16, verbose_name='Encodage du stockage'),
+        ),
+        migrations.AddField(
+            model_name='file',
+            name='content_encoding',
+            field=models.CharField(blank=True, max_length=16, verbose_name='Encodage du stockage'),
+        ),
+    ]
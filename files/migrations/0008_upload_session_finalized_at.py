@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:30
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_finalized_sessions(apps, schema_editor):
+    """Marque finalisées les sessions qui référencent encore leur fichier."""
+    UploadSession = apps.get_model('files', 'UploadSession')
+    UploadSession.objects.filter(file__isnull=False).update(finalized_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0007_content_encoding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='finalized_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Finalisée le'),
+        ),
+        migrations.RunPython(mark_finalized_sessions, migrations.RunPython.noop),
+    ]
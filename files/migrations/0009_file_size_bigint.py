@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0008_upload_session_finalized_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='file',
+            name='file_size',
+            field=models.PositiveBigIntegerField(verbose_name='Taille (octets)'),
+        ),
+    ]
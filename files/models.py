@@ -1,12 +1,57 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
 from ecole.models import Ecole  # Import depuis l'app Ecoles
+from ecole.quotas import release_quota
+from ecole.stats import record_file_change
 from .validators import validate_file_size, validate_file_extension
 from .utils import get_file_path, determine_file_type, get_mime_type
+from .compression import compress_content, compression_for
 import os
+import uuid
 from django.conf import settings
 
+class Blob(models.Model):
+    """
+    Contenu binaire stocké une seule fois, identifié par son empreinte SHA-256.
+
+    Plusieurs objets `File` (même circulaire envoyée par plusieurs écoles, par
+    exemple) partagent le même blob ; `ref_count` compte ces références et le
+    fichier physique n'est supprimé qu'à la disparition de la dernière
+    (voir `files.blobs`).
+
+    Attributes:
+        sha256 (str): Empreinte SHA-256 du contenu (hexadécimal).
+        name (str): Chemin du contenu dans le stockage (`blobs/ab/cd/<sha256>`).
+        size (int): Taille du contenu d'origine en octets.
+        content_encoding (str): Encodage du contenu stocké (`gzip`, vide si
+            stocké tel quel ; voir `files.compression`).
+        ref_count (int): Nombre d'objets `File` qui référencent ce blob.
+        created_at (datetime): Date du premier stockage.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name="Empreinte SHA-256")
+    name = models.CharField(max_length=255, verbose_name="Chemin de stockage")
+    size = models.PositiveBigIntegerField(verbose_name="Taille (octets)")
+    content_encoding = models.CharField(max_length=16, blank=True, verbose_name="Encodage du stockage")
+    ref_count = models.PositiveIntegerField(default=0, verbose_name="Références")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """Options Meta pour le modèle Blob."""
+        verbose_name = "Contenu"
+        verbose_name_plural = "Contenus"
+
+    def __str__(self) -> str:
+        """
+        Représentation en chaîne de caractères d'un blob.
+
+        Returns:
+            str: Empreinte et nombre de références.
+        """
+        return f"{self.sha256} ({self.ref_count})"
+
+
 class File(models.Model):
     """
     Modèle représentant un fichier uploadé dans le système.
@@ -17,9 +62,15 @@ class File(models.Model):
         file (FileField): Le fichier uploadé.
         filename (str): Nom du fichier.
         file_type (str): Type du fichier (pdf, image, document, etc.).
-        file_size (int): Taille du fichier en octets.
+        file_size (int): Taille du fichier en octets (contenu d'origine, même compressé).
         mime_type (str): Type MIME du fichier.
         description (str): Description optionnelle du fichier.
+        blob (ForeignKey): Contenu dédupliqué partagé (`None` hors déduplication).
+        content_hash (str): Empreinte SHA-256 du contenu (vide hors déduplication).
+        content_encoding (str): Encodage du contenu stocké (`gzip`, vide si
+            stocké tel quel ; voir `files.compression`).
+        missing_at (datetime): Date à laquelle le contenu a été constaté absent
+            du stockage (`reconcile_media`), `None` s'il est présent.
         uploaded_at (datetime): Date et heure de l'upload.
         updated_at (datetime): Date et heure de la dernière modification.
     """
@@ -34,16 +85,19 @@ class File(models.Model):
     ]
 
     # Relations
+    # Pas d'index simple : les index composites de Meta commencent par ces colonnes
     ecole = models.ForeignKey(
         Ecole,
         on_delete=models.CASCADE,
         related_name='files',
-        verbose_name="École"
+        verbose_name="École",
+        db_index=False
     )
     uploaded_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='files'
+        related_name='files',
+        db_index=False
     )
 
     # Champs fichier
@@ -56,10 +110,25 @@ class File(models.Model):
     # Métadonnées
     filename = models.CharField(max_length=255, verbose_name="Nom du fichier")
     file_type = models.CharField(max_length=20, choices=FILE_TYPES, default='other')
-    file_size = models.IntegerField(verbose_name="Taille (octets)")
+    file_size = models.PositiveBigIntegerField(verbose_name="Taille (octets)")
     mime_type = models.CharField(max_length=100, blank=True)
     description = models.TextField(blank=True, verbose_name="Description")
 
+    # Stockage adressé par contenu (files.blobs)
+    blob = models.ForeignKey(
+        Blob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='files'
+    )
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, verbose_name="SHA-256")
+    # Compression au repos (files.compression)
+    content_encoding = models.CharField(max_length=16, blank=True, verbose_name="Encodage du stockage")
+
+    # Rapprochement avec le stockage (files.reconcile)
+    missing_at = models.DateTimeField(null=True, blank=True, verbose_name="Contenu absent depuis")
+
     # Timestamps
     uploaded_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -69,11 +138,32 @@ class File(models.Model):
         verbose_name = "Fichier"
         verbose_name_plural = "Fichiers"
         ordering = ['-uploaded_at']
+        # Un index par combinaison de filtres de FileViewSet.get_queryset (files.filters),
+        # suivi de la colonne de tri ; ils servent aussi les jointures sur `ecole` et `uploaded_by`
         indexes = [
             models.Index(fields=['ecole', '-uploaded_at']),
-            models.Index(fields=['file_type']),
+            models.Index(fields=['file_type', '-uploaded_at'], name='file_type_uploaded_idx'),
+            models.Index(fields=['uploaded_by', '-uploaded_at'], name='file_uploader_uploaded_idx'),
+            models.Index(fields=['-uploaded_at'], name='file_uploaded_idx'),
+            models.Index(fields=['ecole', 'file_type', '-uploaded_at'], name='file_ecole_type_uploaded_idx'),
+            models.Index(fields=['ecole', 'uploaded_by', '-uploaded_at'], name='file_ecole_user_uploaded_idx'),
+            models.Index(fields=['uploaded_by', 'file_type', '-uploaded_at'], name='file_user_type_uploaded_idx'),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Conserve les valeurs chargées depuis la base pour détecter, lors d'une
+        sauvegarde ultérieure, les changements qui affectent les compteurs de l'école.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value
+            for name, value in zip(field_names, values)
+            if value is not models.DEFERRED
+        }
+        return instance
+
     def __str__(self) -> str:
         """
         Représentation en chaîne de caractères d'un fichier.
@@ -86,32 +176,103 @@ class File(models.Model):
     def save(self, *args, **kwargs):
         """
         Override de la méthode save pour extraire automatiquement les métadonnées
-        du fichier uploadé (nom, taille, type et MIME).
+        du fichier uploadé (nom, taille, type et MIME) et maintenir les compteurs
+        de fichiers de l'école (`ecole.stats.record_file_change`) et le cache
+        des statistiques (`files.stats.invalidate_file_stats`). Taille,
+        empreinte et MIME calculés à la réception (`files.handlers`) sont repris
+        sans relire le fichier.
+
+        Si `FILES_DEDUPLICATION` est activé, un nouveau contenu est stocké dans
+        un blob adressé par son SHA-256 (`files.blobs.store_blob`) : un contenu
+        déjà présent n'est pas réécrit, seule sa référence est comptée.
+
+        Avec `FILES_COMPRESSION`, un nouveau contenu texte ou CSV est stocké
+        compressé (`files.compression`) ; `file_size` reste la taille d'origine.
 
         Args:
             *args: Arguments positionnels.
             **kwargs: Arguments nommés.
         """
-        if self.file:
+        from .blobs import release_blobs, store_blob
+        from .stats import invalidate_file_stats
+
+        new_upload = bool(self.file) and not self.file._committed
+        # Un fichier enregistré porte le nom de son chemin de stockage (UUID ou blob) :
+        # le nom d'origine et les métadonnées ne sont extraits qu'à l'upload
+        if self.file and (new_upload or not self.filename):
             self.filename = os.path.basename(self.file.name)
             self.file_size = self.file.size
             self.file_type = determine_file_type(self.filename)
-            self.mime_type = get_mime_type(self.filename)
+            # Type détecté d'après le contenu à la réception (files.handlers), sinon d'après l'extension
+            sniffed = getattr(self.file.file, 'mime_type', None) if new_upload else None
+            self.mime_type = sniffed or get_mime_type(self.filename)
+
+        adding = self._state.adding
+        previous = getattr(self, '_loaded_values', {})
 
-        super().save(*args, **kwargs)
+        # Le fichier et les compteurs de l'école sont écrits dans la même transaction
+        with transaction.atomic():
+            if new_upload:
+                encoding = compression_for(self.file_type, self.mime_type, self.file_size)
+                if settings.FILES_DEDUPLICATION:
+                    blob = store_blob(self.file, encoding)
+                    self.blob = blob
+                    self.content_hash = blob.sha256
+                    self.content_encoding = blob.content_encoding
+                    self.file = blob.name
+                elif encoding:
+                    # Écrit sous get_file_path (suffixe .gz) par la sauvegarde du champ
+                    self.content_encoding = encoding
+                    self.file = compress_content(self.file)
+            super().save(*args, **kwargs)
+            if previous.get('blob_id') and previous['blob_id'] != self.blob_id:
+                release_blobs({previous['blob_id']: 1})
+            if adding:
+                record_file_change(self.ecole_id, self.file_type, 1, self.file_size)
+                invalidate_file_stats(self.ecole_id)
+            elif {'ecole_id', 'file_type', 'file_size'} <= previous.keys():
+                if previous['ecole_id'] != self.ecole_id or previous['file_type'] != self.file_type:
+                    record_file_change(previous['ecole_id'], previous['file_type'], -1, -previous['file_size'])
+                    record_file_change(self.ecole_id, self.file_type, 1, self.file_size)
+                    invalidate_file_stats(previous['ecole_id'], self.ecole_id)
+                elif previous['file_size'] != self.file_size:
+                    record_file_change(
+                        self.ecole_id, self.file_type, 0, self.file_size - previous['file_size']
+                    )
+                    invalidate_file_stats(self.ecole_id)
+
+        self._loaded_values = {
+            'ecole_id': self.ecole_id,
+            'file_type': self.file_type,
+            'file_size': self.file_size,
+            'blob_id': self.blob_id,
+        }
 
     def delete(self, *args, **kwargs):
         """
         Override de la méthode delete pour supprimer le fichier physique
-        du stockage lors de la suppression de l'objet.
+        du stockage lors de la suppression de l'objet et décrémenter les
+        compteurs de fichiers de l'école.
+
+        Un fichier adossé à un blob libère sa référence : le contenu n'est
+        supprimé du disque que s'il n'est plus référencé par aucun fichier.
 
         Args:
             *args: Arguments positionnels.
             **kwargs: Arguments nommés.
         """
-        if self.file and os.path.isfile(self.file.path):
+        from .blobs import release_blobs
+        from .stats import invalidate_file_stats
+
+        if not self.blob_id and self.file and os.path.isfile(self.file.path):
             os.remove(self.file.path)
-        super().delete(*args, **kwargs)
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            if self.blob_id:
+                release_blobs({self.blob_id: 1})
+            record_file_change(self.ecole_id, self.file_type, -1, -self.file_size)
+            invalidate_file_stats(self.ecole_id)
+        return result
 
     def get_file_size_display(self) -> str:
         """
@@ -127,3 +288,108 @@ class File(models.Model):
             return f"{size / 1024:.2f} KB"
         else:
             return f"{size / (1024 * 1024):.2f} MB"
+
+
+class UploadSession(models.Model):
+    """
+    Session d'upload reprenable (protocole inspiré de tus).
+
+    Le client crée une session en annonçant la taille totale du fichier, envoie
+    ensuite le contenu par morceaux (`PATCH` à un décalage donné) puis finalise
+    la session, ce qui crée l'objet `File`. Les morceaux sont écrits directement
+    sur le disque dans un fichier partiel, sous `.uploads/` dans le stockage.
+
+    Attributes:
+        id (UUID): Identifiant de la session (non devinable).
+        ecole (ForeignKey): École de destination du fichier.
+        uploaded_by (ForeignKey): Utilisateur propriétaire de la session.
+        filename (str): Nom du fichier final.
+        description (str): Description du fichier final.
+        length (int): Taille totale annoncée, en octets.
+        offset (int): Nombre d'octets reçus et écrits sur le disque.
+        file (ForeignKey): Fichier créé à la finalisation (`None` avant, ou
+            après la suppression du fichier).
+        finalized_at (datetime | None): Date de finalisation (`None` tant que
+            la session n'est pas finalisée) ; seul indicateur fiable de
+            finalisation, `file` repassant à `None` si le fichier est supprimé.
+        created_at (datetime): Date de création de la session.
+        updated_at (datetime): Date du dernier morceau reçu.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    ecole = models.ForeignKey(
+        Ecole,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        verbose_name="École"
+    )
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+    filename = models.CharField(max_length=255, verbose_name="Nom du fichier")
+    description = models.TextField(blank=True, verbose_name="Description")
+    length = models.PositiveBigIntegerField(verbose_name="Taille totale (octets)")
+    offset = models.PositiveBigIntegerField(default=0, verbose_name="Octets reçus")
+    file = models.ForeignKey(
+        File,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    finalized_at = models.DateTimeField(null=True, blank=True, verbose_name="Finalisée le")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Options Meta pour le modèle UploadSession."""
+        verbose_name = "Session d'upload"
+        verbose_name_plural = "Sessions d'upload"
+
+    def __str__(self) -> str:
+        """
+        Représentation en chaîne de caractères d'une session d'upload.
+
+        Returns:
+            str: Nom du fichier et progression.
+        """
+        return f"{self.filename} ({self.offset}/{self.length})"
+
+    @property
+    def partial_name(self) -> str:
+        """
+        Nom, dans le stockage, du fichier partiel de la session.
+
+        Returns:
+            str: Chemin relatif `.uploads/{ab}/{id}.part` (`ab` : début de l'identifiant).
+        """
+        return f'.uploads/{self.pk.hex[:2]}/{self.pk}.part'
+
+    @property
+    def partial_path(self) -> str:
+        """
+        Chemin absolu du fichier partiel sur le disque.
+
+        Returns:
+            str: Chemin absolu.
+        """
+        return File._meta.get_field('file').storage.path(self.partial_name)
+
+    def delete(self, *args, **kwargs):
+        """
+        Override de la méthode delete pour supprimer le fichier partiel et,
+        si la session n'a pas été finalisée, libérer sa réservation de quota.
+
+        Args:
+            *args: Arguments positionnels.
+            **kwargs: Arguments nommés.
+        """
+        if os.path.isfile(self.partial_path):
+            os.remove(self.partial_path)
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            if self.finalized_at is None:
+                release_quota(self.ecole_id, 1, self.length)
+        return result
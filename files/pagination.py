@@ -0,0 +1,31 @@
+"""Pagination par curseur pour l'API des fichiers.
+
+Même principe que `ecole.pagination` : ni `COUNT(*)` ni `OFFSET`, chaque page
+est obtenue par une condition `WHERE uploaded_at < ...` servie par un index.
+Le tri `(-uploaded_at, -id)` est celui des index composites de `File`
+(`(ecole, -uploaded_at)`, `(file_type, -uploaded_at)`,
+`(uploaded_by, -uploaded_at)`, `(-uploaded_at)` et les combinaisons de
+filtres) : quel que soit le filtre de `files.filters.filter_files`, une page
+profonde coûte autant que la première.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class FileCursorPagination(CursorPagination):
+    """Pagination par curseur opaque pour `GET /api/files/`.
+
+    Activée avec le paramètre `?pagination=cursor`. Les liens `next` et
+    `previous` contiennent un curseur encodé (`?cursor=...`) qui conserve
+    les filtres de la requête.
+
+    Attributes:
+        ordering (tuple): Tri fixe, aligné sur les index ; `id` départage les
+            fichiers uploadés au même instant.
+        page_size_query_param (str): Paramètre permettant de choisir la taille de page.
+        max_page_size (int): Taille de page maximale autorisée.
+    """
+
+    ordering = ('-uploaded_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,48 @@
+"""Parseurs spécifiques à l'API des fichiers."""
+
+from django.conf import settings
+from django.http.multipartparser import MultiPartParser as DjangoMultiPartParser, MultiPartParserError
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import DataAndFiles, MultiPartParser
+
+from .handlers import ValidatingUploadHandler
+
+
+class StreamingMultiPartParser(MultiPartParser):
+    """
+    Parseur multipart qui valide et écrit chaque fichier au fil de la lecture.
+
+    Remplace les gestionnaires d'upload de la requête par un unique
+    `ValidatingUploadHandler` ; les parties refusées sont exposées dans
+    `request.upload_errors`.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Analyse le corps multipart avec `ValidatingUploadHandler`.
+
+        Args:
+            stream: Flux binaire du corps de la requête.
+            media_type (str): Type de contenu de la requête.
+            parser_context (dict): Contexte fourni par DRF.
+
+        Returns:
+            DataAndFiles: Champs et fichiers acceptés.
+
+        Raises:
+            ParseError: Si le corps multipart est invalide.
+        """
+        parser_context = parser_context or {}
+        request = parser_context['request']
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        meta = request.META.copy()
+        meta['CONTENT_TYPE'] = media_type
+        handler = ValidatingUploadHandler(request._request)
+        request.upload_errors = handler.errors
+
+        try:
+            parser = DjangoMultiPartParser(meta, stream, [handler], encoding)
+            data, files = parser.parse()
+            return DataAndFiles(data, files)
+        except MultiPartParserError as exc:
+            raise ParseError('Multipart form parse error - %s' % str(exc))
@@ -0,0 +1,324 @@
+"""Rapprochement du stockage des fichiers et de la base (`reconcile_media`).
+
+Des fichiers physiques peuvent rester sans ligne `File` (cascade SQL à la
+suppression d'une école, upload interrompu, fichier temporaire de
+`FILES_UPLOAD_INCOMING_DIR` abandonné, modification manuelle), et des lignes
+peuvent désigner un fichier disparu. Le rapprochement compare les deux côtés
+par une jointure par fusion de deux flux triés, sans charger l'un ou l'autre
+en mémoire :
+
+- disque : les deux premiers niveaux de l'arborescence (`files/ab`,
+  `blobs/ab`, `schools/{id}`, ...) sont découpés en unités disjointes,
+  parcourues par `os.scandir` dans un pool de processus ; chaque unité est
+  triée par son processus, et les unités sont consommées dans l'ordre (au
+  plus `2 × workers` en mémoire) : le flux global est trié ;
+- base : noms de stockage des fichiers non dédupliqués (`File.file`) et des
+  blobs (`Blob.name`), lus par lots avec un curseur côté serveur et triés
+  par la base selon une collation binaire (même ordre qu'en Python), plus
+  les fichiers partiels des sessions d'upload en cours.
+
+Un fichier n'est considéré orphelin que s'il n'a pas été modifié depuis
+`min_age` secondes : un upload en cours (écrit avant la validation de sa
+ligne) n'est jamais signalé.
+"""
+
+import heapq
+import multiprocessing
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from django.db import connection, connections
+from django.db.models.functions import Collate
+from django.utils import timezone
+
+from .models import Blob, File, UploadSession
+
+#: Collation binaire par moteur : ordre identique à la comparaison de chaînes Python.
+BINARY_COLLATIONS = {
+    'postgresql': 'C',
+    'sqlite': 'BINARY',
+    'mysql': 'utf8mb4_bin',
+}
+
+
+@dataclass
+class ReconcileReport:
+    """
+    Résultat d'un rapprochement.
+
+    Attributes:
+        scanned (int): Fichiers trouvés sur le disque.
+        referenced (int): Fichiers présents sur le disque et en base.
+        orphans (int): Fichiers sans ligne en base (assez anciens).
+        orphan_bytes (int): Volume des fichiers orphelins.
+        recent (int): Fichiers sans ligne, trop récents pour être signalés.
+        deleted (int): Fichiers orphelins supprimés.
+        missing_files (int): Fichiers non dédupliqués dont le contenu a disparu.
+        missing_blobs (int): Blobs dont le contenu a disparu.
+        marked (int): Lignes `File` marquées absentes (`missing_at`).
+        restored (int): Lignes `File` de nouveau présentes (`missing_at` effacé).
+    """
+
+    scanned: int = 0
+    referenced: int = 0
+    orphans: int = 0
+    orphan_bytes: int = 0
+    recent: int = 0
+    deleted: int = 0
+    missing_files: int = 0
+    missing_blobs: int = 0
+    marked: int = 0
+    restored: int = 0
+
+
+def scan_unit(root, unit):
+    """
+    Liste, triés, les fichiers d'une unité de l'arborescence (exécuté dans un processus).
+
+    Args:
+        root (str): Racine du stockage.
+        unit (str): Chemin relatif d'un répertoire (parcouru récursivement) ou d'un fichier.
+
+    Returns:
+        list[str]: Chemins relatifs (séparateur `/`) des fichiers de l'unité.
+    """
+    path = os.path.join(root, unit)
+    if not os.path.isdir(path):
+        return [unit]
+    names = []
+    stack = [(path, unit)]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            name = f'{prefix}/{entry.name}'
+            if entry.is_dir(follow_symlinks=False):
+                stack.append((entry.path, name))
+            elif entry.is_file(follow_symlinks=False):
+                names.append(name)
+    names.sort()
+    return names
+
+
+def _units(root, depth=2):
+    """
+    Découpe l'arborescence en unités disjointes, dans l'ordre du flux trié.
+
+    Un répertoire est ordonné comme `nom + '/'`, préfixe de tous ses
+    fichiers : concaténer les listes triées des unités donne un flux trié.
+
+    Args:
+        root (str): Racine du stockage.
+        depth (int): Nombre de niveaux découpés.
+
+    Returns:
+        list[str]: Chemins relatifs des unités.
+    """
+    units, frontier = [], ['']
+    for level in range(depth):
+        next_frontier = []
+        for prefix in frontier:
+            try:
+                entries = list(os.scandir(os.path.join(root, prefix)))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                name = f'{prefix}/{entry.name}' if prefix else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if level < depth - 1:
+                        next_frontier.append(name)
+                    else:
+                        units.append((name + '/', name))
+                elif entry.is_file(follow_symlinks=False):
+                    units.append((name, name))
+        frontier = next_frontier
+    units.sort()
+    return [name for _, name in units]
+
+
+def iter_disk_names(root, workers):
+    """
+    Parcourt le stockage en parallèle et produit les chemins dans l'ordre.
+
+    Les connexions à la base sont fermées avant la création des processus,
+    qui ne doivent pas en hériter.
+
+    Args:
+        root (str): Racine du stockage.
+        workers (int): Nombre de processus.
+
+    Yields:
+        str: Chemins relatifs triés.
+    """
+    units = _units(root)
+    connections.close_all()
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    with context.Pool(workers) as pool:
+        pending = deque()
+        units = iter(units)
+        for unit in units:
+            pending.append(pool.apply_async(scan_unit, (root, unit)))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            yield from pending.popleft().get()
+            unit = next(units, None)
+            if unit is not None:
+                pending.append(pool.apply_async(scan_unit, (root, unit)))
+
+
+def _sorted_keys(queryset, field, batch_size):
+    """Trie un queryset par `field` selon la collation binaire du moteur et le lit par lots."""
+    collation = BINARY_COLLATIONS.get(connection.vendor)
+    ordering = Collate(field, collation) if collation else field
+    return queryset.order_by(ordering).iterator(chunk_size=batch_size)
+
+
+def iter_db_keys(batch_size):
+    """
+    Fusionne, triés par nom, les contenus attendus dans le stockage.
+
+    Args:
+        batch_size (int): Nombre de lignes lues par lot.
+
+    Returns:
+        Iterator[tuple]: Nom de stockage, nature (`file`, `blob` ou
+        `session`), identifiant et indicateur « déjà marqué absent ».
+    """
+    files = (
+        (name, 'file', pk, missing_at is not None)
+        for name, pk, missing_at in _sorted_keys(
+            File.objects.filter(blob__isnull=True).exclude(file='')
+            .values_list('file', 'pk', 'missing_at'),
+            'file', batch_size,
+        )
+    )
+    blobs = (
+        (name, 'blob', pk, False)
+        for name, pk in _sorted_keys(Blob.objects.values_list('name', 'pk'), 'name', batch_size)
+    )
+    # Sessions en cours : peu nombreuses (purgées après FILE_UPLOAD_SESSION_TTL_HOURS)
+    sessions = sorted(
+        (session.partial_name, 'session', session.pk, False)
+        for session in UploadSession.objects.filter(finalized_at__isnull=True).only('pk')
+    )
+    return heapq.merge(files, blobs, sessions)
+
+
+class Reconciler:
+    """
+    Jointure par fusion du stockage et de la base.
+
+    Attributes:
+        report (ReconcileReport): Compteurs du rapprochement.
+    """
+
+    def __init__(self, storage, workers=None, batch_size=2000, min_age=3600,
+                 delete_orphans=False, mark_missing=False, log=None):
+        """
+        Args:
+            storage (FileSystemStorage): Stockage des fichiers.
+            workers (int | None): Processus de parcours (défaut : nombre de CPU).
+            batch_size (int): Lignes lues et mises à jour par lot.
+            min_age (int): Âge minimal, en secondes, d'un fichier orphelin.
+            delete_orphans (bool): Supprimer les fichiers orphelins.
+            mark_missing (bool): Marquer les lignes dont le contenu a disparu.
+            log (callable | None): Reçoit une ligne par orphelin ou contenu absent.
+        """
+        self.storage = storage
+        self.root = storage.path('')
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.min_age = min_age
+        self.delete_orphans = delete_orphans
+        self.mark_missing = mark_missing
+        self.log = log or (lambda line: None)
+        self.report = ReconcileReport()
+        self._missing_files, self._missing_blobs, self._restored = [], [], []
+
+    def run(self):
+        """
+        Effectue le rapprochement.
+
+        Returns:
+            ReconcileReport: Compteurs du rapprochement.
+        """
+        self._now = time.time()
+        disk = iter_disk_names(self.root, self.workers)
+        keys = iter_db_keys(self.batch_size)
+        name, key = next(disk, None), next(keys, None)
+        while name is not None or key is not None:
+            if key is None or (name is not None and name < key[0]):
+                self._orphan(name)
+                name = next(disk, None)
+            elif name is None or key[0] < name:
+                self._missing(key)
+                key = next(keys, None)
+            else:
+                self.report.scanned += 1
+                self.report.referenced += 1
+                # Plusieurs lignes peuvent désigner le même nom
+                while key is not None and key[0] == name:
+                    if key[1] == 'file' and key[3]:
+                        self._restored.append(key[2])
+                    key = next(keys, None)
+                name = next(disk, None)
+            self._flush()
+        self._flush(force=True)
+        return self.report
+
+    def _orphan(self, name):
+        """Traite un fichier sans ligne en base."""
+        self.report.scanned += 1
+        path = os.path.join(self.root, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        if self._now - stat.st_mtime < self.min_age:
+            self.report.recent += 1
+            return
+        self.report.orphans += 1
+        self.report.orphan_bytes += stat.st_size
+        self.log(f"orphelin : {name} ({stat.st_size} octets)")
+        if self.delete_orphans:
+            os.remove(path)
+            self.report.deleted += 1
+
+    def _missing(self, key):
+        """Traite une ligne dont le contenu est absent du disque."""
+        name, kind, pk, already_marked = key
+        if kind == 'session':
+            # Session sans morceau reçu : le fichier partiel n'existe pas encore
+            return
+        if kind == 'blob':
+            self.report.missing_blobs += 1
+            self._missing_blobs.append(pk)
+        else:
+            self.report.missing_files += 1
+            if not already_marked:
+                self._missing_files.append(pk)
+        self.log(f"absent : {name} ({kind} {pk})")
+
+    def _flush(self, force=False):
+        """Écrit, par lots, les marquages `missing_at` accumulés."""
+        pending = len(self._missing_files) + len(self._missing_blobs) + len(self._restored)
+        if not pending or (pending < self.batch_size and not force):
+            return
+        if self.mark_missing:
+            now = timezone.now()
+            if self._missing_files:
+                self.report.marked += File.objects.filter(pk__in=self._missing_files).update(missing_at=now)
+            if self._missing_blobs:
+                self.report.marked += File.objects.filter(
+                    blob_id__in=self._missing_blobs, missing_at__isnull=True
+                ).update(missing_at=now)
+            if self._restored:
+                self.report.restored += File.objects.filter(pk__in=self._restored).update(missing_at=None)
+        self._missing_files, self._missing_blobs, self._restored = [], [], []
@@ -1,6 +1,12 @@
+import os
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.base import File as DjangoFile
 from rest_framework import serializers
-from .models import File
+from .models import File, UploadSession
+from .validators import validate_file_extension, validate_file_size
 from ecole.models import Ecole
+from ecole.quotas import quota_reservation, release_quota, reserve_quota
 
 class FileSerializer(serializers.ModelSerializer):
     """
@@ -32,11 +38,11 @@ class FileSerializer(serializers.ModelSerializer):
             'id', 'ecole', 'ecole_name', 'file', 'file_url', 'filename',
             'file_type', 'file_size', 'file_size_display', 'mime_type',
             'description', 'uploaded_by', 'uploaded_by_username',
-            'uploaded_at', 'updated_at'
+            'missing_at', 'uploaded_at', 'updated_at'
         ]
         read_only_fields = [
             'filename', 'file_size', 'file_type', 'mime_type',
-            'uploaded_by', 'uploaded_at', 'updated_at'
+            'uploaded_by', 'missing_at', 'uploaded_at', 'updated_at'
         ]
 
     def get_file_url(self, obj):
@@ -63,11 +69,29 @@ class FileUploadSerializer(serializers.ModelSerializer):
     - ecole
     - file
     - description
+
+    Le fichier est enregistré sous réserve des quotas de l'école (`ecole.quotas`).
     """
     class Meta:
         model = File
         fields = ['ecole', 'file', 'description']
 
+    def create(self, validated_data):
+        """
+        Crée le fichier en réservant sa place sur les quotas de l'école.
+
+        Args:
+            validated_data (dict): Données validées.
+
+        Raises:
+            QuotaExceeded: Si le fichier dépasse l'un des quotas de l'école.
+
+        Returns:
+            File: Le fichier créé.
+        """
+        with quota_reservation(validated_data['ecole'].pk, 1, validated_data['file'].size):
+            return super().create(validated_data)
+
     def validate_ecole(self, value):
         """
         Vérifie que l'école existe dans la base de données.
@@ -81,11 +105,24 @@ class FileUploadSerializer(serializers.ModelSerializer):
         Returns:
             Ecole: L'école validée.
         """
-        if not Ecole.objects.filter(id=value.id).exists():
+        if not Ecole.objects.active().filter(id=value.id).exists():
             raise serializers.ValidationError("École non trouvée")
         return value
 
 
+class FileBatchItemSerializer(serializers.Serializer):
+    """
+    Validation d'un fichier d'un upload multiple (`files.batch`).
+
+    L'école est validée une seule fois pour tout le lot : seul le fichier est
+    vérifié ici (nom, contenu non vide, taille et extension), sans requête.
+    """
+    file = serializers.FileField(
+        max_length=File._meta.get_field('file').max_length,
+        validators=[validate_file_size, validate_file_extension]
+    )
+
+
 class FileListSerializer(serializers.ModelSerializer):
     """
     Sérialiseur léger pour lister les fichiers.
@@ -113,3 +150,101 @@ class FileListSerializer(serializers.ModelSerializer):
             'id', 'filename', 'file_type', 'file_size',
             'ecole', 'ecole_name', 'uploaded_by_username', 'uploaded_at'
         ]
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Sérialiseur des sessions d'upload reprenables.
+
+    À la création, seuls `ecole`, `filename`, `length` et `description` sont
+    fournis ; `offset`, `file` et `finalized_at` évoluent au fil des envois et de la
+    finalisation.
+    La taille annoncée est réservée sur les quotas de l'école jusqu'à la
+    finalisation ou l'abandon de la session (`ecole.quotas`).
+    """
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'ecole', 'filename', 'description', 'length', 'offset', 'file', 'finalized_at', 'created_at'
+        ]
+        read_only_fields = ['id', 'offset', 'file', 'finalized_at', 'created_at']
+
+    def validate_ecole(self, value):
+        """
+        Vérifie que l'école existe et n'est pas en cours de suppression.
+
+        Args:
+            value (Ecole): Instance de l'école.
+
+        Raises:
+            serializers.ValidationError: Si l'école n'existe pas.
+
+        Returns:
+            Ecole: L'école validée.
+        """
+        if not Ecole.objects.active().filter(id=value.id).exists():
+            raise serializers.ValidationError("École non trouvée")
+        return value
+
+    def validate_filename(self, value):
+        """
+        Réduit le nom au nom de base et vérifie son extension.
+
+        Args:
+            value (str): Nom du fichier annoncé par le client.
+
+        Raises:
+            serializers.ValidationError: Si le nom est vide ou l'extension interdite.
+
+        Returns:
+            str: Nom de fichier validé.
+        """
+        value = os.path.basename(value.strip())
+        if not value:
+            raise serializers.ValidationError("Nom de fichier invalide.")
+        try:
+            validate_file_extension(DjangoFile(None, name=value))
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.messages)
+        return value
+
+    def validate_length(self, value):
+        """
+        Vérifie que la taille annoncée ne dépasse pas `FILE_UPLOAD_SESSION_MAX_SIZE`.
+
+        Args:
+            value (int): Taille totale annoncée, en octets.
+
+        Raises:
+            serializers.ValidationError: Si la taille dépasse la limite.
+
+        Returns:
+            int: Taille validée.
+        """
+        max_size = settings.FILE_UPLOAD_SESSION_MAX_SIZE
+        if value > max_size:
+            raise serializers.ValidationError(
+                f"La taille du fichier ne doit pas dépasser {max_size // (1024 * 1024)}MB"
+            )
+        return value
+
+    def create(self, validated_data):
+        """
+        Crée la session en réservant la taille annoncée sur les quotas de l'école.
+
+        Args:
+            validated_data (dict): Données validées.
+
+        Raises:
+            QuotaExceeded: Si le fichier annoncé dépasse l'un des quotas de l'école.
+
+        Returns:
+            UploadSession: La session créée.
+        """
+        ecole_id, length = validated_data['ecole'].pk, validated_data['length']
+        reserve_quota(ecole_id, 1, length)
+        try:
+            return super().create(validated_data)
+        except Exception:
+            release_quota(ecole_id, 1, length)
+            raise
@@ -0,0 +1,152 @@
+"""Statistiques agrégées des fichiers (`GET /api/files/stats/`).
+
+Nombre de fichiers et volume par école et par type, éventuellement répartis
+par période d'upload (`interval` : jour, semaine, mois ou année), calculés
+par une seule requête `GROUP BY` sur la table des fichiers (index composite
+`ecole, file_type, -uploaded_at`), puis mis en cache.
+
+Le cache est invalidé par générations : chaque école a un jeton de
+génération (`files:stats:gen:{id}`), ainsi que l'ensemble des écoles
+(`files:stats:gen:all`), et les clés des résultats incluent ce jeton.
+`invalidate_file_stats` remplace les jetons des écoles modifiées, après
+validation de la transaction : toutes les combinaisons de paramètres en
+cache pour ces écoles deviennent inaccessibles d'un coup. Il est appelé par
+`File.save`, `File.delete`, `files.batch.upload_batch` et
+`ecole.deletion.request_deletion`.
+
+Les compteurs maintenus à chaque écriture (`ecole.stats`) donnent déjà les
+totaux par type sans agrégat (`GET /api/ecoles/stats/`) ; cet endpoint y
+ajoute les filtres et l'histogramme par période.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Trunc
+
+from .models import File
+
+#: Périodes de l'histogramme (`Trunc`).
+INTERVALS = ('day', 'week', 'month', 'year')
+
+
+def _generation_key(scope):
+    """Clé du jeton de génération d'une école (ou `all`)."""
+    return f'files:stats:gen:{scope}'
+
+
+def _generation(scope):
+    """
+    Retourne le jeton de génération d'une école (ou `all`), créé si absent.
+
+    Un jeton expulsé du cache est remplacé par un nouveau jeton aléatoire :
+    les résultats calculés avant l'expulsion ne sont plus jamais relus.
+    """
+    key = _generation_key(scope)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+def invalidate_file_stats(*ecole_ids):
+    """
+    Invalide les statistiques en cache des écoles données (et de l'ensemble).
+
+    Dans une transaction, l'invalidation a lieu après sa validation : une
+    requête concurrente ne peut pas remettre en cache l'état précédent.
+
+    Args:
+        *ecole_ids (int): Identifiants des écoles dont les fichiers ont changé.
+    """
+    def invalidate():
+        cache.set_many(
+            {_generation_key(scope): uuid.uuid4().hex for scope in (*ecole_ids, 'all')},
+            None,
+        )
+
+    transaction.on_commit(invalidate)
+
+
+def compute_file_stats(ecole_id=None, file_type=None, interval=None):
+    """
+    Calcule les statistiques par une seule requête `GROUP BY`.
+
+    Args:
+        ecole_id (int | None): Restreindre à une école.
+        file_type (str | None): Restreindre à un type de fichier.
+        interval (str | None): Période de l'histogramme (`INTERVALS`), sans histogramme si `None`.
+
+    Returns:
+        list[dict]: Par école (ordre des identifiants) : `ecole`, `files_count`,
+        `total_size`, `file_stats` et, avec `interval`, `histogram`.
+    """
+    queryset = File.objects.filter(ecole__deletion_requested_at__isnull=True)
+    if ecole_id is not None:
+        queryset = queryset.filter(ecole_id=ecole_id)
+    if file_type:
+        queryset = queryset.filter(file_type=file_type)
+
+    fields = ['ecole', 'file_type']
+    if interval:
+        queryset = queryset.annotate(period=Trunc('uploaded_at', interval))
+        fields.append('period')
+    rows = (
+        queryset.values(*fields)
+        .annotate(files_count=Count('pk'), total_size=Sum('file_size'))
+        .order_by(*fields)
+    )
+
+    results = {}
+    for row in rows:
+        entry = results.setdefault(row['ecole'], {
+            'ecole': row['ecole'], 'files_count': 0, 'total_size': 0, 'file_stats': {}, 'histogram': {},
+        })
+        entry['files_count'] += row['files_count']
+        entry['total_size'] += row['total_size']
+        type_stats = entry['file_stats'].setdefault(row['file_type'], {
+            'file_type': row['file_type'], 'files_count': 0, 'total_size': 0,
+        })
+        type_stats['files_count'] += row['files_count']
+        type_stats['total_size'] += row['total_size']
+        if interval:
+            bucket = entry['histogram'].setdefault(row['period'], {
+                'period': row['period'], 'files_count': 0, 'total_size': 0,
+            })
+            bucket['files_count'] += row['files_count']
+            bucket['total_size'] += row['total_size']
+
+    stats = []
+    for entry in results.values():
+        entry['file_stats'] = list(entry['file_stats'].values())
+        if interval:
+            entry['histogram'] = sorted(entry['histogram'].values(), key=lambda bucket: bucket['period'])
+        else:
+            del entry['histogram']
+        stats.append(entry)
+    return stats
+
+
+def get_file_stats(ecole_id=None, file_type=None, interval=None):
+    """
+    Retourne les statistiques depuis le cache, calculées si absentes.
+
+    Args:
+        ecole_id (int | None): Restreindre à une école.
+        file_type (str | None): Restreindre à un type de fichier.
+        interval (str | None): Période de l'histogramme (`INTERVALS`).
+
+    Returns:
+        list[dict]: Statistiques (voir `compute_file_stats`).
+    """
+    scope = ecole_id if ecole_id is not None else 'all'
+    key = f'files:stats:{scope}:{_generation(scope)}:{file_type or ""}:{interval or ""}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_file_stats(ecole_id, file_type, interval)
+        cache.set(key, stats, settings.FILES_STATS_CACHE_TIMEOUT)
+    return stats
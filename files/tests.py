@@ -1,20 +1,36 @@
-from django.test import TestCase, override_settings
+from django.test import TestCase, modify_settings, override_settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APITestCase
 from rest_framework import status
 from ecole.models import Ecole
-from .models import File
+from .models import Blob, File
 import os
+import shutil
+import tempfile
 
 
 User = get_user_model()
 
 
+class TemporaryMediaMixin:
+    """Écrit les fichiers des tests dans un `MEDIA_ROOT` temporaire, supprimé après la classe."""
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        cls.enterClassContext(override_settings(
+            MEDIA_ROOT=media_root,
+            FILES_UPLOAD_INCOMING_DIR=os.path.join(media_root, '.incoming'),
+        ))
+        super().setUpClass()
+
+
 # =====================================================
 # Tests unitaires du modèle File
 # =====================================================
-class FileModelTest(TestCase):
+class FileModelTest(TemporaryMediaMixin, TestCase):
     """Tests unitaires pour le modèle File"""
 
     def setUp(self):
@@ -77,7 +93,8 @@ class FileModelTest(TestCase):
         file_path = file_obj.file.path
         self.assertTrue(os.path.exists(file_path))
 
-        file_obj.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            file_obj.delete()
         self.assertFalse(os.path.exists(file_path))
 
     def test_file_size_display(self):
@@ -98,11 +115,334 @@ class FileModelTest(TestCase):
         size_display = file_obj.get_file_size_display()
         self.assertIn('KB', size_display)
 
+    def test_ecole_counters_follow_save_and_delete(self):
+        """Test: Maintien des compteurs de fichiers de l'école.
+
+        Vérifie que `files_count`, `storage_used` et la répartition par type
+        (`EcoleFileStats`) suivent les créations et suppressions de fichiers.
+
+        Asserts:
+            - Compteurs incrémentés après deux uploads
+            - Compteurs décrémentés après une suppression
+        """
+        pdf = File.objects.create(
+            ecole=self.ecole, uploaded_by=self.user,
+            file=SimpleUploadedFile("stats.pdf", b"x" * 100)
+        )
+        File.objects.create(
+            ecole=self.ecole, uploaded_by=self.user,
+            file=SimpleUploadedFile("stats.txt", b"y" * 50)
+        )
+        self.ecole.refresh_from_db()
+        self.assertEqual(self.ecole.files_count, 2)
+        self.assertEqual(self.ecole.storage_used, 150)
+        per_type = {s.file_type: (s.files_count, s.total_size) for s in self.ecole.file_stats.all()}
+        self.assertEqual(per_type, {'pdf': (1, 100), 'text': (1, 50)})
+
+        pdf.delete()
+        self.ecole.refresh_from_db()
+        self.assertEqual(self.ecole.files_count, 1)
+        self.assertEqual(self.ecole.storage_used, 50)
+        self.assertEqual(self.ecole.file_stats.get(file_type='pdf').files_count, 0)
+
+    @override_settings(ECOLE_DELETION_ASYNC=False, ECOLE_DELETION_BATCH_SIZE=2, FILES_DEDUPLICATION=True)
+    def test_ecole_deletion_removes_files_in_batches(self):
+        """Test: Suppression en arrière-plan d'une école et de ses fichiers.
+
+        Vérifie que `request_deletion` supprime, par lots, les lignes `File`
+        et les fichiers physiques, puis l'école.
+
+        Asserts:
+            - Aucun fichier physique restant
+            - Aucune ligne File ni école restante
+            - Suivi `done` avec tous les fichiers comptés
+            - Suivi `running` au bail actif non repris par `process_ecole_deletions`, repris une fois expiré
+        """
+        from datetime import timedelta
+        from io import StringIO
+        from django.conf import settings
+        from django.core.management import call_command
+        from django.utils import timezone
+        from ecole.deletion import request_deletion
+        from ecole.models import EcoleDeletion
+
+        paths = []
+        for index in range(5):
+            file_obj = File.objects.create(
+                ecole=self.ecole, uploaded_by=self.user,
+                file=SimpleUploadedFile(f"del{index}.txt", b"content")
+            )
+            paths.append(file_obj.file.path)
+        self.ecole.refresh_from_db()
+
+        # Traitement en cours dans un autre processus (bail actif)
+        with self.captureOnCommitCallbacks(execute=False):
+            job = request_deletion(self.ecole, self.user)
+        EcoleDeletion.objects.filter(pk=job.pk).update(status='running', heartbeat_at=timezone.now())
+        call_command('process_ecole_deletions', stdout=StringIO())
+        self.assertEqual(File.objects.filter(ecole_id=self.ecole.pk).count(), 5)
+        self.assertEqual(Blob.objects.get().ref_count, 5)
+
+        EcoleDeletion.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=settings.ECOLE_DELETION_LEASE_SECONDS + 1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('process_ecole_deletions', stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual((job.total_files, job.deleted_files), (5, 5))
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+        self.assertFalse(File.objects.filter(ecole_id=self.ecole.pk).exists())
+        self.assertFalse(Ecole.objects.filter(pk=self.ecole.pk).exists())
+        self.assertFalse(Blob.objects.exists())
+
+    def test_rebuild_ecole_stats_command(self):
+        """Test: Recalcul des compteurs après une dérive.
+
+        Vérifie que `rebuild_ecole_stats` corrige des compteurs faussés par
+        une suppression en masse (qui ne passe pas par `File.delete`).
+
+        Asserts:
+            - Compteurs remis à zéro après `QuerySet.delete()` et recalcul
+        """
+        from django.core.management import call_command
+        from io import StringIO
+
+        file_obj = File.objects.create(
+            ecole=self.ecole, uploaded_by=self.user,
+            file=SimpleUploadedFile("drift.pdf", b"x" * 10)
+        )
+        path = file_obj.file.path
+        File.objects.all().delete()
+        os.remove(path)
+
+        call_command('rebuild_ecole_stats', batch_size=1, stdout=StringIO())
+        self.ecole.refresh_from_db()
+        self.assertEqual(self.ecole.files_count, 0)
+        self.assertEqual(self.ecole.storage_used, 0)
+        self.assertFalse(self.ecole.file_stats.exists())
+
+    @override_settings(FILES_DEDUPLICATION=True)
+    def test_identical_content_is_stored_once(self):
+        """Test: Déduplication des contenus identiques.
+
+        Vérifie que deux fichiers de même contenu partagent un seul blob,
+        et que le contenu n'est supprimé du disque qu'avec sa dernière référence.
+
+        Asserts:
+            - Un seul blob, deux références, même chemin de stockage
+            - Noms et types d'origine conservés
+            - Fichier physique conservé après la première suppression
+            - Fichier physique conservé si la suppression est annulée
+            - Fichier physique et blob supprimés après la seconde
+        """
+        from django.db import transaction
+
+        first = File.objects.create(
+            ecole=self.ecole, uploaded_by=self.user,
+            file=SimpleUploadedFile("circulaire.pdf", b"meme contenu")
+        )
+        second = File.objects.create(
+            ecole=self.ecole, uploaded_by=self.user,
+            file=SimpleUploadedFile("copie.pdf", b"meme contenu")
+        )
+        self.assertEqual(Blob.objects.count(), 1)
+        self.assertEqual(Blob.objects.get().ref_count, 2)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertTrue(first.file.name.startswith('blobs/'))
+        self.assertEqual((second.filename, second.file_type), ('copie.pdf', 'pdf'))
+        path = first.file.path
+
+        first.delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                File.objects.get(pk=second.pk).delete()
+                raise RuntimeError
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(Blob.objects.exists())
+
+    def test_dedupe_files_command(self):
+        """Test: Déduplication des fichiers uploadés sans blob.
+
+        Asserts:
+            - Les deux fichiers pointent vers le même blob
+            - Les copies individuelles sont supprimées du disque
+            - Un fichier supprimé pendant le traitement ne laisse pas de référence au blob
+        """
+        from unittest import mock
+        from django.core.management import call_command
+        from io import StringIO
+        from .blobs import store_blob
+
+        with override_settings(FILES_DEDUPLICATION=False):
+            legacy = [
+                File.objects.create(
+                    ecole=self.ecole, uploaded_by=self.user,
+                    file=SimpleUploadedFile(f"ancien{index}.txt", b"doublon")
+                )
+                for index in range(3)
+            ]
+        deleted = legacy.pop()
+        paths = [file_obj.file.path for file_obj in legacy]
+
+        def store_then_delete(content, *args):
+            blob = store_blob(content, *args)
+            if content.name == deleted.file.name:
+                File.objects.filter(pk=deleted.pk).delete()
+            return blob
+
+        with mock.patch('files.management.commands.dedupe_files.store_blob', side_effect=store_then_delete):
+            call_command('dedupe_files', batch_size=1, stdout=StringIO())
+        blob = Blob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(set(File.objects.values_list('blob_id', flat=True)), {blob.pk})
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+        self.assertTrue(os.path.exists(File.objects.first().file.path))
+
+    @override_settings(FILES_DEDUPLICATION=False)
+    def test_files_are_stored_in_fan_out_layout(self):
+        """Test: Arborescence répartie des fichiers non dédupliqués.
+
+        Vérifie que deux fichiers de même nom sont stockés sous des chemins
+        `files/{ab}/{cd}/{uuid}` distincts, le nom d'origine n'étant conservé
+        que dans `filename` (y compris après une nouvelle sauvegarde).
+
+        Asserts:
+            - Chemins distincts, répartis selon l'UUID, extension conservée
+            - Nom d'origine inchangé après `save()`
+        """
+        files = [
+            File.objects.create(
+                ecole=self.ecole, uploaded_by=self.user,
+                file=SimpleUploadedFile("Bulletin Final.PDF", b"contenu")
+            )
+            for _ in range(2)
+        ]
+        names = [file_obj.file.name for file_obj in files]
+        self.assertNotEqual(names[0], names[1])
+        for name in names:
+            root, ab, cd, basename = name.split('/')
+            self.assertEqual(root, 'files')
+            self.assertEqual(basename[:4], ab + cd)
+            self.assertTrue(basename.endswith('.pdf'))
+
+        files[0].description = "modifié"
+        files[0].save()
+        files[0].refresh_from_db()
+        self.assertEqual(files[0].filename, "Bulletin Final.PDF")
+
+    @override_settings(FILES_DEDUPLICATION=False)
+    def test_relayout_files_command(self):
+        """Test: Migration des fichiers de l'ancienne arborescence.
+
+        Asserts:
+            - Le fichier est déplacé sous `files/` avec son contenu
+            - L'ancien chemin est supprimé, le nom d'origine conservé
+            - Une seconde exécution ne déplace plus rien
+        """
+        from django.core.management import call_command
+        from io import StringIO
+
+        file_obj = File.objects.create(
+            ecole=self.ecole, uploaded_by=self.user,
+            file=SimpleUploadedFile("ancien.txt", b"contenu historique")
+        )
+        storage = file_obj.file.storage
+        legacy_name = storage.save(f'schools/{self.ecole.pk}/files/ancien.txt', file_obj.file)
+        storage.delete(file_obj.file.name)
+        File.objects.filter(pk=file_obj.pk).update(file=legacy_name)
+
+        call_command('relayout_files', batch_size=1, stdout=StringIO())
+        file_obj.refresh_from_db()
+        self.assertTrue(file_obj.file.name.startswith('files/'))
+        self.assertEqual(file_obj.filename, "ancien.txt")
+        self.assertFalse(storage.exists(legacy_name))
+        with file_obj.file.open('rb') as f:
+            self.assertEqual(f.read(), b"contenu historique")
+
+        out = StringIO()
+        call_command('relayout_files', stdout=out)
+        self.assertIn("0 fichier(s) déplacé(s)", out.getvalue())
+
+    @override_settings(FILES_DEDUPLICATION=True)
+    def test_reconcile_media_command(self):
+        """Test: Rapprochement du stockage et de la base (`reconcile_media`).
+
+        Asserts:
+            - Sans option, rien n'est modifié
+            - Orphelins anciens (dont temporaires `.incoming`) supprimés, récents conservés
+            - Fichiers partiels des sessions en cours conservés
+            - Lignes sans fichier marquées (fichier simple et blob), ligne présente démarquée
+        """
+        import time
+        from django.core.management import call_command
+        from django.utils import timezone
+        from io import StringIO
+        from .models import UploadSession
+
+        old = time.time() - 2 * 3600
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with override_settings(FILES_DEDUPLICATION=False):
+                present, gone = [
+                    File.objects.create(
+                        ecole=self.ecole, uploaded_by=self.user,
+                        file=SimpleUploadedFile(f"{name}.txt", name.encode())
+                    )
+                    for name in ("present", "disparu")
+                ]
+            deduplicated = File.objects.create(
+                ecole=self.ecole, uploaded_by=self.user,
+                file=SimpleUploadedFile("dedup.txt", b"contenu partage")
+            )
+            File.objects.filter(pk=present.pk).update(missing_at=timezone.now())
+            storage = present.file.storage
+            storage.delete(gone.file.name)
+            storage.delete(deduplicated.blob.name)
+
+            session = UploadSession.objects.create(
+                ecole=self.ecole, uploaded_by=self.user, filename="gros.bin", length=10
+            )
+            orphans = [f'schools/{self.ecole.pk}/files/ancien.txt', '.incoming/abandon.upload']
+            for name in orphans + [session.partial_name, 'files/ab/cd/recent.txt']:
+                os.makedirs(os.path.dirname(storage.path(name)), exist_ok=True)
+                with open(storage.path(name), 'wb') as f:
+                    f.write(b"x")
+            for name in orphans + [session.partial_name]:
+                os.utime(storage.path(name), (old, old))
+
+            out = StringIO()
+            call_command('reconcile_media', workers=2, stdout=out)
+            self.assertIn("2 fichier(s) orphelin(s)", out.getvalue())
+            self.assertIn("1 fichier(s) et 1 contenu(s) dédupliqué(s) absent(s)", out.getvalue())
+            self.assertTrue(all(storage.exists(name) for name in orphans))
+            self.assertFalse(File.objects.filter(pk=gone.pk, missing_at__isnull=False).exists())
+
+            out = StringIO()
+            call_command('reconcile_media', delete_orphans=True, mark_missing=True,
+                         workers=2, batch_size=1, verbosity=2, stdout=out)
+            self.assertIn(f"orphelin : {orphans[0]}", out.getvalue())
+            self.assertFalse(any(storage.exists(name) for name in orphans))
+            self.assertTrue(storage.exists(session.partial_name))
+            self.assertTrue(storage.exists('files/ab/cd/recent.txt'))
+            self.assertEqual(
+                set(File.objects.filter(missing_at__isnull=False).values_list('pk', flat=True)),
+                {gone.pk, deduplicated.pk},
+            )
+
 
 # =====================================================
 # Tests API Files
 # =====================================================
-class FileAPITest(APITestCase):
+class FileAPITest(TemporaryMediaMixin, APITestCase):
     """Tests fonctionnels de l'API Files"""
 
     def setUp(self):
@@ -147,6 +487,215 @@ class FileAPITest(APITestCase):
         self.assertEqual(File.objects.count(), 1)
         self.assertEqual(File.objects.first().uploaded_by, self.user)
 
+    def test_upload_quota_enforced(self):
+        """Test: Quotas de volume et de nombre de fichiers de l'école.
+
+        Asserts:
+            - Upload sous le quota : 201
+            - Upload dépassant le quota de volume : 413, aucun fichier créé
+            - Lot dépassant le quota de fichiers : 413, aucun fichier créé
+            - Aucune réservation restante
+        """
+        Ecole.objects.filter(pk=self.ecole.pk).update(storage_quota=10, files_quota=2)
+
+        def upload(name, content):
+            return self.client.post(
+                '/api/files/', {'ecole': self.ecole.id, 'file': SimpleUploadedFile(name, content)},
+                format='multipart'
+            )
+
+        self.assertEqual(upload("q1.txt", b"123456").status_code, status.HTTP_201_CREATED)
+        response = upload("q2.txt", b"123456")
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertIn("stockage", response.data['detail'])
+
+        Ecole.objects.filter(pk=self.ecole.pk).update(storage_quota=None)
+        response = self._upload_multiple(2, 'lot')
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertIn("fichiers", response.data['detail'])
+        self.assertEqual(File.objects.count(), 1)
+
+        self.ecole.refresh_from_db()
+        self.assertEqual((self.ecole.files_reserved, self.ecole.storage_reserved), (0, 0))
+        self.assertEqual((self.ecole.files_count, self.ecole.storage_used), (1, 6))
+
+    def _upload_multiple(self, count, prefix):
+        """Envoie `count` fichiers distincts via `upload_multiple`."""
+        files = [
+            SimpleUploadedFile(f"{prefix}{index}.txt", f"{prefix}-{index}".encode())
+            for index in range(count)
+        ]
+        return self.client.post(
+            '/api/files/upload_multiple/',
+            {'ecole': self.ecole.id, 'files': files},
+            format='multipart'
+        )
+
+    @override_settings(FILES_DEDUPLICATION=True)
+    def test_upload_single_pass(self):
+        """Test: Empreinte et type MIME calculés à la réception.
+
+        Vérifie que le contenu n'est pas relu après la réception, que le type
+        MIME provient des premiers octets et que le fichier reçu est déplacé.
+
+        Asserts:
+            - `content_hash` égal au SHA-256 du contenu, sans nouveau calcul
+            - `mime_type` détecté (PNG) malgré l'extension `.pdf`
+            - Aucun fichier laissé dans `FILES_UPLOAD_INCOMING_DIR`
+        """
+        import hashlib
+        from unittest import mock
+        from .handlers import incoming_dir
+
+        content = b'\x89PNG\r\n\x1a\n' + b'0' * 100
+        with mock.patch('files.blobs.hashlib') as blob_hashlib:
+            blob_hashlib.sha256.side_effect = AssertionError('contenu relu')
+            response = self.client.post(
+                '/api/files/',
+                {'ecole': self.ecole.id, 'file': SimpleUploadedFile("image.pdf", content)},
+                format='multipart'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        file_obj = File.objects.get()
+        self.assertEqual(file_obj.content_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(file_obj.file_size, len(content))
+        self.assertEqual(file_obj.mime_type, 'image/png')
+        self.assertEqual(file_obj.file_type, 'pdf')
+        self.assertEqual(os.listdir(incoming_dir()), [])
+
+    @override_settings(FILES_DEDUPLICATION=True)
+    def test_upload_multiple_constant_queries(self):
+        """Test: Upload multiple en lot.
+
+        Vérifie que le nombre de requêtes ne dépend pas du nombre de fichiers,
+        que les fichiers invalides sont signalés et que les compteurs suivent.
+
+        Asserts:
+            - Même nombre de requêtes pour 2 et 8 fichiers
+            - Fichier à extension interdite dans `errors`, les autres créés
+            - Contenus identiques partageant un blob écrit une seule fois, compteurs de l'école à jour
+            - Contenu d'un blob supprimé avant le verrouillage réécrit
+        """
+        from unittest import mock
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from . import batch
+        from .blobs import blob_name
+
+        # Le premier lot crée la ligne de statistiques du type `text`
+        self._upload_multiple(1, 'w')
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self._upload_multiple(2, 'a').status_code, status.HTTP_201_CREATED)
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(self._upload_multiple(8, 'b').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(small), len(large))
+
+        response = self.client.post(
+            '/api/files/upload_multiple/',
+            {
+                'ecole': self.ecole.id,
+                'files': [
+                    SimpleUploadedFile("same1.txt", b"same"),
+                    SimpleUploadedFile("same2.txt", b"same"),
+                    SimpleUploadedFile("bad.exe", b"bad"),
+                ],
+                'description': 'Lot',
+            },
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['uploaded'], response.data['failed']), (2, 1))
+        self.assertEqual(response.data['errors'][0]['filename'], 'bad.exe')
+        self.assertEqual(response.data['files'][0]['ecole_name'], self.ecole.name)
+        same = File.objects.filter(filename__startswith='same')
+        self.assertEqual(same.values('blob').distinct().count(), 1)
+        blob = same.first().blob
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(blob.name, blob_name(blob.sha256))
+        storage = File._meta.get_field('file').storage
+        self.assertEqual(os.listdir(os.path.dirname(storage.path(blob.name))), [blob.sha256])
+        self.assertEqual(same.first().description, 'Lot')
+
+        # Dernière référence libérée entre l'écriture et le verrouillage du blob
+        def attach_blobs(*args):
+            storage.delete(blob.name)
+            return attach(*args)
+
+        attach = batch._attach_blobs
+        with mock.patch.object(batch, '_attach_blobs', side_effect=attach_blobs):
+            response = self.client.post(
+                '/api/files/upload_multiple/',
+                {'ecole': self.ecole.id, 'files': [SimpleUploadedFile("same3.txt", b"same")]},
+                format='multipart'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with storage.open(blob.name) as f:
+            self.assertEqual(f.read(), b"same")
+
+        self.ecole.refresh_from_db()
+        self.assertEqual(self.ecole.files_count, 14)
+        self.assertEqual(self.ecole.file_stats.get(file_type='text').files_count, 14)
+
+    def test_upload_multiple_streams_and_rejects_parts(self):
+        """Test: Lecture en flux des fichiers d'un upload multiple.
+
+        Asserts:
+            - Parties acceptées écrites dans des fichiers temporaires (pas en mémoire)
+            - Extension interdite et taille excessive rejetées pendant la lecture
+        """
+        from unittest import mock
+        from django.core.files.uploadedfile import TemporaryUploadedFile
+        from . import views
+
+        with mock.patch('files.validators.MAX_FILE_SIZE_MB', 0.001), \
+                mock.patch.object(views, 'upload_batch', wraps=views.upload_batch) as upload_batch:
+            response = self.client.post(
+                '/api/files/upload_multiple/',
+                {
+                    'ecole': self.ecole.id,
+                    'files': [
+                        SimpleUploadedFile("ok.txt", b"ok"),
+                        SimpleUploadedFile("bad.exe", b"bad"),
+                        SimpleUploadedFile("big.txt", b"x" * 2048),
+                    ],
+                },
+                format='multipart'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['uploaded'], 1)
+        self.assertEqual(
+            sorted(error['filename'] for error in response.data['errors']), ['bad.exe', 'big.txt']
+        )
+        uploads = upload_batch.call_args.args[2]
+        self.assertEqual([upload.name for upload in uploads], ['ok.txt'])
+        self.assertIsInstance(uploads[0], TemporaryUploadedFile)
+        self.assertEqual(list(File.objects.values_list('filename', flat=True)), ['ok.txt'])
+
+    @override_settings(FILES_DEDUPLICATION=True)
+    def test_upload_multiple_cleans_up_on_failure(self):
+        """Test: Échec de l'enregistrement d'un lot.
+
+        Asserts:
+            - Aucun blob ni fichier créé
+            - Aucun contenu laissé sur le disque
+        """
+        from unittest import mock
+        from django.db import DatabaseError
+        from .blobs import blob_name, content_sha256
+
+        upload = SimpleUploadedFile("fail.txt", b"rollback me")
+        path = File._meta.get_field('file').storage.path(blob_name(content_sha256(upload)))
+        with mock.patch.object(File.objects, 'bulk_create', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.post(
+                    '/api/files/upload_multiple/',
+                    {'ecole': self.ecole.id, 'files': [SimpleUploadedFile("fail.txt", b"rollback me")]},
+                    format='multipart'
+                )
+        self.assertFalse(File.objects.exists())
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
     def test_delete_file_admin_only(self):
         """Test: Tentative de suppression par un utilisateur standard.
 
@@ -189,3 +738,508 @@ class FileAPITest(APITestCase):
         response = self.client.delete(f'/api/files/{file_obj.id}/')
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(File.objects.count(), 0)
+
+    def test_download_conditional(self):
+        """Test: Téléchargement conditionnel (`ETag`, `If-None-Match`, `If-Range`).
+
+        Asserts:
+            - Status code 200 avec `ETag`, `Last-Modified` et `Accept-Ranges`
+            - Status code 304 si `If-None-Match` correspond
+            - Fichier complet (200) si `If-Range` ne correspond plus
+            - Status code 412 si `If-Match` ne correspond pas
+            - Type MIME inconnu : `application/octet-stream`, y compris pour une plage
+        """
+        file_obj = File.objects.create(
+            ecole=self.ecole,
+            uploaded_by=self.user,
+            file=SimpleUploadedFile("cond.txt", b"0123456789")
+        )
+        url = f'/api/files/{file_obj.id}/download/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), b"0123456789")
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+        self.assertIn(file_obj.content_hash, etag)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url, HTTP_IF_MATCH='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        File.objects.filter(pk=file_obj.pk).update(mime_type='')
+        response = self.client.get(url, HTTP_RANGE='bytes=0-3')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+
+    def test_download_ranges(self):
+        """Test: Téléchargement partiel (`Range`).
+
+        Asserts:
+            - Status code 206 et `Content-Range` pour une plage
+            - `multipart/byteranges` pour plusieurs plages
+            - Status code 416 si aucune plage n'est satisfaisable
+        """
+        file_obj = File.objects.create(
+            ecole=self.ecole,
+            uploaded_by=self.user,
+            file=SimpleUploadedFile("range.txt", b"0123456789")
+        )
+        url = f'/api/files/{file_obj.id}/download/'
+        response = self.client.get(url, HTTP_RANGE='bytes=2-4')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Range'], 'bytes 2-4/10')
+        self.assertEqual(b''.join(response.streaming_content), b"234")
+
+        response = self.client.get(url, HTTP_RANGE='bytes=0-1,-2', HTTP_IF_RANGE=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertTrue(response['Content-Type'].startswith('multipart/byteranges'))
+        body = b''.join(response.streaming_content)
+        self.assertEqual(int(response['Content-Length']), len(body))
+        self.assertIn(b"Content-Range: bytes 0-1/10\r\n\r\n01\r\n", body)
+        self.assertIn(b"Content-Range: bytes 8-9/10\r\n\r\n89\r\n", body)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    @override_settings(FILES_COMPRESSION=True)
+    def test_download_compressed_at_rest(self):
+        """Test: Compression au repos des fichiers texte et CSV.
+
+        Asserts:
+            - Contenu stocké compressé (`.gz`), `file_size` égale à la taille d'origine
+            - Avec `Accept-Encoding: gzip`, octets stockés servis avec `Content-Encoding`
+            - Sinon, contenu décompressé à la volée (complet et par plage)
+            - `ETag` distincts et `Vary: Accept-Encoding`
+        """
+        import gzip
+
+        content = b"nom;classe;moyenne\n" + b"eleve;CM2;14.5\n" * 500
+        for deduplication in (True, False):
+            with override_settings(FILES_DEDUPLICATION=deduplication):
+                file_obj = File.objects.create(
+                    ecole=self.ecole, uploaded_by=self.user,
+                    file=SimpleUploadedFile("notes.csv", content)
+                )
+            self.assertEqual(file_obj.content_encoding, 'gzip')
+            self.assertTrue(file_obj.file.name.endswith('.gz'))
+            self.assertEqual(file_obj.file_size, len(content))
+            self.assertLess(file_obj.file.size, len(content) // 5)
+
+            url = f'/api/files/{file_obj.id}/download/'
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('Accept-Encoding', response['Vary'])
+            self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), content)
+            encoded_etag = response['ETag']
+
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertEqual(int(response['Content-Length']), len(content))
+            self.assertEqual(b''.join(response.streaming_content), content)
+            self.assertNotEqual(response['ETag'], encoded_etag)
+
+            response = self.client.get(url, HTTP_RANGE='bytes=19-33')
+            self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+            self.assertEqual(b''.join(response.streaming_content), content[19:34])
+
+        image = File.objects.create(
+            ecole=self.ecole, uploaded_by=self.user,
+            file=SimpleUploadedFile("logo.png", b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
+        )
+        self.assertEqual(image.content_encoding, '')
+
+    async def test_download_streams_asynchronously_under_asgi(self):
+        """Test: Téléchargement en flux asynchrone sous ASGI.
+
+        Asserts:
+            - Réponse produite par un itérateur asynchrone (`is_async`)
+            - Fichier complet (200) et plage (206) correctement servis
+        """
+        from asgiref.sync import sync_to_async
+
+        file_obj = await sync_to_async(File.objects.create)(
+            ecole=self.ecole,
+            uploaded_by=self.user,
+            file=SimpleUploadedFile("async.txt", b"0123456789" * 10000)
+        )
+        await self.async_client.aforce_login(self.user)
+        url = f'/api/files/{file_obj.id}/download/'
+
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        self.assertEqual(response['Content-Length'], '100000')
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), b"0123456789" * 10000)
+
+        response = await self.async_client.get(url, headers={'Range': 'bytes=5-14'})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), b"5678901234")
+
+    async def test_asgi_body_spooled_off_event_loop(self):
+        """Test: Réception asynchrone du corps d'un upload (`files.asgi`).
+
+        Asserts:
+            - Corps au-delà de `FILE_UPLOAD_MAX_MEMORY_SIZE` écrit hors de la boucle
+            - Corps complet et positionné au début
+            - `RequestAborted` si le client se déconnecte
+        """
+        import asyncio
+        from unittest import mock
+        from django.core.exceptions import RequestAborted
+        from .asgi import StreamingASGIHandler
+
+        def receiver(messages):
+            async def receive():
+                return messages.pop(0)
+            return receive
+
+        handler = StreamingASGIHandler()
+        messages = [{'type': 'http.request', 'body': b'x' * 100, 'more_body': True} for _ in range(3)]
+        messages.append({'type': 'http.request', 'body': b'end', 'more_body': False})
+        with override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=150), \
+                mock.patch('files.asgi.asyncio.to_thread', wraps=asyncio.to_thread) as to_thread:
+            body = await handler.read_body(receiver(messages))
+        self.assertTrue(any(call.args[0] == body.write for call in to_thread.call_args_list))
+        self.assertEqual(body.read(), b'x' * 300 + b'end')
+        body.close()
+
+        with self.assertRaises(RequestAborted):
+            await handler.read_body(receiver([{'type': 'http.disconnect'}]))
+
+    def test_download_offloaded_to_web_server(self):
+        """Test: Téléchargement délégué au serveur web (`X-Accel-Redirect`, `X-Sendfile`).
+
+        Asserts:
+            - La vue renvoie l'en-tête de redirection interne sans contenu
+            - `X-Sendfile` désigne le chemin absolu du fichier
+            - Avec `SendfileEmulationMiddleware`, le fichier est servi
+        """
+        file_obj = File.objects.create(
+            ecole=self.ecole,
+            uploaded_by=self.user,
+            file=SimpleUploadedFile("offload.txt", b"offloaded")
+        )
+        url = f'/api/files/{file_obj.id}/download/'
+        with override_settings(FILES_DOWNLOAD_MODE='x-accel-redirect'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{file_obj.file.name}')
+            self.assertEqual(response['Content-Disposition'], 'attachment; filename="offload.txt"')
+            self.assertIn('ETag', response)
+            self.assertEqual(response.content, b"")
+
+            # Le client de test charge les middlewares à sa première requête
+            with modify_settings(MIDDLEWARE={'append': 'files.middleware.SendfileEmulationMiddleware'}):
+                client = self.client_class()
+                client.force_authenticate(user=self.user)
+                response = client.get(url)
+                self.assertEqual(b''.join(response.streaming_content), b"offloaded")
+                self.assertEqual(response['Content-Disposition'], 'attachment; filename="offload.txt"')
+
+        with override_settings(FILES_DOWNLOAD_MODE='x-sendfile'):
+            response = self.client.get(url)
+            self.assertEqual(response['X-Sendfile'], file_obj.file.path)
+
+    def test_file_stats_grouped_and_cached(self):
+        """Test: Statistiques agrégées par école et par type (`/api/files/stats/`).
+
+        Asserts:
+            - Comptes et volumes par école et par type, histogramme par mois
+            - Seconde lecture servie par le cache, sans requête
+            - Cache invalidé par un upload puis par une suppression
+            - Status code 400 pour un paramètre invalide
+        """
+        from django.core.cache import cache
+        from django.utils import timezone
+
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            for ecole, name, size in [(self.ecole, "a.pdf", 100), (self.ecole, "b.pdf", 50),
+                                      (self.ecole, "c.txt", 10), (self.ecole2, "d.pdf", 7)]:
+                File.objects.create(
+                    ecole=ecole, uploaded_by=self.user,
+                    file=SimpleUploadedFile(name, b"x" * size)
+                )
+
+        response = self.client.get('/api/files/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry['ecole'] for entry in response.data], [self.ecole.pk, self.ecole2.pk])
+        self.assertEqual(response.data[0]['files_count'], 3)
+        self.assertEqual(response.data[0]['total_size'], 160)
+        self.assertEqual(response.data[0]['file_stats'], [
+            {'file_type': 'pdf', 'files_count': 2, 'total_size': 150},
+            {'file_type': 'text', 'files_count': 1, 'total_size': 10},
+        ])
+
+        url = f'/api/files/stats/?ecole={self.ecole.pk}&interval=month'
+        response = self.client.get(url)
+        month = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        self.assertEqual(response.data[0]['histogram'], [
+            {'period': month, 'files_count': 3, 'total_size': 160},
+        ])
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            extra = File.objects.create(
+                ecole=self.ecole, uploaded_by=self.user, file=SimpleUploadedFile("e.txt", b"x" * 5)
+            )
+        self.assertEqual(self.client.get(url).data[0]['files_count'], 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            extra.delete()
+        self.assertEqual(self.client.get(url).data[0]['files_count'], 3)
+
+        self.assertEqual(self.client.get('/api/files/stats/?ecole=1&type=pdf').status_code, status.HTTP_200_OK)
+        for query in ('ecole=abc', 'type=video', 'interval=hour'):
+            response = self.client.get(f'/api/files/stats/?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_cursor_pagination(self):
+        """Test: Liste des fichiers paginée par curseur.
+
+        Asserts:
+            - Pages successives sans doublon, triées par `uploaded_at` décroissant
+            - Aucun `count` ni requête `COUNT(*)`
+            - Filtre conservé dans le lien `next`
+        """
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for index in range(5):
+            File.objects.create(
+                ecole=self.ecole, uploaded_by=self.user,
+                file=SimpleUploadedFile(f"page{index}.txt", f"page-{index}".encode())
+            )
+        File.objects.create(
+            ecole=self.ecole2, uploaded_by=self.user,
+            file=SimpleUploadedFile("other.txt", b"other")
+        )
+
+        url = f'/api/files/?pagination=cursor&page_size=2&ecole={self.ecole.id}'
+        seen = []
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotIn('count', response.data)
+                seen.extend(item['filename'] for item in response.data['results'])
+                url = response.data['next']
+                if url:
+                    self.assertIn(f'ecole={self.ecole.id}', url)
+        self.assertEqual(seen, [f"page{index}.txt" for index in reversed(range(5))])
+        self.assertFalse(any('COUNT(' in query['sql'].upper() for query in queries))
+
+
+# =====================================================
+# Plans d'exécution de la liste des fichiers
+# =====================================================
+class FileQueryPlanTest(TestCase):
+    """Vérifie que chaque filtre de la liste paginée est servi par son index"""
+
+    def assertUsesIndex(self, queryset, index_name):
+        """Vérifie que le plan d'exécution de `queryset` utilise `index_name`."""
+        from django.db import connection
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_list_filters_use_composite_indexes(self):
+        """Test: Régression des plans d'exécution de `GET /api/files/?pagination=cursor`.
+
+        Asserts:
+            - `ecole`, `type`, `my_files`, leurs combinaisons deux à deux et la
+              liste complète utilisent chacun l'index composite correspondant
+        """
+        from django.utils import timezone
+        from .pagination import FileCursorPagination
+
+        ordering = FileCursorPagination.ordering
+        files = File.objects.order_by(*ordering)
+        page = slice(0, 11)
+        before = timezone.now()
+        self.assertUsesIndex(files.filter(ecole_id=1)[page], 'files_file_ecole_i_afb7ee_idx')
+        self.assertUsesIndex(
+            files.filter(ecole_id=1, uploaded_at__lt=before)[page], 'files_file_ecole_i_afb7ee_idx'
+        )
+        self.assertUsesIndex(files.filter(file_type='pdf')[page], 'file_type_uploaded_idx')
+        self.assertUsesIndex(files.filter(uploaded_by_id=1)[page], 'file_uploader_uploaded_idx')
+        self.assertUsesIndex(files.filter(uploaded_at__lt=before)[page], 'file_uploaded_idx')
+        self.assertUsesIndex(files.filter(ecole_id=1, file_type='pdf')[page], 'file_ecole_type_uploaded_idx')
+        self.assertUsesIndex(files.filter(ecole_id=1, uploaded_by_id=1)[page], 'file_ecole_user_uploaded_idx')
+        self.assertUsesIndex(files.filter(uploaded_by_id=1, file_type='pdf')[page], 'file_user_type_uploaded_idx')
+
+
+# =====================================================
+# Tests des uploads reprenables
+# =====================================================
+class UploadSessionAPITest(TemporaryMediaMixin, APITestCase):
+    """Tests fonctionnels des uploads reprenables par morceaux"""
+
+    def setUp(self):
+        """Création d'un utilisateur et d'une école pour les tests"""
+        self.user = User.objects.create_user(username='chunkuser', password='chunk123')
+        self.client.force_authenticate(user=self.user)
+        self.ecole = Ecole.objects.create(
+            name='École Chunk',
+            address='1 Rue des Morceaux',
+            city='Tunis',
+            postal_code='1000',
+            phone='+216 71 000 000',
+            students_count=10
+        )
+
+    def send_chunk(self, url, offset, data):
+        """Envoie un morceau à la session d'upload donnée."""
+        return self.client.generic(
+            'PATCH', url, data,
+            content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_resumable_upload(self):
+        """Test: Upload par morceaux avec reprise puis finalisation.
+
+        Vérifie que les morceaux sont écrits aux bons décalages, qu'un décalage
+        incohérent est refusé, que `HEAD` renvoie la progression et que la
+        finalisation crée le fichier complet.
+
+        Asserts:
+            - Création de session : 201 avec `Upload-Offset: 0`
+            - Décalage incohérent : 409 Conflict
+            - Morceau envoyé pendant un autre envoi sur la même session : 409 Conflict
+            - Finalisation prématurée : 409 Conflict
+            - Finalisation : 201, contenu et compteurs de l'école corrects
+        """
+        import fcntl
+        from .models import UploadSession
+        content = b'a' * 700 + b'b' * 500
+        response = self.client.post(
+            '/api/files/uploads/',
+            {'ecole': self.ecole.id, 'filename': 'gros.pdf', 'length': len(content)},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response['Upload-Offset'], '0')
+        url = f"/api/files/uploads/{response.data['id']}/"
+
+        self.assertEqual(self.send_chunk(url, 0, content[:700]).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.send_chunk(url, 0, content[:700]).status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.client.head(url)['Upload-Offset'], '700')
+        self.assertEqual(self.client.post(f'{url}finalize/').status_code, status.HTTP_409_CONFLICT)
+
+        # Envoi en cours (verrou du fichier partiel détenu) : le morceau concurrent est refusé
+        with open(UploadSession.objects.get().partial_path, 'ab') as partial:
+            fcntl.flock(partial, fcntl.LOCK_EX)
+            self.assertEqual(self.send_chunk(url, 700, content[700:]).status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.client.head(url)['Upload-Offset'], '700')
+
+        response = self.send_chunk(url, 700, content[700:])
+        self.assertEqual(response['Upload-Offset'], str(len(content)))
+
+        response = self.client.post(f'{url}finalize/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        file_obj = File.objects.get(pk=response.data['id'])
+        self.assertEqual(file_obj.filename, 'gros.pdf')
+        self.assertEqual(file_obj.file_type, 'pdf')
+        with file_obj.file.open('rb') as f:
+            self.assertEqual(f.read(), content)
+        self.ecole.refresh_from_db()
+        self.assertEqual((self.ecole.files_count, self.ecole.storage_used), (1, len(content)))
+
+    def test_session_reserves_quota(self):
+        """Test: Réservation de quota pendant un upload par morceaux.
+
+        Asserts:
+            - La taille annoncée est réservée dès la création de la session
+            - Une session dépassant le quota restant est refusée (413)
+            - Abandon : réservation libérée ; finalisation : taille comptée dans `storage_used`
+            - Session finalisée dont le fichier est supprimé : ni libérée une seconde fois
+              à sa purge, ni comptée comme réservation par `rebuild_ecole_stats`
+        """
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import UploadSession
+
+        Ecole.objects.filter(pk=self.ecole.pk).update(storage_quota=100)
+
+        def create(length):
+            return self.client.post(
+                '/api/files/uploads/',
+                {'ecole': self.ecole.id, 'filename': 'quota.txt', 'length': length},
+                format='json'
+            )
+
+        abandoned = create(60)
+        self.assertEqual(abandoned.status_code, status.HTTP_201_CREATED)
+        self.ecole.refresh_from_db()
+        self.assertEqual((self.ecole.files_reserved, self.ecole.storage_reserved), (1, 60))
+        self.assertEqual(create(50).status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        self.client.delete(f"/api/files/uploads/{abandoned.data['id']}/")
+        url = f"/api/files/uploads/{create(50).data['id']}/"
+        self.send_chunk(url, 0, b'q' * 50)
+        self.assertEqual(self.client.post(f'{url}finalize/').status_code, status.HTTP_201_CREATED)
+
+        self.ecole.refresh_from_db()
+        self.assertEqual((self.ecole.files_reserved, self.ecole.storage_reserved), (0, 0))
+        self.assertEqual(self.ecole.storage_used, 50)
+
+        in_flight = create(30)
+        self.assertEqual(in_flight.status_code, status.HTTP_201_CREATED)
+        finalized = UploadSession.objects.exclude(pk=in_flight.data['id']).get()
+        finalized.file.delete()
+        finalized.refresh_from_db()
+        self.assertIsNone(finalized.file_id)
+        call_command('rebuild_ecole_stats', stdout=StringIO())
+        self.ecole.refresh_from_db()
+        self.assertEqual((self.ecole.files_reserved, self.ecole.storage_reserved), (1, 30))
+        finalized.delete()
+        self.ecole.refresh_from_db()
+        self.assertEqual((self.ecole.files_reserved, self.ecole.storage_reserved), (1, 30))
+
+    def test_chunk_beyond_length_rejected(self):
+        """Test: Refus d'un morceau dépassant la taille annoncée et d'une extension interdite.
+
+        Asserts:
+            - Extension interdite : 400 Bad Request
+            - Morceau trop grand : 413 Request Entity Too Large
+            - Session de taille maximale (`FILE_UPLOAD_SESSION_MAX_SIZE`, au-delà de
+              2**31 - 1) acceptée, et sa taille valide pour `File.file_size`
+        """
+        from django.conf import settings
+
+        response = self.client.post(
+            '/api/files/uploads/',
+            {'ecole': self.ecole.id, 'filename': 'script.exe', 'length': 10},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            '/api/files/uploads/',
+            {'ecole': self.ecole.id, 'filename': 'petit.txt', 'length': 10},
+            format='json'
+        )
+        url = f"/api/files/uploads/{response.data['id']}/"
+        response = self.send_chunk(url, 0, b'x' * 11)
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        max_size = settings.FILE_UPLOAD_SESSION_MAX_SIZE
+        self.assertGreater(max_size, 2 ** 31 - 1)
+        response = self.client.post(
+            '/api/files/uploads/',
+            {'ecole': self.ecole.id, 'filename': 'gros.txt', 'length': max_size},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        File._meta.get_field('file_size').run_validators(max_size)
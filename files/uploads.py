@@ -0,0 +1,186 @@
+"""Uploads reprenables par morceaux (protocole inspiré de tus).
+
+Déroulement côté client :
+
+1. `POST /api/files/uploads/` avec `ecole`, `filename` et `length` (taille
+   totale) : crée une `UploadSession`.
+2. `PATCH /api/files/uploads/{id}/` avec l'en-tête `Upload-Offset` et un corps
+   `application/offset+octet-stream` : ajoute un morceau. Le corps est lu par
+   blocs de `FILE_UPLOAD_SESSION_BUFFER_SIZE` octets et écrit directement dans
+   le fichier partiel, sans passer par les gestionnaires d'upload de Django.
+3. Après une coupure, `HEAD /api/files/uploads/{id}/` renvoie `Upload-Offset`,
+   à partir duquel l'envoi reprend.
+4. `POST /api/files/uploads/{id}/finalize/` : enregistre le fichier partiel
+   (déplacé, ou dédupliqué) et crée l'objet `File`.
+
+Un morceau interrompu n'est pas perdu : les octets effectivement reçus sont
+conservés et comptés dans `offset`.
+"""
+
+import fcntl
+import os
+
+from django.conf import settings
+from django.core.files.base import File as DjangoFile
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from ecole.quotas import release_quota
+
+from .models import File, UploadSession
+
+#: Type de contenu attendu pour l'envoi d'un morceau.
+CHUNK_CONTENT_TYPE = 'application/offset+octet-stream'
+
+
+class UploadConflict(APIException):
+    """Le décalage envoyé ne correspond pas à l'état de la session."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Décalage incohérent avec la session d'upload."
+    default_code = 'conflict'
+
+
+class UploadTooLarge(APIException):
+    """Le morceau dépasse la taille totale annoncée."""
+
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Le morceau dépasse la taille annoncée pour ce fichier."
+    default_code = 'too_large'
+
+
+def write_chunk(session, offset, stream, length):
+    """
+    Écrit un morceau dans le fichier partiel d'une session.
+
+    Aucune transaction ni verrou de ligne n'est conservé pendant la lecture
+    du corps, qui dure autant que le transfert : le décalage est vérifié par
+    une lecture simple, le morceau est écrit sous un verrou exclusif du
+    fichier partiel (`flock`, qui sérialise les envois concurrents sur une
+    même session), puis le nouveau décalage est enregistré par un `UPDATE`
+    conditionnel (`WHERE offset = <décalage annoncé>`). Si le flux
+    s'interrompt, seuls les octets reçus sont comptés.
+
+    Args:
+        session (UploadSession): Session d'upload.
+        offset (int): Décalage annoncé par le client (`Upload-Offset`).
+        stream: Flux de la requête (méthode `read`).
+        length (int): Taille du morceau (`Content-Length`).
+
+    Returns:
+        UploadSession: La session à jour.
+
+    Raises:
+        UploadConflict: Si la session est finalisée, si le décalage diffère
+            ou si un autre morceau est en cours d'envoi.
+        UploadTooLarge: Si le morceau dépasse la taille annoncée.
+    """
+    def check(session):
+        if session.finalized_at:
+            raise UploadConflict("Cette session d'upload est déjà finalisée.")
+        if offset != session.offset:
+            raise UploadConflict(f"Décalage attendu : {session.offset}.")
+
+    session = UploadSession.objects.get(pk=session.pk)
+    check(session)
+    if offset + length > session.length:
+        raise UploadTooLarge()
+
+    buffer_size = settings.FILE_UPLOAD_SESSION_BUFFER_SIZE
+    path = session.partial_path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    written = 0
+    with open(path, 'ab+') as out:
+        try:
+            fcntl.flock(out, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadConflict("Un autre morceau est en cours d'envoi pour cette session.")
+        # Un envoi concurrent a pu se terminer avant l'acquisition du verrou
+        session.refresh_from_db(fields=['offset', 'finalized_at'])
+        check(session)
+        # Un morceau précédent interrompu a pu laisser des octets non comptés :
+        # ils sont coupés, et l'écriture en mode ajout reprend au décalage
+        out.truncate(offset)
+        while written < length:
+            chunk = stream.read(min(buffer_size, length - written))
+            if not chunk:
+                break
+            out.write(chunk)
+            written += len(chunk)
+        out.flush()
+
+        updated = UploadSession.objects.filter(
+            pk=session.pk, offset=offset, finalized_at__isnull=True
+        ).update(offset=offset + written, updated_at=timezone.now())
+    if not updated:
+        session.refresh_from_db(fields=['offset', 'finalized_at'])
+        check(session)
+        raise UploadConflict()
+    session.offset = offset + written
+    return session
+
+
+class PartialFile(DjangoFile):
+    """
+    Fichier partiel complet, présenté comme un fichier temporaire d'upload.
+
+    `FileSystemStorage` déplace (au lieu de copier) les fichiers qui exposent
+    `temporary_file_path` : la finalisation n'entraîne donc aucune réécriture.
+    """
+
+    def temporary_file_path(self):
+        """Chemin du fichier partiel sur le disque."""
+        return self.file.name
+
+
+def finalize_upload(session):
+    """
+    Termine une session complète et crée l'objet `File`.
+
+    Le fichier partiel est enregistré comme un upload classique par
+    `File.save` : déplacé sous `get_file_path`, ou stocké dans un blob
+    dédupliqué (`FILES_DEDUPLICATION`), auquel cas il est supprimé si le
+    contenu existait déjà. La réservation de quota de la session est libérée
+    dans la même transaction : le fichier est désormais compté dans
+    `storage_used`.
+
+    Args:
+        session (UploadSession): Session d'upload.
+
+    Returns:
+        File: Le fichier créé.
+
+    Raises:
+        UploadConflict: Si la session est déjà finalisée ou incomplète.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().select_related('ecole').get(pk=session.pk)
+        if session.finalized_at:
+            raise UploadConflict("Cette session d'upload est déjà finalisée.")
+        if session.offset != session.length:
+            raise UploadConflict(
+                f"Upload incomplet : {session.offset} octet(s) reçu(s) sur {session.length}."
+            )
+
+        partial_path = session.partial_path
+        os.makedirs(os.path.dirname(partial_path), exist_ok=True)
+        # Une session de taille nulle n'a reçu aucun morceau : le fichier partiel est créé vide
+        open(partial_path, 'ab').close()
+        with open(partial_path, 'rb') as f:
+            file_obj = File(
+                ecole=session.ecole,
+                uploaded_by_id=session.uploaded_by_id,
+                description=session.description,
+                file=PartialFile(f, name=session.filename),
+            )
+            file_obj.save()
+        session.file = file_obj
+        session.finalized_at = timezone.now()
+        session.save(update_fields=['file', 'finalized_at', 'updated_at'])
+        release_quota(session.ecole_id, 1, session.length)
+
+    if os.path.exists(partial_path):
+        os.remove(partial_path)
+    return file_obj
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import FileViewSet
+from .views import FileViewSet, UploadSessionViewSet
 
 app_name = 'files'
 
@@ -8,6 +8,8 @@ app_name = 'files'
 # Router DRF
 # -------------------------------------------------------------------
 router = DefaultRouter()
+# Enregistré avant FileViewSet, dont le préfixe vide capturerait `uploads/`
+router.register(r'uploads', UploadSessionViewSet, basename='upload-session')
 router.register(r'', FileViewSet, basename='file')
 """
 Router REST Framework pour le module Files.
@@ -20,7 +22,16 @@ Endpoints générés automatiquement pour FileViewSet :
 - PATCH  /files/{pk}/          -> mise à jour partielle
 - DELETE /files/{pk}/          -> suppression d'un fichier
 - GET    /files/{pk}/download/ -> téléchargement d'un fichier
+- GET    /files/stats/         -> statistiques par école et par type (cache)
 - POST   /files/upload_multiple/ -> upload multiple de fichiers
+
+Endpoints de UploadSessionViewSet (uploads reprenables, voir `files.uploads`) :
+- POST   /files/uploads/                -> création d'une session d'upload
+- HEAD   /files/uploads/{id}/           -> décalage courant (`Upload-Offset`)
+- GET    /files/uploads/{id}/           -> état de la session
+- PATCH  /files/uploads/{id}/           -> envoi d'un morceau
+- POST   /files/uploads/{id}/finalize/  -> création du fichier
+- DELETE /files/uploads/{id}/           -> abandon de la session
 """
 
 # -------------------------------------------------------------------
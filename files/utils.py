@@ -1,12 +1,27 @@
 import os
 import mimetypes
+import uuid
+
+from .compression import ENCODING_SUFFIXES
+
+#: Répertoire racine des fichiers non dédupliqués dans le stockage.
+FILE_ROOT = 'files'
+
 
 def get_file_path(instance, filename):
     """
     Génère le chemin de stockage pour un fichier uploadé.
 
     Le fichier sera stocké sous :
-        schools/{id_ecole}/files/{nom_fichier}
+        files/{ab}/{cd}/{uuid}{extension}
+
+    où `ab` et `cd` sont les quatre premiers caractères d'un UUID aléatoire :
+    les fichiers sont répartis sur 65 536 répertoires, quelle que soit la
+    taille de l'école, et deux uploads ne peuvent pas entrer en collision
+    (pas de recherche d'un nom libre par `get_available_name`). Le nom
+    d'origine n'est conservé que dans `File.filename` ; seule l'extension,
+    en minuscules, est reprise dans le chemin, suivie du suffixe de
+    compression (`.gz`) si le contenu est stocké compressé (`files.compression`).
 
     Args:
         instance (File): Instance du modèle File.
@@ -15,7 +30,10 @@ def get_file_path(instance, filename):
     Returns:
         str: Chemin relatif où le fichier sera stocké.
     """
-    return f'schools/{instance.ecole.id}/files/{filename}'
+    key = uuid.uuid4().hex
+    ext = os.path.splitext(filename)[1].lower()
+    ext += ENCODING_SUFFIXES.get(getattr(instance, 'content_encoding', ''), '')
+    return f'{FILE_ROOT}/{key[:2]}/{key[2:4]}/{key}{ext}'
 
 
 def determine_file_type(filename):
@@ -64,3 +82,49 @@ def get_mime_type(filename):
     """
     mime_type, _ = mimetypes.guess_type(filename)
     return mime_type or 'application/octet-stream'
+
+
+#: Signatures (« magic bytes ») reconnues en tête de fichier.
+MAGIC_SIGNATURES = [
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'PK\x03\x04', 'application/zip'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/x-ole-storage'),
+]
+
+#: Nombre d'octets de tête nécessaires à `sniff_mime_type`.
+SNIFF_SIZE = max(len(signature) for signature, _ in MAGIC_SIGNATURES)
+
+#: Conteneurs génériques et extensions dont ils sont le format réel.
+CONTAINER_EXTENSIONS = {
+    'application/zip': ('.docx', '.xlsx'),
+    'application/x-ole-storage': ('.doc', '.xls'),
+}
+
+
+def sniff_mime_type(head, filename):
+    """
+    Détermine le type MIME d'un fichier d'après ses premiers octets.
+
+    Les formats bureautiques (docx/xlsx, doc/xls) sont des conteneurs ZIP ou
+    OLE : si l'extension correspond au conteneur détecté, le type précis est
+    déduit de l'extension. Sans signature reconnue (texte, CSV...), le type
+    est déduit de l'extension (`get_mime_type`).
+
+    Args:
+        head (bytes): Premiers octets du fichier (au moins `SNIFF_SIZE`).
+        filename (str): Nom du fichier.
+
+    Returns:
+        str: Type MIME du fichier.
+    """
+    for signature, mime_type in MAGIC_SIGNATURES:
+        if head.startswith(signature):
+            ext = os.path.splitext(filename)[1].lower()
+            if ext in CONTAINER_EXTENSIONS.get(mime_type, ()):
+                return get_mime_type(filename)
+            return mime_type
+    return get_mime_type(filename)
@@ -1,22 +1,25 @@
 from django.core.exceptions import ValidationError
 import os
 
+#: Taille maximale d'un fichier uploadé, en mégaoctets.
+MAX_FILE_SIZE_MB = 10
+
+
 def validate_file_size(file):
     """
-    Valide que la taille d'un fichier ne dépasse pas 10MB.
+    Valide que la taille d'un fichier ne dépasse pas `MAX_FILE_SIZE_MB` (10MB).
 
     Args:
         file (File): Fichier à valider.
 
     Raises:
-        ValidationError: Si la taille du fichier dépasse 10MB.
+        ValidationError: Si la taille du fichier dépasse `MAX_FILE_SIZE_MB`.
 
     Exemple:
         >>> validate_file_size(myfile)
     """
-    max_size_mb = 10
-    if file.size > max_size_mb * 1024 * 1024:
-        raise ValidationError(f'La taille du fichier ne doit pas dépasser {max_size_mb}MB')
+    if file.size > MAX_FILE_SIZE_MB * 1024 * 1024:
+        raise ValidationError(f'La taille du fichier ne doit pas dépasser {MAX_FILE_SIZE_MB}MB')
 
 
 def validate_file_extension(file):
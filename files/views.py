@@ -1,13 +1,25 @@
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.http import FileResponse, Http404
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from .models import File
+from rest_framework.parsers import JSONParser
+from rest_framework.settings import api_settings
+from .models import File, UploadSession
 from ecole.models import Ecole
-from .serializers import FileSerializer, FileUploadSerializer, FileListSerializer
+from ecole.quotas import quota_reservation
+from .serializers import (
+    FileBatchItemSerializer, FileSerializer, FileUploadSerializer, FileListSerializer, UploadSessionSerializer
+)
+from .batch import upload_batch
+from .downloads import download_response
+from .filters import filter_files
+from .pagination import FileCursorPagination
+from .stats import INTERVALS, get_file_stats
+from .parsers import StreamingMultiPartParser
+from .uploads import CHUNK_CONTENT_TYPE, finalize_upload, write_chunk
 
 class FileViewSet(viewsets.ModelViewSet):
     """
@@ -15,6 +27,7 @@ class FileViewSet(viewsets.ModelViewSet):
 
     Fournit les opérations CRUD standard, ainsi que des actions personnalisées :
     - Télécharger un fichier (`download`)
+    - Statistiques agrégées par école et par type (`stats`)
     - Upload multiple de fichiers (`upload_multiple`)
 
     Permissions :
@@ -28,6 +41,21 @@ class FileViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
+    @property
+    def pagination_class(self):
+        """
+        Retourne la pagination à appliquer à la liste.
+
+        `?pagination=cursor` active la pagination par curseur (sans `COUNT(*)`
+        ni `OFFSET`, voir `files.pagination`).
+
+        Returns:
+            type: Classe de pagination.
+        """
+        if self.request is not None and self.request.query_params.get('pagination') == 'cursor':
+            return FileCursorPagination
+        return api_settings.DEFAULT_PAGINATION_CLASS
+
     def get_serializer_class(self):
         """
         Retourne le sérialiseur approprié selon l'action.
@@ -61,24 +89,13 @@ class FileViewSet(viewsets.ModelViewSet):
         - `type`: Filtrer par type de fichier
         - `my_files`: Si vrai, retourne uniquement les fichiers uploadés par l'utilisateur connecté
 
+        Chaque combinaison de filtres est servie par un index composite
+        terminé par `-uploaded_at` (voir `files.filters`).
+
         Returns:
             QuerySet: Fichiers filtrés.
         """
-        queryset = self.queryset
-
-        ecole_id = self.request.query_params.get('ecole')
-        if ecole_id:
-            queryset = queryset.filter(ecole_id=ecole_id)
-
-        file_type = self.request.query_params.get('type')
-        if file_type:
-            queryset = queryset.filter(file_type=file_type)
-
-        my_files = self.request.query_params.get('my_files')
-        if my_files:
-            queryset = queryset.filter(uploaded_by=self.request.user)
-
-        return queryset
+        return filter_files(self.queryset, self.request.query_params, self.request.user)
 
     def perform_create(self, serializer):
         """
@@ -94,32 +111,96 @@ class FileViewSet(viewsets.ModelViewSet):
         """
         Télécharger un fichier donné.
 
+        Supporte les requêtes conditionnelles et partielles (voir `files.downloads`) :
+        - `ETag` / `Last-Modified` ; `If-None-Match` / `If-Modified-Since` : **304**
+        - `Range` (une ou plusieurs plages) : **206**, **416** si non satisfaisable
+        - `If-Range` : plage servie seulement si le fichier n'a pas changé
+
         Args:
             request (Request): Requête HTTP
             pk (int): ID du fichier
 
         Returns:
-            FileResponse: Réponse HTTP avec le fichier en pièce jointe.
+            HttpResponse: Réponse HTTP avec le fichier (ou les plages demandées) en pièce jointe.
 
         Raises:
             Http404: Si le fichier n'existe pas sur le serveur.
         """
         file_obj = self.get_object()
         try:
-            response = FileResponse(
-                file_obj.file.open('rb'),
-                content_type=file_obj.mime_type
-            )
-            response['Content-Disposition'] = f'attachment; filename="{file_obj.filename}"'
-            return response
+            return download_response(request, file_obj)
         except FileNotFoundError:
             raise Http404("Fichier non trouvé sur le serveur")
 
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Statistiques agrégées des fichiers par école et par type.
+
+        Calculées par une seule requête `GROUP BY` et mises en cache jusqu'au
+        prochain upload ou suppression dans l'école (voir `files.stats`).
+
+        Query params supportés :
+        - `ecole`: Restreindre à une école
+        - `type`: Restreindre à un type de fichier
+        - `interval`: Ajoute un histogramme par période d'upload (`day`, `week`, `month`, `year`)
+
+        Exemple de réponse (`?ecole=1&interval=month`) :
+        ```json
+        [
+            {
+                "ecole": 1,
+                "files_count": 3,
+                "total_size": 52480,
+                "file_stats": [
+                    {"file_type": "pdf", "files_count": 2, "total_size": 50000},
+                    {"file_type": "text", "files_count": 1, "total_size": 2480}
+                ],
+                "histogram": [
+                    {"period": "2026-09-01T00:00:00Z", "files_count": 1, "total_size": 25000},
+                    {"period": "2026-10-01T00:00:00Z", "files_count": 2, "total_size": 27480}
+                ]
+            }
+        ]
+        ```
+
+        Args:
+            request (Request): Requête HTTP
+
+        Returns:
+            Response: Statistiques par école (liste vide si aucun fichier), ou
+            erreur 400 si un paramètre est invalide.
+        """
+        params = request.query_params
+        ecole_id = params.get('ecole') or None
+        if ecole_id is not None and not ecole_id.isdigit():
+            return Response({"error": "Paramètre 'ecole' invalide."}, status=status.HTTP_400_BAD_REQUEST)
+        file_type = params.get('type') or None
+        if file_type is not None and file_type not in dict(File.FILE_TYPES):
+            return Response({"error": "Paramètre 'type' invalide."}, status=status.HTTP_400_BAD_REQUEST)
+        interval = params.get('interval') or None
+        if interval is not None and interval not in INTERVALS:
+            return Response(
+                {"error": f"Paramètre 'interval' invalide (valeurs : {', '.join(INTERVALS)})."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(get_file_stats(
+            int(ecole_id) if ecole_id is not None else None, file_type, interval
+        ))
+
+    @action(detail=False, methods=['post'], parser_classes=[StreamingMultiPartParser])
     def upload_multiple(self, request):
         """
         Upload multiple fichiers vers une école spécifique.
 
+        Le corps est lu en flux (`files.parsers.StreamingMultiPartParser`) :
+        chaque fichier est écrit sur le disque au fil de sa réception, et une
+        extension interdite ou une taille excessive le fait rejeter : la suite
+        de son contenu est encore lue sur la connexion, mais jetée sans être
+        écrite (voir `files.handlers`). Tous les fichiers sont validés avant toute
+        écriture en base ; les fichiers valides sont déplacés en parallèle
+        puis enregistrés en une transaction (voir `files.batch`).
+
         Requête attendue :
         - `ecole`: ID de l'école
         - `files`: Liste de fichiers
@@ -127,33 +208,40 @@ class FileViewSet(viewsets.ModelViewSet):
 
         Returns:
             Response: Détails sur les fichiers uploadés et les erreurs éventuelles.
+
+        Raises:
+            QuotaExceeded: Si les fichiers valides du lot dépassent les quotas de l'école (413).
         """
         ecole_id = request.data.get('ecole')
         if not ecole_id:
             return Response({'error': 'ecole_id requis'}, status=status.HTTP_400_BAD_REQUEST)
 
-        school = get_object_or_404(Ecole, pk=ecole_id)
+        school = get_object_or_404(Ecole.objects.active(), pk=ecole_id)
         files = request.FILES.getlist('files')
+        # Parties rejetées pendant la lecture du corps (extension, taille)
+        errors = list(getattr(request, 'upload_errors', []))
 
-        if not files:
+        if not files and not errors:
             return Response({'error': 'Aucun fichier fourni'}, status=status.HTTP_400_BAD_REQUEST)
 
-        uploaded_files = []
-        errors = []
+        valid_files = []
 
         for file in files:
-            serializer = FileUploadSerializer(data={
-                'ecole': school.id,
-                'file': file,
-                'description': request.data.get('description', '')
-            })
-
+            serializer = FileBatchItemSerializer(data={'file': file})
             if serializer.is_valid():
-                file_obj = serializer.save(uploaded_by=request.user)
-                uploaded_files.append(FileSerializer(file_obj, context={'request': request}).data)
+                valid_files.append(serializer.validated_data['file'])
             else:
                 errors.append({'filename': file.name, 'errors': serializer.errors})
 
+        created = []
+        if valid_files:
+            # Le lot entier est réservé sur les quotas de l'école (413 s'il ne tient pas)
+            with quota_reservation(school.pk, len(valid_files), sum(file.size for file in valid_files)):
+                created = upload_batch(
+                    school, request.user, valid_files, request.data.get('description', '')
+                )
+        uploaded_files = FileSerializer(created, many=True, context={'request': request}).data
+
         return Response(
             {
                 'uploaded': len(uploaded_files),
@@ -163,3 +251,132 @@ class FileViewSet(viewsets.ModelViewSet):
             },
             status=status.HTTP_201_CREATED if uploaded_files else status.HTTP_400_BAD_REQUEST
         )
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    ViewSet des uploads reprenables par morceaux (voir `files.uploads`).
+
+    Routes :
+    - `POST   /uploads/`                : crée une session (`ecole`, `filename`, `length`)
+    - `HEAD   /uploads/{id}/`           : `Upload-Offset` courant, pour reprendre un envoi
+    - `GET    /uploads/{id}/`           : état de la session
+    - `PATCH  /uploads/{id}/`           : ajoute un morceau (`Upload-Offset` + corps brut)
+    - `POST   /uploads/{id}/finalize/`  : crée le fichier une fois tous les octets reçus
+    - `DELETE /uploads/{id}/`           : abandonne la session et supprime le fichier partiel
+
+    Permissions :
+    - Authentification requise ; chaque utilisateur ne voit que ses sessions.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+
+    def get_queryset(self):
+        """
+        Retourne les sessions de l'utilisateur connecté.
+
+        Returns:
+            QuerySet: Sessions d'upload de l'utilisateur.
+        """
+        return UploadSession.objects.filter(uploaded_by=self.request.user)
+
+    def perform_create(self, serializer):
+        """
+        Associe l'utilisateur connecté à la session créée.
+
+        Args:
+            serializer (Serializer): Sérialiseur validé.
+        """
+        serializer.save(uploaded_by=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        """
+        Crée une session et renvoie son URL (`Location`) et `Upload-Offset`.
+
+        Returns:
+            Response: Session créée (201).
+        """
+        response = super().create(request, *args, **kwargs)
+        response['Location'] = request.build_absolute_uri(f"{response.data['id']}/")
+        response['Upload-Offset'] = '0'
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        État de la session, avec les en-têtes `Upload-Offset` et `Upload-Length`.
+
+        Sert aussi les requêtes `HEAD` utilisées pour reprendre un envoi.
+
+        Returns:
+            Response: Session d'upload.
+        """
+        session = self.get_object()
+        response = Response(self.get_serializer(session).data)
+        return self._with_offset(response, session)
+
+    def partial_update(self, request, *args, **kwargs):
+        """
+        Ajoute un morceau au fichier partiel de la session.
+
+        En-têtes attendus :
+        - `Content-Type: application/offset+octet-stream`
+        - `Upload-Offset` : décalage du morceau (égal à l'`offset` de la session)
+        - `Content-Length` : taille du morceau
+
+        Returns:
+            Response: 204 avec le nouvel `Upload-Offset`, 409 si le décalage
+            est incohérent, 413 si le morceau dépasse la taille annoncée,
+            415 si le type de contenu est incorrect.
+        """
+        session = self.get_object()
+        if request.content_type != CHUNK_CONTENT_TYPE:
+            return Response(
+                {'error': f'Content-Type attendu : {CHUNK_CONTENT_TYPE}'},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META['CONTENT_LENGTH'])
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'En-têtes Upload-Offset et Content-Length requis'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        session = write_chunk(session, offset, request.stream, length)
+        return self._with_offset(Response(status=status.HTTP_204_NO_CONTENT), session)
+
+    def perform_destroy(self, instance):
+        """
+        Abandonne une session non finalisée (le fichier partiel est supprimé).
+
+        Args:
+            instance (UploadSession): Session à supprimer.
+        """
+        instance.delete()
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """
+        Finalise une session complète et crée le fichier.
+
+        Returns:
+            Response: Le fichier créé (201), ou 409 si l'upload est incomplet.
+        """
+        file_obj = finalize_upload(self.get_object())
+        return Response(
+            FileSerializer(file_obj, context={'request': request}).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @staticmethod
+    def _with_offset(response, session):
+        """Ajoute les en-têtes de progression de la session à une réponse."""
+        response['Upload-Offset'] = str(session.offset)
+        response['Upload-Length'] = str(session.length)
+        response['Cache-Control'] = 'no-store'
+        return response